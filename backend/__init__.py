@@ -1,8 +1,16 @@
 """
 Healthcare Data Analytics Backend Package
 """
-from backend.database import DatabaseManager
-from backend.llm_service import LLMService
-
 __version__ = "1.0.0"
 __all__ = ["DatabaseManager", "LLMService"]
+
+
+def __getattr__(name):
+    # Loaded on first use, so importing one submodule does not import the others
+    if name == "DatabaseManager":
+        from backend.database import DatabaseManager
+        return DatabaseManager
+    if name == "LLMService":
+        from backend.llm_service import LLMService
+        return LLMService
+    raise AttributeError(f"module 'backend' has no attribute '{name}'")
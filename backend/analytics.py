@@ -0,0 +1,232 @@
+"""
+Cross-district comparative analytics for a state
+
+All districts of a state are compared in one vectorized pass over a
+district x year table built from the malaria data: state rank and percentile
+of detected cases, year-over-year growth, test positivity, share of the
+state's cases and incidence per 1000 population. Populations come from a CSV
+with District and Population columns (SCMO.csv at the repository root by
+default). A State column lets one file cover several states; without it every
+row belongs to DISTRICT_POPULATION_STATE.
+
+Configuration (environment):
+    DISTRICT_POPULATION_CSV     Population file (../SCMO.csv relative to backend/)
+    DISTRICT_POPULATION_STATE   State of a population file without a State column (Uttar Pradesh)
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+POPULATION_CSV = os.getenv(
+    'DISTRICT_POPULATION_CSV',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'SCMO.csv')
+)
+POPULATION_STATE = os.getenv('DISTRICT_POPULATION_STATE', 'Uttar Pradesh')
+
+
+def normalize_district(name: str) -> str:
+    """Match key for district names: lowercase letters and digits, parenthesized aliases dropped"""
+    return re.sub(r'[^a-z0-9]', '', re.sub(r'\(.*?\)', '', str(name).lower()))
+
+
+@lru_cache(maxsize=4)
+def load_populations(path: str = POPULATION_CSV, default_state: str = POPULATION_STATE) -> Dict[tuple, int]:
+    """
+    Read district populations
+
+    Args:
+        path: Population CSV
+        default_state: State of every row when the file has no State column
+
+    Returns:
+        {(normalized state, normalized district): population}; empty when the file is missing
+    """
+    if not os.path.exists(path):
+        return {}
+    import pandas as pd
+
+    frame = pd.read_csv(path)
+    frame = frame.dropna(subset=['District', 'Population'])
+    states = (frame['State'].map(normalize_district) if 'State' in frame
+              else pd.Series(normalize_district(default_state), index=frame.index))
+    keys = zip(states, frame['District'].map(normalize_district))
+    populations = {}
+    for key, population in zip(keys, frame['Population'].astype(int)):
+        populations.setdefault(key, population)
+    return populations
+
+
+def compare_districts(db_manager, state: str, year: Optional[int] = None,
+                      population_csv: str = POPULATION_CSV) -> Dict:
+    """
+    Rank and compare every district of a state for one year
+
+    Args:
+        db_manager: DatabaseManager
+        state: State name
+        year: Year to compare (latest year on record for the state by default)
+        population_csv: District population file
+
+    Returns:
+        Dict with state, year, state-wide summary and one entry per district
+        ordered by state rank (empty 'districts' when the state has no data)
+    """
+    data = db_manager.get_state_data(state, as_arrays=True)
+    if not len(data['year']):
+        return {'state': state, 'year': year, 'summary': {}, 'districts': []}
+    # pandas is only loaded on first use so API startup stays light
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        'district': data['districts'][data['district_index']],
+        'location_id': data['location_ids'][data['district_index']],
+        'year': data['year'],
+        'cases_examined': data['cases_examined'],
+        'cases_detected': data['cases_detected']
+    })
+    year = int(year if year is not None else frame['year'].max())
+    detected = frame.pivot_table(index=['district', 'location_id'], columns='year',
+                                 values='cases_detected', aggfunc='sum')
+    examined = frame.pivot_table(index=['district', 'location_id'], columns='year',
+                                 values='cases_examined', aggfunc='sum')
+    if year not in detected.columns:
+        return {'state': state, 'year': year, 'summary': {}, 'districts': []}
+
+    current = detected[year]
+    has_current = current.notna()
+    previous_years = [column for column in detected.columns if column < year]
+    previous = detected[previous_years[-1]] if previous_years else pd.Series(np.nan, index=detected.index)
+
+    table = pd.DataFrame({
+        'cases_detected': current,
+        'cases_examined': examined[year],
+        'previous_cases_detected': previous
+    })[has_current]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['yoy_growth'] = np.where(table['previous_cases_detected'] > 0,
+                                       table['cases_detected'] / table['previous_cases_detected'] - 1, np.nan)
+        table['test_positivity_rate'] = np.where(table['cases_examined'] > 0,
+                                                 table['cases_detected'] / table['cases_examined'], np.nan)
+    total = table['cases_detected'].sum()
+    table['share_of_state_cases'] = table['cases_detected'] / total if total else np.nan
+    table['state_rank'] = table['cases_detected'].rank(ascending=False, method='min')
+    # Fraction of the state's districts with at most this many cases
+    table['percentile'] = table['cases_detected'].rank(pct=True, method='max') * 100
+    table['growth_rank'] = table['yoy_growth'].rank(ascending=False, method='min')
+
+    populations = load_populations(population_csv)
+    state_key = normalize_district(state)
+    keys = [normalize_district(district) for district, _ in table.index]
+    table['population'] = [populations.get((state_key, key), np.nan) for key in keys]
+    table['incidence_per_1000'] = table['cases_detected'] / table['population'] * 1000
+    table['incidence_rank'] = table['incidence_per_1000'].rank(ascending=False, method='min')
+    table = table.sort_values(['state_rank', 'cases_examined'], ascending=[True, False])
+
+    districts = []
+    for (district, location_id), row in table.iterrows():
+        districts.append({
+            'district': district,
+            'location_id': int(location_id),
+            'cases_detected': int(row['cases_detected']),
+            'cases_examined': _int_or_none(row['cases_examined']),
+            'state_rank': int(row['state_rank']),
+            'percentile': _round(row['percentile'], 1),
+            'yoy_growth': _round(row['yoy_growth'], 4),
+            'growth_rank': _int_or_none(row['growth_rank']),
+            'test_positivity_rate': _round(row['test_positivity_rate'], 6),
+            'share_of_state_cases': _round(row['share_of_state_cases'], 4),
+            'population': _int_or_none(row['population']),
+            'incidence_per_1000': _round(row['incidence_per_1000'], 4),
+            'incidence_rank': _int_or_none(row['incidence_rank'])
+        })
+
+    previous_total = table['previous_cases_detected'].sum(min_count=1)
+    summary = {
+        'district_count': len(table),
+        'cases_detected': int(total),
+        'cases_examined': int(table['cases_examined'].sum()),
+        'yoy_growth': _round(total / previous_total - 1, 4) if previous_total else None,
+        'median_cases_detected': _round(table['cases_detected'].median(), 1),
+        'p90_cases_detected': _round(table['cases_detected'].quantile(0.9), 1),
+        'top3_share': _round(table['cases_detected'].nlargest(3).sum() / total, 4) if total else None,
+        'districts_growing': int((table['yoy_growth'] > 0).sum())
+    }
+    return {'state': state, 'year': year, 'summary': summary, 'districts': districts}
+
+
+def comparative_lines(analysis: Dict, limit: int = 5) -> List[str]:
+    """Render the leading districts of an analysis as compact prompt data lines"""
+    if not analysis['districts']:
+        return []
+    summary = analysis['summary']
+    lines = [
+        f"Comparison {analysis['year']}: {summary['district_count']} districts, top 3 hold "
+        f"{_percent(summary['top3_share'])} of cases, {summary['districts_growing']} growing, "
+        f"median {summary['median_cases_detected']:g} cases",
+        "rank|district|cases|pctile|yoy|positivity|per1000"
+    ]
+    for row in analysis['districts'][:limit]:
+        lines.append(
+            f"{row['state_rank']}|{row['district']}|{row['cases_detected']}|{row['percentile']:g}|"
+            f"{_percent(row['yoy_growth'], signed=True)}|{_percent(row['test_positivity_rate'], 2)}|"
+            f"{'n/a' if row['incidence_per_1000'] is None else round(row['incidence_per_1000'], 3)}"
+        )
+    return lines
+
+
+def highly_affected_summary(analysis: Dict, limit: int = 5) -> str:
+    """One-line ranking of the most affected districts"""
+    return "; ".join(
+        f"#{row['state_rank']} {row['district']} ({row['cases_detected']} cases, "
+        f"{_percent(row['yoy_growth'], signed=True)} YoY"
+        + (f", {row['incidence_per_1000']:.3f}/1000" if row['incidence_per_1000'] is not None else "") + ")"
+        for row in analysis['districts'][:limit]
+    )
+
+
+def comparative_summary(analysis: Dict) -> str:
+    """One-paragraph comparison of the state's districts"""
+    summary = analysis['summary']
+    districts = analysis['districts']
+    fastest = min(
+        (row for row in districts if row['growth_rank'] is not None),
+        key=lambda row: row['growth_rank'], default=None
+    )
+    by_incidence = min(
+        (row for row in districts if row['incidence_rank'] is not None),
+        key=lambda row: row['incidence_rank'], default=None
+    )
+    parts = [
+        f"{summary['cases_detected']} cases across {summary['district_count']} districts in "
+        f"{analysis['year']} ({_percent(summary['yoy_growth'], signed=True)} vs previous year)",
+        f"top 3 districts hold {_percent(summary['top3_share'])} of cases",
+        f"{summary['districts_growing']} districts growing"
+    ]
+    if fastest is not None:
+        # growth_rank 1 is the largest value, which is only "growth" when positive
+        label = "highest growth" if fastest['yoy_growth'] > 0 else "smallest decline"
+        parts.append(f"{label} in {fastest['district']} ({_percent(fastest['yoy_growth'], signed=True)})")
+    if by_incidence is not None:
+        parts.append(f"highest incidence in {by_incidence['district']} "
+                     f"({by_incidence['incidence_per_1000']:.3f} per 1000)")
+    return "; ".join(parts) + "."
+
+
+def _percent(value: Optional[float], digits: int = 0, signed: bool = False) -> str:
+    if value is None:
+        return "n/a"
+    return f"{value:{'+' if signed else ''}.{digits}%}"
+
+
+def _round(value, digits: int) -> Optional[float]:
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def _int_or_none(value) -> Optional[int]:
+    value = float(value)
+    return int(value) if np.isfinite(value) else None
@@ -1,10 +1,25 @@
 """
 Database module for managing SQLite database operations
 """
+import os
 import sqlite3
 import json
 from pathlib import Path
-from typing import List, Dict, Optional
+import numpy as np
+from typing import List, Dict, Optional, Tuple, Iterable
+
+# Bump when the seed data change so existing databases are seeded again
+# (schema changes go in migrations.py)
+INIT_VERSION = 1
+
+# Equality filters accepted by list_service_requests / count_service_requests
+SERVICE_REQUEST_FILTERS = ('user_id', 'status', 'escalation_level', 'district', 'state')
+
+# Granularities stored in malaria_timeseries
+TIMESERIES_GRANULARITIES = ('weekly', 'monthly')
+
+# Statuses a supervisor can set on a service request
+SERVICE_REQUEST_STATUSES = ('pending', 'approved', 'in_progress', 'fulfilled', 'rejected')
 
 class DatabaseManager:
     def __init__(self, db_path: str = "MALERIA.db"):
@@ -15,8 +30,17 @@ class DatabaseManager:
         self.init_connection()
         
     def init_connection(self):
-        """Initialize database connection"""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        """
+        Initialize database connection
+        
+        WAL mode lets readers in every worker process run alongside a writer, and
+        busy_timeout makes concurrent writers wait for the lock instead of failing.
+        """
+        busy_timeout_ms = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=busy_timeout_ms / 1000)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(f'PRAGMA busy_timeout={busy_timeout_ms}')
         self.cursor = self.conn.cursor()
         self.cursor.row_factory = sqlite3.Row
         
@@ -106,6 +130,72 @@ class DatabaseManager:
             )
         ''')
         
+        # Precomputed forecasts (last successful LLM forecast per location)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS precomputed_forecasts (
+                location_id INTEGER PRIMARY KEY,
+                forecast_result TEXT NOT NULL,
+                generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (location_id) REFERENCES location(location_id)
+            )
+        ''')
+        
+        # State rollup: per state-year totals (maintained by refresh_rollups)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS state_year_summary (
+                state TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                district_count INTEGER NOT NULL,
+                cases_examined INTEGER NOT NULL,
+                cases_detected INTEGER NOT NULL,
+                male_case_detected INTEGER NOT NULL,
+                female_case_detected INTEGER NOT NULL,
+                test_positivity_rate REAL,
+                PRIMARY KEY (state, year)
+            )
+        ''')
+        
+        # District rollup: year-over-year growth, positivity and rank within state
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS district_year_summary (
+                location_id INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                district TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                cases_examined INTEGER NOT NULL,
+                cases_detected INTEGER NOT NULL,
+                yoy_growth REAL,
+                test_positivity_rate REAL,
+                state_rank INTEGER NOT NULL,
+                PRIMARY KEY (location_id, year),
+                FOREIGN KEY (location_id) REFERENCES location(location_id)
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_district_year_summary_rank
+            ON district_year_summary (state, year, state_rank)
+        ''')
+        
+        # Change log of (location, year) rows touched by delta ingests
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS data_change_log (
+                change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                location_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                change_type TEXT NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (location_id) REFERENCES location(location_id)
+            )
+        ''')
+        
+        # Key/value markers such as the completed initialization version
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS app_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+        
         self.conn.commit()
         print("✓ All tables created successfully")
         
@@ -116,10 +206,12 @@ class DatabaseManager:
         
         print(f"Loading {len(data)} records from {json_path}...")
         counter = 0
+        touched_states = set()
         for record in data:
             counter+=1
             state = record.get('state', 'Unknown')
             district = record.get('district', 'Unknown')
+            touched_states.add(state)
 
             # Check if location already exists
             self.cursor.execute(
@@ -171,8 +263,429 @@ class DatabaseManager:
                 except sqlite3.IntegrityError:
                     print(f"Duplicate entry found: {record}")
 
+        self.refresh_rollups(touched_states, commit=False)
         self.conn.commit()
         print(f"Counter: {counter} Data loaded successfully")
+    
+    def refresh_rollups(self, states: Optional[Iterable[str]] = None, commit: bool = True):
+        """
+        Rebuild the state/district rollup tables
+        
+        Rollups are recomputed per state, so an ingest only pays for the states it
+        touched; rank and year-over-year growth need the whole state's history.
+        
+        Args:
+            states: States to refresh; None refreshes every state
+            commit: Commit when done (False when called inside a larger transaction)
+        """
+        if states is None:
+            self.cursor.execute('SELECT DISTINCT state FROM location')
+            states = [row[0] for row in self.cursor.fetchall()]
+        
+        for state in states:
+            self.cursor.execute('DELETE FROM district_year_summary WHERE state = ?', (state,))
+            self.cursor.execute('''
+                INSERT INTO district_year_summary
+                (location_id, state, district, year, cases_examined, cases_detected,
+                 yoy_growth, test_positivity_rate, state_rank)
+                SELECT location_id, state, district, year, cases_examined, cases_detected,
+                       CASE WHEN previous_detected > 0
+                            THEN (cases_detected - previous_detected) * 1.0 / previous_detected
+                       END,
+                       CASE WHEN cases_examined > 0
+                            THEN cases_detected * 1.0 / cases_examined
+                       END,
+                       RANK() OVER (PARTITION BY year ORDER BY cases_detected DESC)
+                FROM (
+                    SELECT l.location_id, l.state, l.district, m.year,
+                           m.cases_examined, m.cases_detected,
+                           LAG(m.cases_detected) OVER (
+                               PARTITION BY l.location_id ORDER BY m.year
+                           ) AS previous_detected
+                    FROM malaria_state_data m
+                    JOIN location l ON m.location_id = l.location_id
+                    WHERE l.state = ?
+                )
+            ''', (state,))
+            
+            self.cursor.execute('DELETE FROM state_year_summary WHERE state = ?', (state,))
+            self.cursor.execute('''
+                INSERT INTO state_year_summary
+                (state, year, district_count, cases_examined, cases_detected,
+                 male_case_detected, female_case_detected, test_positivity_rate)
+                SELECT l.state, m.year, COUNT(*), SUM(m.cases_examined), SUM(m.cases_detected),
+                       SUM(m.male_case_detected), SUM(m.female_case_detected),
+                       CASE WHEN SUM(m.cases_examined) > 0
+                            THEN SUM(m.cases_detected) * 1.0 / SUM(m.cases_examined)
+                       END
+                FROM malaria_state_data m
+                JOIN location l ON m.location_id = l.location_id
+                WHERE l.state = ?
+                GROUP BY l.state, m.year
+            ''', (state,))
+        
+        if commit:
+            self.conn.commit()
+    
+    def ingest_delta(self, json_path: str) -> Dict:
+        """
+        Apply a data file incrementally, touching only new or changed rows
+        
+        Rows are matched on (location, year). Inserts and updates are applied in
+        one transaction and recorded in data_change_log; precomputed forecasts of
+        the changed districts are dropped and rollups are refreshed only for the
+        states involved. Running the same file twice is a no-op.
+        
+        Args:
+            json_path: Path to a JSON file in the maleria_data.json format
+            
+        Returns:
+            Dict with inserted/updated/unchanged counts and the changed districts
+        """
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        
+        metric_columns = ['cases_examined', 'cases_detected', 'male_case_examined',
+                          'female_case_examined', 'male_case_detected', 'female_case_detected']
+        
+        # Resolve all locations up front, creating missing ones in one batch
+        location_ids = self._resolve_location_ids(
+            (record.get('state', 'Unknown'), record.get('district', 'Unknown')) for record in data
+        )
+        
+        # Existing rows for the involved locations, read in one query
+        involved = sorted({
+            location_ids[(record.get('state', 'Unknown'), record.get('district', 'Unknown'))] for record in data
+        })
+        existing = {}
+        if involved:
+            placeholders = ', '.join('?' for _ in involved)
+            self.cursor.execute(f'''
+                SELECT location_id, year, {', '.join(metric_columns)}
+                FROM malaria_state_data
+                WHERE location_id IN ({placeholders})
+            ''', involved)
+            existing = {(row[0], row[1]): tuple(row[2:]) for row in self.cursor.fetchall()}
+        
+        inserts, updates, changes = [], [], []
+        changed_locations = {}
+        unchanged = 0
+        for record in data:
+            state = record.get('state', 'Unknown')
+            district = record.get('district', 'Unknown')
+            location_id = location_ids[(state, district)]
+            year = record.get('year', 0)
+            values = tuple(record.get(column, 0) for column in metric_columns)
+            
+            current = existing.get((location_id, year))
+            if current is None:
+                inserts.append((location_id, year) + values)
+                changes.append((location_id, year, 'insert'))
+            elif current != values:
+                updates.append(values + (location_id, year))
+                changes.append((location_id, year, 'update'))
+            else:
+                unchanged += 1
+                continue
+            existing[(location_id, year)] = values
+            changed_locations[location_id] = (state, district)
+        
+        if changes:
+            self.cursor.executemany(f'''
+                INSERT INTO malaria_state_data
+                (location_id, year, {', '.join(metric_columns)})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', inserts)
+            self.cursor.executemany(f'''
+                UPDATE malaria_state_data
+                SET {', '.join(f'{column} = ?' for column in metric_columns)}
+                WHERE location_id = ? AND year = ?
+            ''', updates)
+            self.cursor.executemany('''
+                INSERT INTO data_change_log (location_id, year, change_type)
+                VALUES (?, ?, ?)
+            ''', changes)
+            self.delete_precomputed_forecasts(list(changed_locations), commit=False)
+            self.refresh_rollups({state for state, _ in changed_locations.values()}, commit=False)
+        self.conn.commit()
+        
+        return {
+            'inserted': len(inserts),
+            'updated': len(updates),
+            'unchanged': unchanged,
+            'changed_districts': [
+                {'location_id': location_id, 'state': state, 'district': district}
+                for location_id, (state, district) in changed_locations.items()
+            ]
+        }
+    
+    def _resolve_location_ids(self, locations: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        """Map (state, district) pairs to location ids, creating missing locations in one batch"""
+        self.cursor.execute('SELECT state, district, location_id FROM location')
+        location_ids = {(row[0], row[1]): row[2] for row in self.cursor.fetchall()}
+        new_locations = sorted(set(locations) - set(location_ids))
+        if new_locations:
+            self.cursor.executemany('INSERT INTO location (state, district) VALUES (?, ?)', new_locations)
+            self.cursor.execute('SELECT state, district, location_id FROM location')
+            location_ids = {(row[0], row[1]): row[2] for row in self.cursor.fetchall()}
+        return location_ids
+    
+    def ingest_timeseries(self, records: List[Dict], granularity: str) -> Dict:
+        """
+        Upsert weekly or monthly surveillance counts, touching only new or changed periods
+        
+        Changed (location, year) pairs are logged in data_change_log so cached
+        and precomputed forecasts of those districts are invalidated.
+        
+        Args:
+            records: Dicts with state, district, period_start (ISO date, already
+                aligned to the week/month start), cases_examined and cases_detected
+            granularity: 'weekly' or 'monthly'
+        
+        Returns:
+            Dict with inserted/updated/unchanged counts and the number of changed districts
+        """
+        if granularity not in TIMESERIES_GRANULARITIES:
+            raise ValueError(f"Unknown granularity '{granularity}'; expected one of {TIMESERIES_GRANULARITIES}")
+        if not records:
+            return {'inserted': 0, 'updated': 0, 'unchanged': 0, 'changed_districts': 0}
+        
+        location_ids = self._resolve_location_ids((record['state'], record['district']) for record in records)
+        rows = {
+            (location_ids[(record['state'], record['district'])], record['period_start']):
+                (int(record.get('cases_examined') or 0), int(record.get('cases_detected') or 0))
+            for record in records
+        }
+        
+        # Existing values for the involved districts and period range, read in one query
+        involved = sorted({location_id for location_id, _ in rows})
+        periods = [period for _, period in rows]
+        placeholders = ', '.join('?' for _ in involved)
+        self.cursor.execute(f'''
+            SELECT location_id, period_start, cases_examined, cases_detected
+            FROM malaria_timeseries
+            WHERE granularity = ? AND location_id IN ({placeholders}) AND period_start BETWEEN ? AND ?
+        ''', [granularity] + involved + [min(periods), max(periods)])
+        existing = {(row[0], row[1]): (row[2], row[3]) for row in self.cursor.fetchall()}
+        
+        changed = {key: values for key, values in rows.items() if existing.get(key) != values}
+        inserted = sum(1 for key in changed if key not in existing)
+        try:
+            self.cursor.executemany('''
+                INSERT INTO malaria_timeseries
+                (location_id, granularity, period_start, cases_examined, cases_detected)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (location_id, granularity, period_start) DO UPDATE SET
+                    cases_examined = excluded.cases_examined,
+                    cases_detected = excluded.cases_detected
+            ''', [
+                (location_id, granularity, period, examined, detected)
+                for (location_id, period), (examined, detected) in changed.items()
+            ])
+            changed_years = sorted({(location_id, int(period[:4])) for location_id, period in changed})
+            self.cursor.executemany('''
+                INSERT INTO data_change_log (location_id, year, change_type)
+                VALUES (?, ?, ?)
+            ''', [(location_id, year, granularity) for location_id, year in changed_years])
+            changed_locations = sorted({location_id for location_id, _ in changed_years})
+            self.delete_precomputed_forecasts(changed_locations, commit=False)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        
+        return {
+            'inserted': inserted,
+            'updated': len(changed) - inserted,
+            'unchanged': len(rows) - len(changed),
+            'changed_districts': len(changed_locations)
+        }
+    
+    def get_timeseries(self, state: str, granularity: str, district: Optional[str] = None,
+                       start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """
+        Get surveillance counts of a state's districts for a period range in columnar form
+        
+        Each district is read as one primary-key range scan (location_id,
+        granularity, period_start).
+        
+        Args:
+            state: State name
+            granularity: 'weekly' or 'monthly'
+            district: Optional district name
+            start/end: Inclusive ISO dates bounding period_start (None for open)
+        
+        Returns:
+            One dict per district with data: location_id, district, state and the
+            period_start, cases_examined and cases_detected lists in period order
+        """
+        query = '''
+            SELECT l.location_id, l.district, t.period_start, t.cases_examined, t.cases_detected
+            FROM location l
+            JOIN malaria_timeseries t
+              ON t.location_id = l.location_id AND t.granularity = ?
+             AND t.period_start BETWEEN ? AND ?
+            WHERE l.state = ?
+        '''
+        params = [granularity, start or '0000-00-00', end or '9999-99-99', state]
+        if district:
+            query += ' AND l.district = ?'
+            params.append(district)
+        self.cursor.execute(query + ' ORDER BY l.location_id, t.period_start', params)
+        
+        series = {}
+        for location_id, district_name, period, examined, detected in self.cursor.fetchall():
+            columns = series.setdefault(location_id, {
+                'location_id': location_id,
+                'district': district_name,
+                'state': state,
+                'period_start': [],
+                'cases_examined': [],
+                'cases_detected': []
+            })
+            columns['period_start'].append(period)
+            columns['cases_examined'].append(examined)
+            columns['cases_detected'].append(detected)
+        return list(series.values())
+    
+    def get_seasonal_profile(self, location_id: int, min_months: int = 12) -> Optional[List[float]]:
+        """
+        Share of a district's detected cases falling in each calendar month
+        
+        Uses monthly data, or weekly data rolled up by the month a week starts
+        in when there is no monthly feed.
+        
+        Returns:
+            12 shares (January first), or None with fewer than min_months months of data
+        """
+        return self.get_seasonal_profiles([location_id], min_months).get(location_id)
+    
+    def get_seasonal_profiles(self, location_ids: List[int], min_months: int = 12) -> Dict[int, List[float]]:
+        """
+        Seasonal profiles (see get_seasonal_profile) for many districts with one grouped query
+        
+        Returns:
+            Dict of location_id -> 12 shares; districts without enough data are left out
+        """
+        if not location_ids:
+            return {}
+        placeholders = ', '.join('?' for _ in location_ids)
+        self.cursor.execute(f'''
+            SELECT location_id, granularity, CAST(substr(period_start, 6, 2) AS INTEGER),
+                   SUM(cases_detected), COUNT(DISTINCT substr(period_start, 1, 7))
+            FROM malaria_timeseries
+            WHERE location_id IN ({placeholders})
+            GROUP BY 1, 2, 3
+        ''', list(location_ids))
+        by_location = {}
+        for location_id, granularity, month, detected, months in self.cursor.fetchall():
+            by_location.setdefault(location_id, {}).setdefault(granularity, {})[month] = (detected, months)
+        
+        profiles = {}
+        for location_id, by_granularity in by_location.items():
+            monthly = by_granularity.get('monthly') or by_granularity.get('weekly')
+            if not monthly or sum(months for _, months in monthly.values()) < min_months:
+                continue
+            total = sum(detected for detected, _ in monthly.values())
+            if total:
+                profiles[location_id] = [round(monthly.get(month, (0, 0))[0] / total, 3) for month in range(1, 13)]
+        return profiles
+    
+    def get_latest_change_id(self) -> int:
+        """Get the newest data_change_log entry id (0 when empty)"""
+        self.cursor.execute('SELECT COALESCE(MAX(change_id), 0) FROM data_change_log')
+        return self.cursor.fetchone()[0]
+    
+    def get_changes_since(self, change_id: int) -> Tuple[int, List[int], List[str]]:
+        """
+        Get locations changed by delta ingests after a given change_id
+        
+        Returns:
+            (latest change_id seen, distinct location_ids changed since change_id,
+             distinct states of those locations)
+        """
+        self.cursor.execute('''
+            SELECT MAX(change_id), GROUP_CONCAT(DISTINCT location_id)
+            FROM data_change_log WHERE change_id > ?
+        ''', (change_id,))
+        latest, location_ids = self.cursor.fetchone()
+        if latest is None:
+            return change_id, [], []
+        location_ids = [int(location_id) for location_id in location_ids.split(',')]
+        placeholders = ', '.join('?' for _ in location_ids)
+        self.cursor.execute(
+            f'SELECT DISTINCT state FROM location WHERE location_id IN ({placeholders})', location_ids
+        )
+        return latest, location_ids, [row[0] for row in self.cursor.fetchall()]
+    
+    def initialize(self, data_path: str):
+        """
+        Apply pending schema migrations, then load the malaria data if the
+        database is empty, build missing rollups, evaluate outbreak alerts and
+        add default users
+        
+        Run once per deployment (by the launcher before workers start, or by
+        the API on startup when running as a single process). Migrations are
+        recorded in schema_migrations and seeding in app_meta, so later starts
+        cost two lookups.
+        
+        Args:
+            data_path: Path to the malaria JSON data file
+        
+        Returns:
+            True if anything ran, False if the database was already up to date
+        """
+        # Imported here so database.py only needs sqlite3/numpy at import time
+        from migrations import MigrationRunner
+        from outbreak_alerts import OutbreakAlertEngine
+        
+        applied = MigrationRunner(self).run()
+        if not applied and self.get_meta('init_version') == str(INIT_VERSION):
+            return False
+        
+        # Check if data already loaded
+        self.cursor.execute('SELECT COUNT(*) FROM malaria_state_data')
+        count = self.cursor.fetchone()[0]
+        
+        if count == 0:
+            print("Loading malaria data from JSON...")
+            self.load_json_data(data_path)
+        else:
+            print(f"Database already contains {count} records")
+            if not self.has_rollups():
+                print("Building state/district rollup tables...")
+                self.refresh_rollups()
+        
+        alert_summary = OutbreakAlertEngine(self).run()
+        print(f"✓ Outbreak alerts: {alert_summary['active']} active across {alert_summary['districts']} districts")
+        
+        # Add default users
+        self.add_default_users()
+        
+        self.set_meta('init_version', str(INIT_VERSION))
+        return True
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        """Read an app_meta marker (None if unset or the table does not exist yet)"""
+        try:
+            self.cursor.execute('SELECT value FROM app_meta WHERE key = ?', (key,))
+        except sqlite3.OperationalError:
+            return None
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, key: str, value: str):
+        """Write an app_meta marker"""
+        self.cursor.execute('''
+            INSERT INTO app_meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        ''', (key, value))
+        self.conn.commit()
+    
+    def has_rollups(self) -> bool:
+        """Check whether the rollup tables have been populated"""
+        self.cursor.execute('SELECT 1 FROM state_year_summary LIMIT 1')
+        return self.cursor.fetchone() is not None
         
     def add_default_users(self):
         """Add default admin user to user table"""
@@ -216,7 +729,7 @@ class DatabaseManager:
                 SELECT l.state, l.district, m.year, m.cases_examined, 
                        m.cases_detected, m.male_case_examined, 
                        m.female_case_examined, m.male_case_detected, 
-                       m.female_case_detected
+                       m.female_case_detected, l.location_id
                 FROM malaria_state_data m
                 JOIN location l ON m.location_id = l.location_id
                 WHERE l.district = ? AND l.state = ?
@@ -227,7 +740,7 @@ class DatabaseManager:
                 SELECT l.state, l.district, m.year, m.cases_examined, 
                        m.cases_detected, m.male_case_examined, 
                        m.female_case_examined, m.male_case_detected, 
-                       m.female_case_detected
+                       m.female_case_detected, l.location_id
                 FROM malaria_state_data m
                 JOIN location l ON m.location_id = l.location_id
                 WHERE l.district = ?
@@ -243,6 +756,7 @@ class DatabaseManager:
         result = {
             'district': district,
             'state': rows[0][0] if rows else None,
+            'location_id': rows[0][9] if rows else None,
             'years': []
         }
         
@@ -257,8 +771,243 @@ class DatabaseManager:
                 'female_case_detected': row[8]
             })
         
+        # Monthly pattern from the time-series store, when the district has one
+        seasonality = self.get_seasonal_profile(result['location_id'])
+        if seasonality:
+            result['seasonality'] = seasonality
+        
         return result
     
+    def get_districts_data(self, locations: Optional[List[Tuple[str, Optional[str]]]] = None,
+                           state: Optional[str] = None) -> Dict[Tuple[str, str], Dict]:
+        """
+        Get malaria data for many districts in a single query
+        
+        Args:
+            locations: List of (district, state) pairs; state may be None to match by district only
+            state: Optional state name; restricts results to districts of this state
+            
+        Returns:
+            Dict keyed by (district, state) with the same shape as get_district_data
+        """
+        conditions = []
+        params = []
+        if locations:
+            location_conditions = []
+            for district, location_state in locations:
+                if location_state:
+                    location_conditions.append('(l.district = ? AND l.state = ?)')
+                    params.extend([district, location_state])
+                else:
+                    location_conditions.append('l.district = ?')
+                    params.append(district)
+            conditions.append('(' + ' OR '.join(location_conditions) + ')')
+        if state:
+            conditions.append('l.state = ?')
+            params.append(state)
+        if not conditions:
+            return {}
+        
+        self.cursor.execute(f'''
+            SELECT l.state, l.district, m.year, m.cases_examined, 
+                   m.cases_detected, m.male_case_examined, 
+                   m.female_case_examined, m.male_case_detected, 
+                   m.female_case_detected, l.location_id
+            FROM malaria_state_data m
+            JOIN location l ON m.location_id = l.location_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY l.location_id, m.year DESC
+        ''', params)
+        
+        return self._attach_seasonality(self._group_district_rows(self.cursor.fetchall()))
+    
+    def get_state_data(self, state: str, as_arrays: bool = False) -> Dict:
+        """
+        Get malaria data for every district of a state in a single query
+        
+        Args:
+            state: State name
+            as_arrays: Return columnar NumPy arrays instead of per-district dicts
+            
+        Returns:
+            Dict of district name -> get_district_data-shaped dict, or when
+            as_arrays is True a dict with 'state', 'districts', 'location_ids',
+            'district_index' (row -> position in 'districts') and one int64 array
+            per metric column ('year', 'cases_examined', ...), rows ordered by
+            district then year DESC
+        """
+        self.cursor.execute('''
+            SELECT l.state, l.district, m.year, m.cases_examined, 
+                   m.cases_detected, m.male_case_examined, 
+                   m.female_case_examined, m.male_case_detected, 
+                   m.female_case_detected, l.location_id
+            FROM malaria_state_data m
+            JOIN location l ON m.location_id = l.location_id
+            WHERE l.state = ?
+            ORDER BY l.district, m.year DESC
+        ''', (state,))
+        rows = self.cursor.fetchall()
+        
+        if not as_arrays:
+            grouped = self._attach_seasonality(self._group_district_rows(rows))
+            return {district: data for (district, _), data in grouped.items()}
+        
+        columns = ['year', 'cases_examined', 'cases_detected', 'male_case_examined',
+                   'female_case_examined', 'male_case_detected', 'female_case_detected']
+        values = {column: [] for column in columns}
+        districts, location_ids, district_index = [], [], []
+        for row in rows:
+            if not districts or districts[-1] != row[1]:
+                districts.append(row[1])
+                location_ids.append(row[9])
+            district_index.append(len(districts) - 1)
+            for offset, column in enumerate(columns, start=2):
+                values[column].append(row[offset])
+        
+        result = {
+            'state': state,
+            'districts': np.array(districts, dtype=object),
+            'location_ids': np.array(location_ids, dtype=np.int64),
+            'district_index': np.array(district_index, dtype=np.int64)
+        }
+        for column in columns:
+            result[column] = np.array(values[column], dtype=np.int64)
+        return result
+    
+    def _attach_seasonality(self, grouped: Dict[Tuple[str, str], Dict]) -> Dict[Tuple[str, str], Dict]:
+        """Add 'seasonality' to every grouped district that has a seasonal profile"""
+        location_ids = [district_data['location_id'] for district_data in grouped.values()]
+        profiles = {}
+        # Stay below SQLite's bound parameter limit
+        for start in range(0, len(location_ids), 500):
+            profiles.update(self.get_seasonal_profiles(location_ids[start:start + 500]))
+        for district_data in grouped.values():
+            if district_data['location_id'] in profiles:
+                district_data['seasonality'] = profiles[district_data['location_id']]
+        return grouped
+    
+    def _group_district_rows(self, rows) -> Dict[Tuple[str, str], Dict]:
+        """Group (state, district, year, ..., location_id) rows into per-district dicts in one pass"""
+        result = {}
+        for row in rows:
+            key = (row[1], row[0])
+            district_data = result.get(key)
+            if district_data is None:
+                district_data = result[key] = {
+                    'district': row[1],
+                    'state': row[0],
+                    'location_id': row[9],
+                    'years': []
+                }
+            district_data['years'].append({
+                'year': row[2],
+                'cases_examined': row[3],
+                'cases_detected': row[4],
+                'male_case_examined': row[5],
+                'female_case_examined': row[6],
+                'male_case_detected': row[7],
+                'female_case_detected': row[8]
+            })
+        return result
+    
+    def get_precomputed_forecasts(self, location_ids: List[int],
+                                  max_age_seconds: Optional[int] = None) -> Dict[int, Dict]:
+        """
+        Get stored forecast results keyed by location_id
+        
+        Args:
+            location_ids: Locations to look up
+            max_age_seconds: Skip rows generated longer ago than this (no limit when None)
+        """
+        if not location_ids:
+            return {}
+        placeholders = ', '.join('?' for _ in location_ids)
+        params = list(location_ids)
+        query = f'''
+            SELECT location_id, forecast_result FROM precomputed_forecasts
+            WHERE location_id IN ({placeholders})
+        '''
+        if max_age_seconds is not None:
+            query += " AND generated_at >= datetime('now', ?)"
+            params.append(f'-{int(max_age_seconds)} seconds')
+        self.cursor.execute(query, params)
+        return {row[0]: json.loads(row[1]) for row in self.cursor.fetchall()}
+    
+    def delete_precomputed_forecasts(self, location_ids: List[int], commit: bool = True):
+        """Drop stored forecast results for the given locations"""
+        if location_ids:
+            self.cursor.executemany(
+                'DELETE FROM precomputed_forecasts WHERE location_id = ?',
+                [(location_id,) for location_id in location_ids]
+            )
+        if commit:
+            self.conn.commit()
+    
+    def save_precomputed_forecasts(self, forecasts: Dict[int, Dict]):
+        """Store forecast results keyed by location_id in one transaction"""
+        if not forecasts:
+            return
+        self.cursor.executemany('''
+            INSERT OR REPLACE INTO precomputed_forecasts (location_id, forecast_result, generated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+        ''', [(location_id, json.dumps(result)) for location_id, result in forecasts.items()])
+        self.conn.commit()
+    
+    def get_state_summary(self, state: str) -> List[Dict]:
+        """Get per-year totals for a state from the rollup table, latest year first"""
+        self.cursor.execute('''
+            SELECT year, district_count, cases_examined, cases_detected,
+                   male_case_detected, female_case_detected, test_positivity_rate
+            FROM state_year_summary
+            WHERE state = ?
+            ORDER BY year DESC
+        ''', (state,))
+        return [{
+            'year': row[0],
+            'district_count': row[1],
+            'cases_examined': row[2],
+            'cases_detected': row[3],
+            'male_case_detected': row[4],
+            'female_case_detected': row[5],
+            'test_positivity_rate': row[6]
+        } for row in self.cursor.fetchall()]
+    
+    def get_top_districts(self, state: str, year: Optional[int] = None, limit: int = 5) -> List[Dict]:
+        """
+        Get the most affected districts of a state from the rollup table
+        
+        Args:
+            state: State name
+            year: Year to rank; defaults to the latest year on record for the state
+            limit: Number of districts to return
+            
+        Returns:
+            List of district rollup rows ordered by rank within the state
+        """
+        if year is None:
+            self.cursor.execute('SELECT MAX(year) FROM state_year_summary WHERE state = ?', (state,))
+            year = self.cursor.fetchone()[0]
+            if year is None:
+                return []
+        
+        self.cursor.execute('''
+            SELECT district, year, cases_examined, cases_detected,
+                   yoy_growth, test_positivity_rate, state_rank
+            FROM district_year_summary
+            WHERE state = ? AND year = ?
+            ORDER BY state_rank
+            LIMIT ?
+        ''', (state, year, limit))
+        return [{
+            'district': row[0],
+            'year': row[1],
+            'cases_examined': row[2],
+            'cases_detected': row[3],
+            'yoy_growth': row[4],
+            'test_positivity_rate': row[5],
+            'state_rank': row[6]
+        } for row in self.cursor.fetchall()]
+    
     def get_all_districts(self) -> List[Dict]:
         """Get all districts and states"""
         self.cursor.execute('SELECT DISTINCT state, district FROM location ORDER BY state, district')
@@ -292,6 +1041,169 @@ class DatabaseManager:
         result = self.cursor.fetchone()
         return result[0] if result else None
     
+    def _known_location_rows(self, rows: List[Dict]) -> Tuple[List[Tuple[int, Dict]], List[Tuple[str, str]]]:
+        """
+        Match rows to existing locations by (state, district) without creating any
+        
+        Returns:
+            ((location_id, row) for known locations, sorted unknown (state, district) pairs)
+        """
+        self.cursor.execute('SELECT state, district, location_id FROM location')
+        location_ids = {(row[0], row[1]): row[2] for row in self.cursor.fetchall()}
+        known, unknown = [], set()
+        for row in rows:
+            location_id = location_ids.get((row['state'], row['district']))
+            if location_id is None:
+                unknown.add((row['state'], row['district']))
+            else:
+                known.append((location_id, row))
+        return known, sorted(unknown)
+    
+    def upsert_district_geometry(self, rows: List[Dict]) -> Tuple[int, List[Tuple[str, str]]]:
+        """
+        Store district centroids (the R-tree is maintained by triggers)
+        
+        Only existing locations are updated; rows for unknown districts (e.g.
+        misspelled names) are skipped rather than creating new locations.
+        
+        Args:
+            rows: Dicts with state, district, latitude and longitude
+        
+        Returns:
+            (number of districts written, skipped unknown (state, district) pairs)
+        """
+        known, unknown = self._known_location_rows(rows)
+        self.cursor.executemany('''
+            INSERT INTO district_geometry (location_id, latitude, longitude)
+            VALUES (?, ?, ?)
+            ON CONFLICT (location_id) DO UPDATE SET
+                latitude = excluded.latitude,
+                longitude = excluded.longitude
+        ''', [
+            (location_id, row['latitude'], row['longitude'])
+            for location_id, row in known
+        ])
+        self.conn.commit()
+        return len(known), unknown
+    
+    def upsert_facilities(self, rows: List[Dict]) -> Tuple[int, List[Tuple[str, str]]]:
+        """
+        Store health facilities, matched on (district, name)
+        
+        Facilities in unknown districts are skipped (see upsert_district_geometry).
+        
+        Args:
+            rows: Dicts with name, facility_type, state, district, latitude and longitude
+        
+        Returns:
+            (number of facilities written, skipped unknown (state, district) pairs)
+        """
+        known, unknown = self._known_location_rows(rows)
+        self.cursor.executemany('''
+            INSERT INTO facilities (name, facility_type, location_id, latitude, longitude)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (location_id, name) DO UPDATE SET
+                facility_type = excluded.facility_type,
+                latitude = excluded.latitude,
+                longitude = excluded.longitude
+        ''', [
+            (row['name'], row.get('facility_type') or 'hospital', location_id, row['latitude'], row['longitude'])
+            for location_id, row in known
+        ])
+        self.conn.commit()
+        return len(known), unknown
+    
+    def get_district_centroid(self, location_id: int) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) of a district, or None when it has no geometry"""
+        self.cursor.execute(
+            'SELECT latitude, longitude FROM district_geometry WHERE location_id = ?', (location_id,)
+        )
+        row = self.cursor.fetchone()
+        return (row[0], row[1]) if row else None
+    
+    def _nearest(self, query: str, params: List, latitude: float, longitude: float,
+                 k: int, max_km: float) -> List[Dict]:
+        """
+        k nearest rows of an R-tree query, searching a growing box around the point
+        
+        Args:
+            query: SELECT with latitude/longitude columns whose first four placeholders
+                are the box (min_lat, max_lat, min_lon, max_lon) against the R-tree
+            params: Parameters following the box
+        
+        Returns:
+            Up to k rows as dicts with distance_km, nearest first, none beyond max_km
+        """
+        from geo import bounding_box, haversine_km
+        
+        radius = min(25.0, max_km)
+        while True:
+            self.cursor.execute(query, list(bounding_box(latitude, longitude, radius)) + list(params))
+            within = []
+            for row in self.cursor.fetchall():
+                result = dict(row)
+                result['distance_km'] = round(
+                    haversine_km(latitude, longitude, result['latitude'], result['longitude']), 2
+                )
+                if result['distance_km'] <= radius:
+                    within.append(result)
+            # Everything within the radius is in the box, so k hits inside it are the k nearest
+            if len(within) >= k or radius >= max_km:
+                return sorted(within, key=lambda result: result['distance_km'])[:k]
+            radius = min(radius * 2, max_km)
+    
+    def get_nearest_facilities(self, latitude: float, longitude: float, k: int = 5,
+                               facility_type: Optional[str] = None, max_km: float = 500) -> List[Dict]:
+        """
+        Get the k facilities nearest to a point
+        
+        Args:
+            latitude/longitude: Point in degrees
+            k: Number of facilities
+            facility_type: Only facilities of this type (e.g. hospital)
+            max_km: Search radius limit
+        
+        Returns:
+            Facilities with district, state and distance_km, nearest first
+        """
+        query = '''
+            SELECT f.facility_id, f.name, f.facility_type, l.district, l.state, f.latitude, f.longitude
+            FROM facilities_rtree r
+            JOIN facilities f ON f.facility_id = r.facility_id
+            JOIN location l ON f.location_id = l.location_id
+            WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?
+        '''
+        params = []
+        if facility_type:
+            query += ' AND f.facility_type = ?'
+            params.append(facility_type)
+        return self._nearest(query, params, latitude, longitude, k, max_km)
+    
+    def get_neighbor_districts(self, location_id: int, k: int = 5, max_km: float = 150) -> List[Dict]:
+        """
+        Get the districts whose centroids are nearest to a district's centroid
+        
+        Args:
+            location_id: District
+            k: Number of neighbours
+            max_km: Maximum centroid distance
+        
+        Returns:
+            Neighbouring districts with state and distance_km, nearest first
+            (empty when the district has no geometry)
+        """
+        centroid = self.get_district_centroid(location_id)
+        if centroid is None:
+            return []
+        return self._nearest('''
+            SELECT g.location_id, l.district, l.state, g.latitude, g.longitude
+            FROM district_geometry_rtree r
+            JOIN district_geometry g ON g.location_id = r.location_id
+            JOIN location l ON g.location_id = l.location_id
+            WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?
+              AND g.location_id != ?
+        ''', [location_id], centroid[0], centroid[1], k, max_km)
+    
     def create_user(self, first_name: str, last_name: str, username: str, 
                    password: str, district: str, state: str, role: str = 'analyst') -> Optional[Dict]:
         """
@@ -366,6 +1278,385 @@ class DatabaseManager:
             'role': user[6]
         }
     
+    def _service_request_where(self, filters: Dict, date_column: str, day_column: bool) -> Tuple[str, List]:
+        """Build the WHERE clause shared by the request list and its count"""
+        clauses = []
+        params = []
+        for column in SERVICE_REQUEST_FILTERS:
+            value = filters.get(column)
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        
+        # Dates are whole days (YYYY-MM-DD), both ends inclusive
+        if filters.get('date_from'):
+            clauses.append(f'{date_column} >= ?')
+            params.append(filters['date_from'])
+        if filters.get('date_to'):
+            if day_column:
+                clauses.append(f'{date_column} <= ?')
+            else:
+                clauses.append(f"{date_column} < date(?, '+1 day')")
+            params.append(filters['date_to'])
+        
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+    
+    def list_service_requests(self, after_id: Optional[int] = None, limit: int = 50, **filters) -> Dict:
+        """
+        Get one page of service requests, newest first
+        
+        Pages are keyed on request_id, so every page costs the same however
+        deep the client has paged, and the total comes from the
+        trigger-maintained service_request_counts table instead of a scan.
+        
+        Args:
+            after_id: next_cursor from the previous page (None for the first page)
+            limit: Page size
+            **filters: Any of user_id, status, escalation_level, district, state,
+                date_from, date_to (YYYY-MM-DD)
+        
+        Returns:
+            Dict with 'requests', 'total' and 'next_cursor' (None on the last page)
+        """
+        where, params = self._service_request_where(filters, 'created_at', day_column=False)
+        if after_id is not None:
+            where += (' AND ' if where else ' WHERE ') + 'request_id < ?'
+            params.append(after_id)
+        
+        # Read one extra row to know whether another page follows
+        self.cursor.execute(f'''
+            SELECT request_id, user_id, username, role, district, state, request_item,
+                   request_details, status, escalation_level, escalated_at, created_at, assigned_to
+            FROM service_requests{where}
+            ORDER BY request_id DESC
+            LIMIT ?
+        ''', params + [limit + 1])
+        rows = self.cursor.fetchall()
+        
+        requests = [{
+            'request_id': row[0],
+            'user_id': row[1],
+            'username': row[2],
+            'role': row[3],
+            'district': row[4],
+            'state': row[5],
+            'request_item': row[6],
+            'request_details': row[7],
+            'status': row[8],
+            'escalation_level': row[9],
+            'escalated_at': row[10],
+            'created_at': row[11],
+            'assigned_to': row[12],
+            'can_escalate': row[8] == 'pending'
+        } for row in rows[:limit]]
+        
+        return {
+            'requests': requests,
+            'total': self.count_service_requests(**filters),
+            'next_cursor': requests[-1]['request_id'] if len(rows) > limit else None
+        }
+    
+    def count_service_requests(self, **filters) -> int:
+        """Count service requests matching the list filters from the maintained counts"""
+        where, params = self._service_request_where(filters, 'created_day', day_column=True)
+        self.cursor.execute(f'SELECT COALESCE(SUM(request_count), 0) FROM service_request_counts{where}', params)
+        return self.cursor.fetchone()[0]
+    
+    def record_service_request_audit(self, entries: List[Tuple], commit: bool = True):
+        """
+        Append rows to the service request audit trail
+        
+        Args:
+            entries: (request_id, action, old_value, new_value, actor) tuples
+            commit: Commit immediately (False when part of a larger transaction)
+        """
+        if entries:
+            self.cursor.executemany('''
+                INSERT INTO service_request_audit (request_id, action, old_value, new_value, actor)
+                VALUES (?, ?, ?, ?, ?)
+            ''', entries)
+        if commit:
+            self.conn.commit()
+    
+    def escalate_stale_service_requests(self, cutoffs: List[str], actor: str = 'scheduler') -> List[Tuple[int, int]]:
+        """
+        Move every pending request that has waited too long at its level up one level
+        
+        All levels are handled by one UPDATE (each OR branch is an index range
+        on idx_service_requests_stale), and the escalated rows are audited in
+        the same transaction.
+        
+        Args:
+            cutoffs: For level i, requests escalated (or created) before cutoffs[i]
+                move to level i + 1; timestamps as 'YYYY-MM-DD HH:MM:SS' UTC
+            actor: Name recorded in the audit trail
+        
+        Returns:
+            (request_id, new escalation level) for each escalated request
+        """
+        if not cutoffs:
+            return []
+        branches = ' OR '.join(
+            f"(status = 'pending' AND escalation_level = {level} AND COALESCE(escalated_at, created_at) < ?)"
+            for level in range(len(cutoffs))
+        )
+        try:
+            self.cursor.execute(f'''
+                UPDATE service_requests
+                SET escalation_level = escalation_level + 1,
+                    escalated_at = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE {branches}
+                RETURNING request_id, escalation_level
+            ''', list(cutoffs))
+            escalated = [(row[0], row[1]) for row in self.cursor.fetchall()]
+            self.record_service_request_audit(
+                [(request_id, 'escalate', str(level - 1), str(level), actor) for request_id, level in escalated],
+                commit=False
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return escalated
+    
+    def get_outbreak_alerts(self, state: str, district: Optional[str] = None,
+                            severity: Optional[str] = None) -> List[Dict]:
+        """Get stored outbreak alerts for a state (or one district), most severe and largest first"""
+        return self.get_outbreak_alert_events(
+            0, limit=-1, state=state, district=district, severity=severity,
+            order_by="CASE severity WHEN 'critical' THEN 0 WHEN 'warning' THEN 1 ELSE 2 END, cases_detected DESC"
+        )
+    
+    def get_outbreak_alert_events(self, after_alert_id: int, limit: int = 500, state: Optional[str] = None,
+                                  district: Optional[str] = None, severity: Optional[str] = None,
+                                  order_by: str = 'alert_id') -> List[Dict]:
+        """
+        Get outbreak alerts written after a cursor
+        
+        Args:
+            after_alert_id: Last alert_id already seen
+            limit: Max alerts to return (-1 for all)
+            state/district/severity: Only alerts matching these
+            order_by: ORDER BY clause (alert_id order for streaming)
+        
+        Returns:
+            Alert dicts
+        """
+        clauses = ['alert_id > ?']
+        params = [after_alert_id]
+        for column, value in (('state', state), ('district', district), ('severity', severity)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        self.cursor.execute(f'''
+            SELECT alert_id, location_id, state, district, year, severity, signals, cases_detected,
+                   yoy_growth, test_positivity_rate, z_score, created_at
+            FROM outbreak_alerts
+            WHERE {' AND '.join(clauses)}
+            ORDER BY {order_by}
+            LIMIT ?
+        ''', params + [limit])
+        return [{
+            'alert_id': row[0],
+            'location_id': row[1],
+            'state': row[2],
+            'district': row[3],
+            'year': row[4],
+            'severity': row[5],
+            'signals': row[6].split(','),
+            'cases_detected': row[7],
+            'yoy_growth': row[8],
+            'test_positivity_rate': row[9],
+            'z_score': row[10],
+            'created_at': row[11]
+        } for row in self.cursor.fetchall()]
+    
+    def get_latest_alert_id(self) -> int:
+        """Highest outbreak_alerts id (0 when empty)"""
+        self.cursor.execute('SELECT MAX(alert_id) FROM outbreak_alerts')
+        return self.cursor.fetchone()[0] or 0
+    
+    def get_service_request_events(self, after_audit_id: int, limit: int = 500, user_id: Optional[int] = None,
+                                   state: Optional[str] = None, district: Optional[str] = None) -> List[Dict]:
+        """
+        Get audit trail entries newer than a cursor with the request's current state
+        
+        Args:
+            after_audit_id: Last audit_id already seen
+            limit: Max entries to return
+            user_id/state/district: Only requests of this user / in this location
+        
+        Returns:
+            Events in audit_id order
+        """
+        clauses = ['a.audit_id > ?']
+        params = [after_audit_id]
+        for column, value in (('user_id', user_id), ('state', state), ('district', district)):
+            if value is not None:
+                clauses.append(f'r.{column} = ?')
+                params.append(value)
+        self.cursor.execute(f'''
+            SELECT a.audit_id, a.request_id, a.action, a.old_value, a.new_value, a.actor, a.created_at,
+                   r.user_id, r.username, r.district, r.state, r.request_item, r.status,
+                   r.escalation_level, r.assigned_to
+            FROM service_request_audit a
+            JOIN service_requests r ON r.request_id = a.request_id
+            WHERE {' AND '.join(clauses)}
+            ORDER BY a.audit_id
+            LIMIT ?
+        ''', params + [limit])
+        return [{
+            'audit_id': row[0],
+            'request_id': row[1],
+            'action': row[2],
+            'old_value': row[3],
+            'new_value': row[4],
+            'actor': row[5],
+            'created_at': row[6],
+            'user_id': row[7],
+            'username': row[8],
+            'district': row[9],
+            'state': row[10],
+            'request_item': row[11],
+            'status': row[12],
+            'escalation_level': row[13],
+            'assigned_to': row[14]
+        } for row in self.cursor.fetchall()]
+    
+    def get_latest_audit_id(self) -> int:
+        """Highest service_request_audit id (0 when empty)"""
+        self.cursor.execute('SELECT MAX(audit_id) FROM service_request_audit')
+        return self.cursor.fetchone()[0] or 0
+    
+    def create_service_requests(self, user: Dict,
+                                items: List[Tuple[str, Optional[str], Optional[str]]]) -> Tuple[List[int], int]:
+        """
+        Insert service requests for one user in a single transaction
+        
+        Items with a client_id are idempotent: resubmitting the same client_id
+        returns the request created the first time instead of a duplicate.
+        
+        Args:
+            user: Dict with user_id, username, role, district and state
+            items: (request_item, request_details, client_id or None) tuples
+        
+        Returns:
+            (request_ids in the order of items, number of requests newly created)
+        """
+        return self.insert_service_requests([
+            # Client ids are only unique per user, so they are namespaced by user_id
+            dict(user, request_item=item, request_details=details,
+                 queue_id=f"client:{user['user_id']}:{client_id}" if client_id else None)
+            for item, details, client_id in items
+        ])
+    
+    def insert_service_requests(self, rows: List[Dict]) -> Tuple[List[int], int]:
+        """
+        Insert service requests (any users) in a single transaction
+        
+        Rows carrying a queue_id that is already stored are not inserted again,
+        so replaying a write-behind journal or resubmitting a client batch never
+        duplicates requests.
+        
+        Args:
+            rows: Dicts with user_id, username, role, district, state,
+                request_item, request_details and optionally queue_id
+        
+        Returns:
+            (request_ids in the order of rows, with the existing id for rows
+             already stored; number of requests newly created)
+        """
+        if not rows:
+            return [], 0
+        try:
+            request_ids = []
+            created = []
+            for row in rows:
+                self.cursor.execute('''
+                    INSERT INTO service_requests
+                    (user_id, username, role, district, state, request_item, request_details,
+                     status, escalation_level, queue_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', 0, ?)
+                    ON CONFLICT(queue_id) DO NOTHING
+                    RETURNING request_id
+                ''', (row['user_id'], row['username'], row['role'], row['district'], row['state'],
+                      row['request_item'], row.get('request_details'), row.get('queue_id')))
+                inserted = self.cursor.fetchone()
+                request_ids.append(inserted[0] if inserted else None)
+                if inserted:
+                    created.append((inserted[0], 'create', None, 'pending', row['username']))
+            
+            existing = [row['queue_id'] for row, request_id in zip(rows, request_ids) if request_id is None]
+            if existing:
+                placeholders = ', '.join('?' for _ in existing)
+                self.cursor.execute(
+                    f'SELECT queue_id, request_id FROM service_requests WHERE queue_id IN ({placeholders})',
+                    existing
+                )
+                ids_by_queue_id = dict(self.cursor.fetchall())
+                request_ids = [
+                    request_id if request_id is not None else ids_by_queue_id[row['queue_id']]
+                    for row, request_id in zip(rows, request_ids)
+                ]
+            self.record_service_request_audit(created, commit=False)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return request_ids, len(created)
+    
+    def update_service_requests(self, request_ids: List[int], changes: Dict[str, Optional[str]],
+                                actor: str, state: str, district: Optional[str] = None) -> List[int]:
+        """
+        Change status and/or assignment of many requests in a single transaction
+        
+        Only requests in the given state (and district, if set) are changed;
+        every changed field is recorded in the audit trail.
+        
+        Args:
+            request_ids: Requests to change
+            changes: New values keyed by column ('status', 'assigned_to')
+            actor: Username recorded in the audit trail
+            state: State the actor supervises
+            district: District the actor supervises (None for the whole state)
+        
+        Returns:
+            request_ids that were found in scope and updated
+        """
+        columns = [column for column in ('status', 'assigned_to') if column in changes]
+        if not request_ids or not columns:
+            return []
+        
+        placeholders = ', '.join('?' for _ in request_ids)
+        scope = 'state = ?' + (' AND district = ?' if district is not None else '')
+        scope_params = [state] + ([district] if district is not None else [])
+        try:
+            self.cursor.execute(f'''
+                SELECT request_id, {', '.join(columns)} FROM service_requests
+                WHERE request_id IN ({placeholders}) AND {scope}
+            ''', list(request_ids) + scope_params)
+            current = {row[0]: row[1:] for row in self.cursor.fetchall()}
+            
+            updated = [request_id for request_id in request_ids if request_id in current]
+            self.cursor.executemany(f'''
+                UPDATE service_requests
+                SET {', '.join(f'{column} = ?' for column in columns)}, updated_at = CURRENT_TIMESTAMP
+                WHERE request_id = ?
+            ''', [tuple(changes[column] for column in columns) + (request_id,) for request_id in updated])
+            
+            self.record_service_request_audit([
+                (request_id, column, current[request_id][index], changes[column], actor)
+                for request_id in updated
+                for index, column in enumerate(columns)
+                if current[request_id][index] != changes[column]
+            ], commit=False)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return updated
+    
     def close(self):
         """Close database connection"""
         if self.conn:
@@ -0,0 +1,146 @@
+"""
+Automatic escalation of service requests left pending too long
+
+A background task on the API's event loop wakes every few seconds and moves
+every stale pending request up one level with a single UPDATE, so escalation
+no longer depends on users pressing Escalate. Each escalation is written to
+service_request_audit with actor 'scheduler'. The UPDATE runs in a worker
+thread on the scheduler's own connection, so it never blocks the event loop.
+
+Every API worker starts a scheduler, but only the one holding an exclusive
+lock on <database>.escalation-lock escalates; the others retry the lock each
+interval and take over if that worker exits. Without fcntl (Windows) every
+worker escalates, which is safe since a request escalated by one run is no
+longer stale for the next, but wastes writes.
+
+Configuration (environment):
+    ESCALATION_INTERVAL_SECONDS   Seconds between runs; 0 disables the scheduler (60)
+    ESCALATION_THRESHOLDS_HOURS   Hours a request waits at level 0, 1, 2, ... before
+                                  moving up; the count sets the top level (24,48,72)
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from database import DatabaseManager
+
+
+logger = logging.getLogger(__name__)
+
+
+def thresholds_from_env() -> List[float]:
+    """Per-level waiting times in hours from ESCALATION_THRESHOLDS_HOURS"""
+    value = os.getenv('ESCALATION_THRESHOLDS_HOURS', '24,48,72')
+    return [float(part) for part in value.split(',') if part.strip()]
+
+
+class EscalationScheduler:
+    def __init__(self, db_path: str, thresholds_hours: Optional[List[float]] = None,
+                 interval_seconds: Optional[float] = None):
+        """
+        Periodic bulk escalation of stale pending requests
+
+        Args:
+            db_path: SQLite database; the scheduler opens its own connection to it
+            thresholds_hours: Hours a request may wait at level i before moving to i + 1
+            interval_seconds: Seconds between runs
+        """
+        self.db_path = db_path
+        self.lock_path = os.path.abspath(db_path) + '.escalation-lock'
+        self.db = None
+        self._lock_file = None
+        self.thresholds_hours = thresholds_hours if thresholds_hours is not None else thresholds_from_env()
+        self.interval_seconds = (interval_seconds if interval_seconds is not None
+                                 else float(os.getenv('ESCALATION_INTERVAL_SECONDS', '60')))
+        self._task = None
+        self.runs = 0
+        self.escalated = 0
+        self.last_run_at = None
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """
+        Escalate every stale pending request once
+
+        Args:
+            now: Current UTC time (default: now)
+
+        Returns:
+            Number of requests escalated
+        """
+        now = now or datetime.utcnow()
+        if self.db is None:
+            self.db = DatabaseManager(self.db_path)
+        cutoffs = [
+            (now - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S')
+            for hours in self.thresholds_hours
+        ]
+        escalated = self.db.escalate_stale_service_requests(cutoffs)
+        self.runs += 1
+        self.escalated += len(escalated)
+        self.last_run_at = now.isoformat(timespec='seconds')
+        if escalated:
+            logger.info(f"Escalated {len(escalated)} stale service requests")
+        return len(escalated)
+
+    def _hold_lock(self) -> bool:
+        """Take (or keep) the lock that makes this process the one that escalates"""
+        if fcntl is None or self._lock_file is not None:
+            return True
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                if self._hold_lock():
+                    await asyncio.to_thread(self.tick)
+            except Exception as e:
+                # A locked database or similar only skips this run
+                logger.error(f"Escalation run failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> bool:
+        """Start the background task on the running event loop (no-op when disabled)"""
+        if self._task is not None or self.interval_seconds <= 0 or not self.thresholds_hours:
+            return False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return True
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self._task is not None,
+            'active': self._task is not None and (fcntl is None or self._lock_file is not None),
+            'interval_seconds': self.interval_seconds,
+            'thresholds_hours': self.thresholds_hours,
+            'runs': self.runs,
+            'escalated': self.escalated,
+            'last_run_at': self.last_run_at
+        }
@@ -0,0 +1,133 @@
+"""
+Push of service request changes and outbreak alerts to connected clients (Server-Sent Events)
+
+Every change to a service request is written to service_request_audit and
+every new or escalated alert to outbreak_alerts. One background task per
+worker and table reads the new rows once per poll interval and hands each
+event to the subscribers allowed to see it, so the database cost does not
+grow with the number of connected clients, and rows written by other
+workers, the escalation scheduler or an ingest run are pushed too.
+
+Configuration (environment):
+    EVENTS_POLL_SECONDS        Seconds between reads (1)
+    EVENTS_HEARTBEAT_SECONDS   Seconds between keep-alive comments on idle streams (15)
+"""
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv('EVENTS_HEARTBEAT_SECONDS', '15'))
+
+
+def event_scope(user: Dict) -> Dict:
+    """
+    Requests a user may follow: their own (ASHA), their district (DCMO) or their state (SCMO)
+
+    Returns:
+        Filter with user_id, state and/or district
+    """
+    if user['role'] == 'SCMO':
+        return {'state': user['state']}
+    if user['role'] == 'DCMO':
+        return {'state': user['state'], 'district': user['district']}
+    return {'user_id': user['user_id']}
+
+
+def in_scope(event: Dict, scope: Dict) -> bool:
+    return all(event[key] == value for key, value in scope.items())
+
+
+class EventHub:
+    def __init__(self, fetch_events: Callable[..., List[Dict]], latest_event_id: Callable[[], int],
+                 id_key: str, poll_seconds: Optional[float] = None, batch_size: int = 500):
+        """
+        Fan-out of rows from an append-only table to subscriber queues
+
+        Args:
+            fetch_events: fetch_events(after_id, limit=...) -> events in id order, each
+                with id_key and the scope fields (user_id, state, district)
+            latest_event_id: Returns the newest id in the table
+            id_key: Name of the event id field
+            poll_seconds: Seconds between reads
+            batch_size: Max events read per query
+        """
+        self.fetch_events = fetch_events
+        self.latest_event_id = latest_event_id
+        self.id_key = id_key
+        self.poll_seconds = poll_seconds if poll_seconds is not None else float(os.getenv('EVENTS_POLL_SECONDS', '1'))
+        self.batch_size = batch_size
+        self.last_event_id = 0
+        self._subscribers = {}
+        self._task = None
+        self.published = 0
+
+    def start(self):
+        """Start tailing from the current end of the table"""
+        if self._task is None:
+            self.last_event_id = self.latest_event_id()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, scope: Dict) -> asyncio.Queue:
+        """Register a client; events in scope are put on the returned queue"""
+        events = asyncio.Queue(maxsize=1000)
+        self._subscribers[events] = scope
+        return events
+
+    def unsubscribe(self, events: asyncio.Queue):
+        self._subscribers.pop(events, None)
+
+    def poll(self) -> int:
+        """Read new rows once and dispatch them; returns the number read"""
+        if not self._subscribers:
+            # Nobody listening: skip ahead so a later subscriber does not get a stale burst
+            self.last_event_id = self.latest_event_id()
+            return 0
+        events = self.fetch_events(self.last_event_id, limit=self.batch_size)
+        for event in events:
+            for subscriber, scope in list(self._subscribers.items()):
+                if in_scope(event, scope):
+                    try:
+                        subscriber.put_nowait(event)
+                    except asyncio.QueueFull:
+                        # A client that stopped reading: end its stream (None); the browser
+                        # reconnects with Last-Event-ID and catches up from the database
+                        self.unsubscribe(subscriber)
+                        while not subscriber.empty():
+                            subscriber.get_nowait()
+                        subscriber.put_nowait(None)
+        if events:
+            self.last_event_id = events[-1][self.id_key]
+            self.published += len(events)
+        return len(events)
+
+    async def _run(self):
+        while True:
+            try:
+                # A full batch means more rows are waiting; read again without sleeping
+                if self.poll() < self.batch_size:
+                    await asyncio.sleep(self.poll_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event poll for {self.id_key} failed: {str(e)}")
+                await asyncio.sleep(self.poll_seconds)
+
+    def stats(self) -> Dict:
+        return {
+            'subscribers': len(self._subscribers),
+            'last_event_id': self.last_event_id,
+            'published': self.published
+        }
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Columnar export of malaria data and service requests (Parquet / Arrow IPC)
+
+Exports read through their own read-only SQLite connection. In WAL mode a
+reader works from a snapshot and never blocks the API's writers, so analytics
+can be refreshed from the production database at any time. Rows are fetched
+and converted in batches, so memory stays flat regardless of table size.
+
+Usage:
+    python export.py [--dataset malaria] [--format parquet|arrow] [--out exports]
+
+Writes a Hive-partitioned directory per dataset (state=.../year=.../part-0.parquet)
+that pyarrow, pandas, DuckDB and Spark read as one table.
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+from typing import Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from export_datasets import EXPORT_BATCH_SIZE, EXPORT_DATASETS, EXPORT_FORMATS
+
+
+# Arrow schema per dataset, in query column order
+EXPORT_SCHEMAS = {
+    dataset: pa.schema([(column, getattr(pa, type_name)()) for column, type_name in spec['columns']])
+    for dataset, spec in EXPORT_DATASETS.items()
+}
+
+
+def open_readonly(db_path: str) -> sqlite3.Connection:
+    """Read-only connection; usable from the worker threads a streaming response iterates on"""
+    return sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, check_same_thread=False)
+
+
+def iter_batches(conn: sqlite3.Connection, dataset: str, state: Optional[str] = None,
+                 year: Optional[int] = None, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[pa.RecordBatch]:
+    """
+    Read a dataset as Arrow record batches
+
+    Args:
+        conn: SQLite connection (see open_readonly)
+        dataset: Key of EXPORT_DATASETS
+        state: Only rows of this state
+        year: Only rows of this year
+        batch_size: Rows per batch
+
+    Yields:
+        RecordBatches with the dataset's schema, ordered by state and year
+    """
+    spec = EXPORT_DATASETS[dataset]
+    schema = EXPORT_SCHEMAS[dataset]
+    conditions = []
+    params = []
+    if state:
+        conditions.append('state = ?')
+        params.append(state)
+    if year is not None:
+        conditions.append('year = ?')
+        params.append(year)
+    query = f"SELECT * FROM ({spec['query']})"
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+
+    cursor = conn.execute(query + ' ORDER BY state, year', params)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            )
+    finally:
+        cursor.close()
+
+
+class _ChunkSink:
+    """Write-only file object collecting output so it can be yielded as it is produced"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_export(db_path: str, dataset: str, fmt: str = 'arrow', state: Optional[str] = None,
+                  year: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Serialize a dataset incrementally as an Arrow IPC stream or a Parquet file
+
+    Each batch becomes one Arrow record batch or Parquet row group and is
+    yielded as soon as it is encoded.
+
+    Yields:
+        Chunks of the encoded file
+    """
+    schema = EXPORT_SCHEMAS[dataset]
+    sink = _ChunkSink()
+    conn = open_readonly(db_path)
+    try:
+        if fmt == 'parquet':
+            writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        else:
+            writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+        for batch in iter_batches(conn, dataset, state, year):
+            if fmt == 'parquet':
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            yield sink.take()
+        writer.close()
+        yield sink.take()
+    finally:
+        conn.close()
+
+
+def export_dataset(db_path: str, dataset: str, out_dir: str, fmt: str = 'parquet') -> Dict:
+    """
+    Write a dataset as a Hive-partitioned directory (state=.../year=...)
+
+    The export is written to a temporary directory next to the target and
+    swapped in when complete, so a re-export never leaves stale partitions and
+    a failed export leaves the previous one in place.
+
+    Returns:
+        Dict with the dataset name, output path and row count
+    """
+    schema = EXPORT_SCHEMAS[dataset]
+    path = os.path.join(out_dir, dataset)
+    os.makedirs(out_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f'.{dataset}-', dir=out_dir)
+    conn = open_readonly(db_path)
+    try:
+        rows = 0
+
+        def counted():
+            nonlocal rows
+            for batch in iter_batches(conn, dataset):
+                rows += batch.num_rows
+                yield batch
+
+        ds.write_dataset(
+            pa.RecordBatchReader.from_batches(schema, counted()),
+            staging,
+            format='parquet' if fmt == 'parquet' else 'ipc',
+            partitioning=ds.partitioning(pa.schema([schema.field('state'), schema.field('year')]), flavor='hive'),
+            file_options=(ds.ParquetFileFormat().make_write_options(compression='zstd') if fmt == 'parquet'
+                          else ds.IpcFileFormat().make_write_options(compression='zstd')),
+            basename_template='part-{i}.' + ('parquet' if fmt == 'parquet' else 'arrow'),
+            existing_data_behavior='overwrite_or_ignore',
+            max_partitions=100000
+        )
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(staging, path)
+    finally:
+        conn.close()
+        shutil.rmtree(staging, ignore_errors=True)
+    return {'dataset': dataset, 'path': path, 'rows': rows}
+
+
+def export_all(db_path: str, out_dir: str, datasets: List[str], fmt: str = 'parquet'):
+    """Export the given datasets and print a summary"""
+    print(f"📦 Exporting {', '.join(datasets)} as {fmt} to {out_dir}...")
+    for dataset in datasets:
+        summary = export_dataset(db_path, dataset, out_dir, fmt)
+        print(f"  ✓ {summary['dataset']}: {summary['rows']} rows -> {summary['path']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export data as partitioned Parquet/Arrow files")
+    parser.add_argument('--db', default='MALERIA.db', help="SQLite database (MALERIA.db)")
+    parser.add_argument('--out', default='exports', help="Output directory (exports)")
+    parser.add_argument('--dataset', action='append', choices=sorted(EXPORT_DATASETS),
+                        help="Dataset to export; repeat for several (default: all)")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='parquet')
+    args = parser.parse_args()
+    export_all(args.db, args.out, args.dataset or list(EXPORT_DATASETS), args.format)
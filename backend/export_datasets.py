@@ -0,0 +1,71 @@
+"""
+Datasets and formats offered by the columnar export (see export.py)
+
+Kept free of pyarrow so the API can validate /export parameters without
+loading it; columns are (name, pyarrow type name) pairs.
+"""
+
+
+EXPORT_BATCH_SIZE = 10000
+EXPORT_FORMATS = ('parquet', 'arrow')
+
+# Every dataset has state and year columns, used for partitioning and filtering
+EXPORT_DATASETS = {
+    'malaria': {
+        'query': '''
+            SELECT l.state, m.year, l.district, m.location_id, m.cases_examined, m.cases_detected,
+                   m.male_case_examined, m.female_case_examined,
+                   m.male_case_detected, m.female_case_detected
+            FROM malaria_state_data m
+            JOIN location l ON m.location_id = l.location_id
+        ''',
+        'columns': [
+            ('state', 'string'), ('year', 'int32'), ('district', 'string'),
+            ('location_id', 'int64'), ('cases_examined', 'int64'), ('cases_detected', 'int64'),
+            ('male_case_examined', 'int64'), ('female_case_examined', 'int64'),
+            ('male_case_detected', 'int64'), ('female_case_detected', 'int64')
+        ]
+    },
+    'timeseries': {
+        'query': '''
+            SELECT l.state, CAST(substr(t.period_start, 1, 4) AS INTEGER) AS year, l.district,
+                   t.location_id, t.granularity, t.period_start, t.cases_examined, t.cases_detected
+            FROM malaria_timeseries t
+            JOIN location l ON t.location_id = l.location_id
+        ''',
+        'columns': [
+            ('state', 'string'), ('year', 'int32'), ('district', 'string'),
+            ('location_id', 'int64'), ('granularity', 'string'), ('period_start', 'string'),
+            ('cases_examined', 'int64'), ('cases_detected', 'int64')
+        ]
+    },
+    'service_requests': {
+        'query': '''
+            SELECT state, CAST(strftime('%Y', created_at) AS INTEGER) AS year, district,
+                   request_id, user_id, role, request_item, request_details, status,
+                   escalation_level, assigned_to, escalated_at, created_at, updated_at
+            FROM service_requests
+        ''',
+        'columns': [
+            ('state', 'string'), ('year', 'int32'), ('district', 'string'),
+            ('request_id', 'int64'), ('user_id', 'int64'), ('role', 'string'),
+            ('request_item', 'string'), ('request_details', 'string'), ('status', 'string'),
+            ('escalation_level', 'int32'), ('assigned_to', 'string'),
+            ('escalated_at', 'string'), ('created_at', 'string'), ('updated_at', 'string')
+        ]
+    },
+    'service_request_audit': {
+        'query': '''
+            SELECT r.state, CAST(strftime('%Y', a.created_at) AS INTEGER) AS year, r.district,
+                   a.audit_id, a.request_id, a.action, a.old_value, a.new_value, a.actor, a.created_at
+            FROM service_request_audit a
+            JOIN service_requests r ON a.request_id = r.request_id
+        ''',
+        'columns': [
+            ('state', 'string'), ('year', 'int32'), ('district', 'string'),
+            ('audit_id', 'int64'), ('request_id', 'int64'), ('action', 'string'),
+            ('old_value', 'string'), ('new_value', 'string'), ('actor', 'string'),
+            ('created_at', 'string')
+        ]
+    }
+}
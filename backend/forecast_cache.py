@@ -0,0 +1,59 @@
+"""
+In-process forecast cache for serving repeated district forecasts without LLM calls
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class ForecastCache:
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 2048):
+        """Initialize an LRU cache of forecast results keyed by location_id"""
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, location_id: int) -> Optional[Dict]:
+        """
+        Get a cached forecast result
+
+        Args:
+            location_id: Location ID of the district
+
+        Returns:
+            Copy of the cached forecast result, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(location_id)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[location_id]
+                return None
+            self._entries.move_to_end(location_id)
+            return copy.deepcopy(result)
+
+    def put(self, location_id: int, result: Dict):
+        """Store a forecast result, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[location_id] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(location_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, location_id: int):
+        """Drop the cached forecast for one location"""
+        with self._lock:
+            self._entries.pop(location_id, None)
+
+    def clear(self):
+        """Drop all cached forecasts"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,36 @@
+"""
+Distance helpers for the district and facility R-tree indexes
+
+Coordinates are stored as WGS84 latitude/longitude degrees. Nearest-neighbour
+queries read the R-tree for a bounding box around the point, rank the
+candidates by great-circle distance and widen the box until it holds k
+results within its radius, so only a few index pages are read per query.
+"""
+import math
+from typing import Tuple
+
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Box containing every point within radius_km of (lat, lon)
+
+    Returns:
+        (min_lat, max_lat, min_lon, max_lon)
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    # Longitude degrees shrink towards the poles; clamp to avoid dividing by ~0
+    d_lon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - d_lat, lat + d_lat, lon - d_lon, lon + d_lon
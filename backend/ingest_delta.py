@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Script to apply a malaria data file incrementally (only new or changed rows)
+
+Usage:
+    python ingest_delta.py [path/to/data.json]
+"""
+import sys
+import os
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseManager
+from migrations import MigrationRunner
+from outbreak_alerts import OutbreakAlertEngine
+
+def ingest_delta(json_path: str):
+    """Diff the data file against the database and apply only the changes"""
+    print(f"🔄 Applying delta ingest from {json_path}...")
+    
+    db_manager = DatabaseManager()
+    MigrationRunner(db_manager).run()
+    
+    summary = db_manager.ingest_delta(json_path)
+    alerts = OutbreakAlertEngine(db_manager).run()
+    
+    print("\n" + "="*60)
+    print("✅ DELTA INGEST COMPLETE")
+    print("="*60)
+    print(f"  Inserted rows:  {summary['inserted']}")
+    print(f"  Updated rows:   {summary['updated']}")
+    print(f"  Unchanged rows: {summary['unchanged']}")
+    print(f"  Changed districts: {len(summary['changed_districts'])}")
+    for changed in summary['changed_districts']:
+        print(f"    - {changed['district']}, {changed['state']}")
+    print(f"  Outbreak alerts: {alerts['active']} active, {alerts['raised']} raised or escalated, "
+          f"{alerts['cleared']} cleared")
+    print("="*60)
+    print("Cached and precomputed forecasts were invalidated for the changed districts only.")
+    
+    db_manager.close()
+
+if __name__ == "__main__":
+    default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "maleria_data.json")
+    ingest_delta(sys.argv[1] if len(sys.argv) > 1 else default_path)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script to load district centroids and health facility coordinates
+
+District CSV columns: state, district, latitude, longitude
+Facility CSV columns: name, facility_type, state, district, latitude, longitude
+
+Rows are upserted (districts by state/district, facilities by district and
+name), so a file can be reloaded after corrections. Only districts already in
+the location table are used; rows naming any other district are skipped and
+reported, so a misspelled name never creates a new location.
+
+Usage:
+    python ingest_geo.py --districts districts.csv --facilities facilities.csv
+"""
+import argparse
+import csv
+import os
+import sys
+from typing import Dict, List, Tuple
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseManager
+from migrations import MigrationRunner
+
+def load_rows(path: str, text_columns: List[str], required: List[str]) -> List[Dict]:
+    """Read a CSV file, skipping rows with missing required columns or invalid coordinates"""
+    rows = []
+    with open(path, encoding='utf-8', newline='') as f:
+        for line, record in enumerate(csv.DictReader(f), start=2):
+            try:
+                row = {column: (record.get(column) or '').strip() for column in text_columns}
+                row['latitude'] = float(record['latitude'])
+                row['longitude'] = float(record['longitude'])
+                missing = [column for column in required if not row[column]]
+                if missing:
+                    raise ValueError(f"missing {', '.join(missing)}")
+                if not (-90 <= row['latitude'] <= 90 and -180 <= row['longitude'] <= 180):
+                    raise ValueError("coordinates out of range")
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"  ⚠ Skipping {os.path.basename(path)} line {line}: {str(e)}")
+                continue
+            rows.append(row)
+    return rows
+
+def report_unknown(path: str, unknown: List[Tuple[str, str]]):
+    """Warn about rows skipped because their district is not a known location"""
+    for state, district in unknown:
+        print(f"  ⚠ Skipping {os.path.basename(path)} rows for unknown district: {district}, {state}")
+
+def ingest_geo(districts_path: str = None, facilities_path: str = None):
+    """Upsert district centroids and facilities"""
+    db_manager = DatabaseManager()
+    MigrationRunner(db_manager).run()
+
+    print("\n" + "="*60)
+    if districts_path:
+        rows = load_rows(districts_path, ['state', 'district'], ['state', 'district'])
+        written, unknown = db_manager.upsert_district_geometry(rows)
+        report_unknown(districts_path, unknown)
+        print(f"  District centroids: {written}")
+    if facilities_path:
+        rows = load_rows(facilities_path, ['name', 'facility_type', 'state', 'district'],
+                         ['name', 'state', 'district'])
+        written, unknown = db_manager.upsert_facilities(rows)
+        report_unknown(facilities_path, unknown)
+        print(f"  Facilities:         {written}")
+    print("="*60)
+
+    db_manager.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load district centroids and facility coordinates")
+    parser.add_argument('--districts', help="CSV of district centroids")
+    parser.add_argument('--facilities', help="CSV of health facilities")
+    args = parser.parse_args()
+    if not (args.districts or args.facilities):
+        parser.error("give --districts and/or --facilities")
+    ingest_geo(args.districts, args.facilities)
@@ -0,0 +1,143 @@
+"""
+LLM backends selectable per prompt type
+
+- groq: hosted Groq chat model (default)
+- openai_compatible: any local server exposing /v1/chat/completions
+  (llama.cpp server, Ollama, vLLM, LM Studio)
+- template: no model call; callers use their deterministic fallback output
+
+Configuration (environment):
+    LLM_BACKEND                  Default backend for every prompt (groq)
+    LLM_BACKEND_<PROMPT_NAME>    Override for one prompt, e.g. LLM_BACKEND_FORECAST_NUMBER=template
+    LOCAL_LLM_URL                Base URL of the local endpoint (http://localhost:8080/v1)
+    LOCAL_LLM_MODEL              Model name sent to the local endpoint (local)
+    LOCAL_LLM_API_KEY            Optional bearer token for the local endpoint
+    LOCAL_LLM_TIMEOUT            Request timeout in seconds (60)
+
+Client libraries (langchain, requests) are imported when a backend is first
+created, so importing the API does not pay for them.
+"""
+import os
+from typing import Dict, Optional, Type
+
+from pydantic import BaseModel
+
+
+BACKEND_NAMES = ('groq', 'openai_compatible', 'template')
+
+
+class TextResponse:
+    def __init__(self, content: str, usage_metadata: Optional[Dict] = None):
+        """Chat response with the same attributes the callers read from LangChain messages"""
+        self.content = content
+        self.usage_metadata = usage_metadata
+
+
+class GroqBackend:
+    name = 'groq'
+    supports_structured_output = True
+
+    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile", temperature: float = 0):
+        """Hosted Groq chat model via LangChain"""
+        from langchain_groq import ChatGroq
+        from langchain_core.messages import HumanMessage
+
+        self._message = HumanMessage
+        self.llm = ChatGroq(
+            api_key=api_key,
+            model=model,
+            temperature=temperature
+        )
+        self._structured_runnables = {}
+
+    def invoke(self, prompt: str, json_mode: bool = False):
+        return self.llm.invoke([self._message(content=prompt)])
+
+    def invoke_structured(self, prompt: str, schema: Type[BaseModel], method: str) -> Dict:
+        """
+        Call the model with a schema bound via provider structured output (tool calling / JSON mode)
+
+        Returns:
+            Dict with 'raw' (message), 'parsed' (schema instance or None) and 'parsing_error'
+        """
+        key = (schema, method)
+        runnable = self._structured_runnables.get(key)
+        if runnable is None:
+            runnable = self.llm.with_structured_output(schema, method=method, include_raw=True)
+            self._structured_runnables[key] = runnable
+        return runnable.invoke([self._message(content=prompt)])
+
+
+class OpenAICompatibleBackend:
+    name = 'openai_compatible'
+    supports_structured_output = False
+
+    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None,
+                 api_key: Optional[str] = None, temperature: float = 0, timeout: Optional[float] = None):
+        """Local chat model served over the OpenAI chat completions API"""
+        import requests
+
+        self.base_url = (base_url or os.getenv('LOCAL_LLM_URL', 'http://localhost:8080/v1')).rstrip('/')
+        self.model = model or os.getenv('LOCAL_LLM_MODEL', 'local')
+        self.api_key = api_key or os.getenv('LOCAL_LLM_API_KEY')
+        self.temperature = temperature
+        self.timeout = timeout or float(os.getenv('LOCAL_LLM_TIMEOUT', '60'))
+        self.session = requests.Session()
+
+    def invoke(self, prompt: str, json_mode: bool = False) -> TextResponse:
+        """
+        Send one chat completion request
+
+        Args:
+            prompt: Prompt text
+            json_mode: Ask the server to constrain output to a JSON object
+
+        Returns:
+            TextResponse with the message content and token usage
+        """
+        payload = {
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'temperature': self.temperature
+        }
+        if json_mode:
+            payload['response_format'] = {'type': 'json_object'}
+
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        response = self.session.post(
+            f"{self.base_url}/chat/completions",
+            json=payload,
+            headers=headers,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        body = response.json()
+
+        usage = body.get('usage') or {}
+        return TextResponse(
+            body['choices'][0]['message'].get('content') or '',
+            {
+                'input_tokens': usage.get('prompt_tokens', 0),
+                'output_tokens': usage.get('completion_tokens', 0)
+            }
+        )
+
+
+class TemplateBackend:
+    name = 'template'
+    supports_structured_output = False
+
+    def invoke(self, prompt: str, json_mode: bool = False) -> TextResponse:
+        """No model call; an empty answer makes callers use their deterministic fallback"""
+        return TextResponse('')
+
+
+def backend_name_for(prompt_name: Optional[str] = None) -> str:
+    """Resolve the configured backend for a prompt name (or the default backend when None)"""
+    name = os.getenv('LLM_BACKEND', 'groq')
+    if prompt_name:
+        name = os.getenv(f"LLM_BACKEND_{prompt_name.upper()}", name)
+    name = name.strip().lower()
+    if name not in BACKEND_NAMES:
+        raise ValueError(f"Unknown LLM backend '{name}' for prompt {prompt_name}; expected one of {BACKEND_NAMES}")
+    return name
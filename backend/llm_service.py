@@ -1,28 +1,37 @@
 """
-LLM Service module for Groq API integration
+LLM Service module for Groq API integration (with optional local or template backends)
 """
-import os
-from typing import Dict, Optional
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage
 import json
-import re
+import os
+import threading
+from typing import Dict, List, Optional, Type
+from pydantic import BaseModel
+from llm_backends import GroqBackend, OpenAICompatibleBackend, TemplateBackend, backend_name_for
+from structured_output import (ForecastBatchOutput, ForecastOutput, extract_json, parse_metrics, parse_structured,
+                               validate_structured)
+from prompt_builder import (batch_history_lines, district_history_lines, estimate_tokens, render_prompt,
+                            seasonality_lines, token_metrics)
 
 
 class LLMService:
     def __init__(self, api_key: Optional[str] = None, temperature: float = 0):
-        """Initialize Groq LLM service"""
+        """Initialize Groq LLM service; backends are chosen per prompt (see llm_backends)"""
         self.api_key = api_key or os.getenv('GROQ_API')
         self.temperature = temperature
         
-        if not self.api_key:
+        if not self.api_key and backend_name_for() == 'groq':
             raise ValueError("GROQ_API key not found in environment variables or parameters")
         
-        self.llm = ChatGroq(
-            api_key=self.api_key,
-            model="llama-3.3-70b-versatile",
-            temperature=temperature
-        )
+        # Backends are created on first use and shared by all prompts routed to them
+        self._backends = {}
+        self._backends_lock = threading.Lock()
+        
+        # Provider-side structured output: function_calling, json_mode, json_schema or off
+        self.structured_method = os.getenv('LLM_STRUCTURED_OUTPUT', 'function_calling')
+        
+        # Districts per batched forecast prompt, and retries for districts missing from a batch
+        self.forecast_batch_size = int(os.getenv('LLM_FORECAST_BATCH_SIZE', '10'))
+        self.forecast_batch_retries = int(os.getenv('LLM_FORECAST_BATCH_RETRIES', '1'))
         
     def generate_outbreak_forecast(self, district_data: Dict) -> Dict:
         """
@@ -45,13 +54,9 @@ class LLMService:
         prompt = self._prepare_prompt(district_data)
         
         try:
-            # Call Groq LLM
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            response_text = response.content
-            
-            # Parse the response
-            forecast_data = self._parse_response(response_text, district_data)
-            return forecast_data
+            # Call Groq LLM with the forecast schema
+            forecast_json = self.generate_structured(prompt, ForecastOutput, 'forecast')
+            return self._build_forecast_result(forecast_json, district_data)
             
         except Exception as e:
             print(f"Error calling Groq LLM: {str(e)}")
@@ -82,13 +87,9 @@ class LLMService:
         prompt = self._prepare_prompt_numbers(district_data)
 
         try:
-            # Call Groq LLM
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            response_text = response.content
-
-            # Parse the response
-            forecast_data = self._parse_response_number(response_text, district_data)
-            return forecast_data
+            # Call Groq LLM with the forecast schema
+            forecast_json = self.generate_structured(prompt, ForecastOutput, 'forecast_number')
+            return self._build_forecast_result(forecast_json, district_data)
 
         except Exception as e:
             print(f"Error calling Groq LLM: {str(e)}")
@@ -98,219 +99,272 @@ class LLMService:
                 "forecast": None
             }
     
-    def generate_response(self, prompt: str) -> str:
+    def generate_outbreak_forecast_batch(self, district_datas: List[Dict]) -> List[Dict]:
+        """
+        Generate outbreak forecasts for several districts with one LLM call
+        
+        All districts share one prompt and the model returns an array of
+        forecasts keyed by location id. Each entry is validated on its own;
+        districts whose entry is missing or invalid are re-sent together (up to
+        forecast_batch_retries times) and then fall back to the trend-based
+        default forecast. Callers should keep batches to forecast_batch_size.
+        
+        Args:
+            district_datas: List of district data dictionaries (with location_id)
+            
+        Returns:
+            Forecast results in input order, same shape as generate_outbreak_forecast
+        """
+        # Keyed by input position; districts without data may not carry a location_id
+        results = {}
+        pending = []
+        for position, district_data in enumerate(district_datas):
+            if not district_data or not district_data.get('years'):
+                results[position] = self.generate_outbreak_forecast(district_data)
+            else:
+                pending.append((position, district_data))
+        
+        # The template backend makes no call, so retrying cannot fill the gaps
+        attempts = 1 if self.get_backend('forecast_batch').name == 'template' else self.forecast_batch_retries + 1
+        try:
+            for attempt in range(attempts):
+                if not pending:
+                    break
+                forecasts = self._request_forecast_batch([district_data for _, district_data in pending])
+                still_pending = []
+                for position, district_data in pending:
+                    forecast_json = forecasts.get(district_data['location_id'])
+                    if forecast_json is None:
+                        still_pending.append((position, district_data))
+                    else:
+                        results[position] = self._build_forecast_result(forecast_json, district_data)
+                if still_pending:
+                    print(f"Forecast batch attempt {attempt + 1}: {len(still_pending)} of {len(pending)} districts missing or invalid")
+                pending = still_pending
+            
+            for position, district_data in pending:
+                results[position] = self._build_forecast_result(None, district_data)
+        
+        except Exception as e:
+            print(f"Error calling Groq LLM: {str(e)}")
+            for position, _ in pending:
+                results[position] = {
+                    "status": "error",
+                    "message": f"Error generating forecast: {str(e)}",
+                    "forecast": None
+                }
+        
+        return [results[position] for position in range(len(district_datas))]
+    
+    def _request_forecast_batch(self, district_datas: List[Dict]) -> Dict[int, Dict]:
+        """Send one batched forecast prompt and return the valid entries keyed by location id"""
+        prompt = render_prompt('forecast_batch', batch_history_lines(district_datas))
+        batch = self.generate_structured(prompt, ForecastBatchOutput, 'forecast_batch')
+        if batch is None:
+            return {}
+        
+        wanted = {district_data['location_id'] for district_data in district_datas}
+        forecasts = {}
+        for entry in batch['forecasts']:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                location_id = int(entry.pop('id', None) or entry.pop('location_id', None))
+            except (TypeError, ValueError):
+                continue
+            if location_id not in wanted or location_id in forecasts:
+                continue
+            forecast_json = validate_structured(entry, ForecastOutput, 'forecast_batch_entry', 'ok')
+            if forecast_json is not None:
+                forecasts[location_id] = forecast_json
+        return forecasts
+    
+    def generate_response(self, prompt: str, name: str = 'custom') -> str:
         """
         Generate a generic response from LLM for custom prompts
         
         Args:
             prompt: Custom prompt text
+            name: Prompt name used for the token metrics
             
         Returns:
             Response text from LLM
         """
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
+            response = self._invoke_text(prompt, name)
             return response.content
         except Exception as e:
             print(f"Error calling Groq LLM: {str(e)}")
             return f"Error generating response: {str(e)}"
     
-    def _prepare_prompt(self, district_data: Dict) -> str:
-        """Prepare prompt for LLM"""
-        state = district_data.get('state', 'Unknown')
-        district = district_data.get('district', 'Unknown')
+    def generate_structured(self, prompt: str, schema: Type[BaseModel], name: str) -> Optional[Dict]:
+        """
+        Generate a response that conforms to a typed schema
         
-        # Get the latest year data
-        latest_data = district_data['years'][0] if district_data['years'] else {}
+        Uses the provider's structured output (tool calling by default) so the
+        model is constrained to the schema. If its output does not validate, the
+        raw tool-call arguments (and any JSON in the message text) go through the
+        repairing parser; a second, plain-text request is made only when the
+        provider call fails or nothing in its answer can be repaired. Local
+        backends are asked for JSON mode; the template backend makes no call and
+        returns None so callers use their deterministic output.
         
-        prompt = f"""
-Analyze the following malaria data for {district}, {state} and provide a forecast:
-
-District: {district}
-State: {state}
-Latest Data:
-- Total Cases Examined: {latest_data.get('cases_examined', 0)}
-- Total Cases Detected: {latest_data.get('cases_detected', 0)}
-- Male Cases Detected: {latest_data.get('male_case_detected', 0)}
-- Female Cases Detected: {latest_data.get('female_case_detected', 0)}
-- Year: {latest_data.get('year', 'Unknown')}
-
-Historical Data (last 3-4 years):
-"""
+        Args:
+            prompt: Prompt text
+            schema: Pydantic model describing the expected JSON
+            name: Prompt name used for the parse metrics
+            
+        Returns:
+            Validated dict, or None if no valid output could be obtained
+            
+        Raises:
+            Exception: If the plain-text LLM call itself fails
+        """
+        backend = self.get_backend(name)
+        if backend.name == 'template':
+            return None
         
-        for year_data in district_data['years'][:4]:
-            prompt += f"\nYear {year_data['year']}: {year_data['cases_detected']} cases detected (Male: {year_data['male_case_detected']}, Female: {year_data['female_case_detected']})"
+        if backend.supports_structured_output and self.structured_method != 'off':
+            try:
+                result = backend.invoke_structured(prompt, schema, self.structured_method)
+                self._record_usage(name, prompt, result.get('raw'))
+                # Candidates are checked without recording; this call records exactly one outcome
+                if result.get('parsed') is not None:
+                    validated = validate_structured(result['parsed'], schema, name, 'native', record=False)
+                    if validated is not None:
+                        parse_metrics.record(name, 'native')
+                        return validated
+                print(f"Structured output for {name} did not match schema: {result.get('parsing_error')}")
+                
+                # Tool arguments failed the schema; repair them (or JSON in the text) before a second call
+                for text in self._structured_fallback_texts(result.get('raw')):
+                    value, outcome = extract_json(text)
+                    repaired = (validate_structured(value, schema, name, outcome, record=False)
+                                if value is not None else None)
+                    if repaired is not None:
+                        parse_metrics.record(name, outcome)
+                        return repaired
+                parse_metrics.record(name, 'invalid')
+            except Exception as e:
+                print(f"Structured output call failed for {name}, falling back to text: {str(e)}")
         
-        prompt += """
-
-Based on this data, provide a malaria outbreak forecast in JSON format with the following structure:
-{
-    "outbreak_status": "high_risk",
-    "disease_name": "Malaria",
-    "forecast_by_gender": {
-        "male": <number>,
-        "female": <number>
-    },
-    "forecast_by_age_group": {
-        "children_0_5": <number>,
-        "youth_5_18": <number>,
-        "adults_18_60": <number>,
-        "elderly_60_plus": <number>
-    },
-    "total_expected_cases": <number>,
-    "confidence_level": 0-1,
-    "recommendations": "<health awareness message>."
-}
-
-IMPORTANT: Return ONLY valid JSON, no additional text. The total_expected_cases should be based on the trend analysis.
-"""
-        return prompt
+        response = self._invoke_text(prompt, name, json_mode=True)
+        return parse_structured(response.content, schema, name)
+    
+    def _structured_fallback_texts(self, raw) -> List[str]:
+        """
+        Candidate JSON texts from a structured-output message whose parsed output was rejected
+        
+        Returns:
+            The first tool call's raw arguments (undecodable ones included), its
+            arguments unwrapped from a single enclosing key (e.g. {"ForecastOutput": {...}}),
+            and the message text, in that order
+        """
+        if raw is None:
+            return []
+        texts = []
+        tool_calls = getattr(raw, 'tool_calls', None) or []
+        if tool_calls:
+            args = tool_calls[0].get('args') or {}
+            texts.append(json.dumps(args))
+            if len(args) == 1 and isinstance(next(iter(args.values())), dict):
+                texts.append(json.dumps(next(iter(args.values()))))
+        else:
+            invalid_calls = getattr(raw, 'invalid_tool_calls', None) or []
+            if invalid_calls and invalid_calls[0].get('args'):
+                texts.append(invalid_calls[0]['args'])
+            else:
+                provider_calls = (getattr(raw, 'additional_kwargs', None) or {}).get('tool_calls') or []
+                if provider_calls and provider_calls[0].get('function', {}).get('arguments'):
+                    texts.append(provider_calls[0]['function']['arguments'])
+        if raw.content:
+            texts.append(raw.content)
+        return texts
+    
+    def get_backend(self, name: str):
+        """
+        Get the backend configured for a prompt name
+        
+        Args:
+            name: Prompt name (e.g. 'forecast_number'); LLM_BACKEND_<NAME> overrides LLM_BACKEND
+        """
+        backend_name = backend_name_for(name)
+        with self._backends_lock:
+            backend = self._backends.get(backend_name)
+            if backend is None:
+                if backend_name == 'groq':
+                    if not self.api_key:
+                        raise ValueError("GROQ_API key not found in environment variables or parameters")
+                    backend = GroqBackend(self.api_key, temperature=self.temperature)
+                elif backend_name == 'openai_compatible':
+                    backend = OpenAICompatibleBackend(temperature=self.temperature)
+                else:
+                    backend = TemplateBackend()
+                self._backends[backend_name] = backend
+            return backend
+    
+    def _invoke_text(self, prompt: str, name: str, json_mode: bool = False):
+        """Plain chat completion on the prompt's backend, recording token usage"""
+        backend = self.get_backend(name)
+        response = backend.invoke(prompt, json_mode=json_mode)
+        if backend.name != 'template':
+            self._record_usage(name, prompt, response)
+        return response
+    
+    def _record_usage(self, name: str, prompt: str, message):
+        """Record estimated and provider-reported token usage for one call"""
+        usage = getattr(message, 'usage_metadata', None) if message is not None else None
+        token_metrics.record(name, estimate_tokens(prompt), usage)
+    
+    def _prepare_prompt(self, district_data: Dict) -> str:
+        """Prepare prompt for LLM"""
+        return render_prompt('forecast', district_history_lines(district_data), seasonality_lines(district_data))
 
     def _prepare_prompt_numbers(self, district_data: Dict) -> str:
-            """Prepare prompt for LLM"""
-            state = district_data.get('state', 'Unknown')
-            district = district_data.get('district', 'Unknown')
-
-            # Get the latest year data
-            latest_data = district_data['years'][0] if district_data['years'] else {}
-
-            prompt = f"""
-    Analyze the following malaria data for {district}, {state} and provide a forecast:
-
-    District: {district}
-    State: {state}
-    Latest Data:
-    - Total Cases Examined: {latest_data.get('cases_examined', 0)}
-    - Total Cases Detected: {latest_data.get('cases_detected', 0)}
-    - Male Cases Detected: {latest_data.get('male_case_detected', 0)}
-    - Female Cases Detected: {latest_data.get('female_case_detected', 0)}
-    - Year: {latest_data.get('year', 'Unknown')}
-
-    Historical Data (last 3-4 years):
-    """
-
-            for year_data in district_data['years'][:4]:
-                prompt += f"\nYear {year_data['year']}: {year_data['cases_detected']} cases detected (Male: {year_data['male_case_detected']}, Female: {year_data['female_case_detected']})"
+        """Prepare prompt for LLM (numbers only, always high_risk)"""
+        return render_prompt('forecast_number', district_history_lines(district_data),
+                             seasonality_lines(district_data))
 
-            prompt += """
-
-    Based on this data, provide a malaria outbreak forecast in JSON format with the following structure. Show outbreak_status as high_risk only.:
-    {
-        "outbreak_status": "high_risk",
-        "disease_name": "Malaria",
-        "forecast_by_gender": {
-            "male": <number>,
-            "female": <number>
-        },
-        "forecast_by_age_group": {
-            "children_0_5": <number>,
-            "youth_5_18": <number>,
-            "adults_18_60": <number>,
-            "elderly_60_plus": <number>
-        },
-        "total_expected_cases": <number>,
-    }
-    IMPORTANT: Return ONLY valid JSON, no additional text. The total_expected_cases should be based on the trend analysis.
-    """
-            return prompt
-    def _parse_response(self, response_text: str, district_data: Dict) -> Dict:
-        """Parse LLM response"""
-        try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            
-            if json_match:
-                json_str = json_match.group(0)
-                forecast_json = json.loads(json_str)
-                
-                return {
-                    "status": "outbreak_detected",
-                    "district": district_data.get('district'),
-                    "state": district_data.get('state'),
-                    "forecast": forecast_json
-                }
-            else:
-                # If no JSON found, create a default forecast
-                latest_data = district_data['years'][0] if district_data['years'] else {}
-                detected = latest_data.get('cases_detected', 0)
-                
-                return {
-                    "status": "outbreak_detected" if detected > 0 else "no_outbreak_observed",
-                    "district": district_data.get('district'),
-                    "state": district_data.get('state'),
-                    "forecast": {
-                        "outbreak_status": "high_risk",
-                        "disease_name": "Malaria",
-                        "total_expected_cases": int(detected * 1.1),  # 10% increase projection
-                        "forecast_by_gender": {
-                            "male": int(latest_data.get('male_case_detected', 0) * 1.1),
-                            "female": int(latest_data.get('female_case_detected', 0) * 1.1)
-                        },
-                        "forecast_by_age_group": {
-                            "children_0_5": int(detected * 0.15 * 1.1),
-                            "youth_5_18": int(detected * 0.20 * 1.1),
-                            "adults_18_60": int(detected * 0.50 * 1.1),
-                            "elderly_60_plus": int(detected * 0.15 * 1.1)
-                        },
-                        "confidence_level": 0.75,
-                        "recommendations": "Maintain awareness of a healthy lifestyle. Use mosquito nets, ensure proper sanitation, and seek medical attention if symptoms appear."
-                    }
-                }
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {str(e)}")
+    def _build_forecast_result(self, forecast_json: Optional[Dict], district_data: Dict) -> Dict:
+        """
+        Wrap a validated forecast, falling back to a trend-based forecast when it is missing
+        
+        Fallback results (no usable model output, including the template backend)
+        carry "source": "fallback" so callers can avoid caching them.
+        """
+        if forecast_json is not None:
             return {
-                "status": "error",
-                "message": "Error parsing forecast response",
-                "forecast": None
+                "status": "outbreak_detected",
+                "source": "llm",
+                "district": district_data.get('district'),
+                "state": district_data.get('state'),
+                "forecast": forecast_json
             }
-
-    def _parse_response_number(self, response_text: str, district_data: Dict) -> Dict:
-        """Parse LLM response"""
-        try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-
-            if json_match:
-                json_str = json_match.group(0)
-                forecast_json = json.loads(json_str)
-
-                return {
-                    "status": "outbreak_detected",
-                    "district": district_data.get('district'),
-                    "state": district_data.get('state'),
-                    "forecast": forecast_json
-                }
-            else:
-                # If no JSON found, create a default forecast
-                latest_data = district_data['years'][0] if district_data['years'] else {}
-                detected = latest_data.get('cases_detected', 0)
-
-                return {
-                    "status": "outbreak_detected" if detected > 0 else "no_outbreak_observed",
-                    "district": district_data.get('district'),
-                    "state": district_data.get('state'),
-                    "forecast": {
-                        "outbreak_status": "high_risk",
-                        "disease_name": "Malaria",
-                        "total_expected_cases": int(detected * 1.1),  # 10% increase projection
-                        "forecast_by_gender": {
-                            "male": int(latest_data.get('male_case_detected', 0) * 1.1),
-                            "female": int(latest_data.get('female_case_detected', 0) * 1.1)
-                        },
-                        "forecast_by_age_group": {
-                            "children_0_5": int(detected * 0.15 * 1.1),
-                            "youth_5_18": int(detected * 0.20 * 1.1),
-                            "adults_18_60": int(detected * 0.50 * 1.1),
-                            "elderly_60_plus": int(detected * 0.15 * 1.1)
-                        },
-                        "confidence_level": 0.75,
-                        "recommendations": "Maintain awareness of a healthy lifestyle. Use mosquito nets, ensure proper sanitation, and seek medical attention if symptoms appear."
-                    }
-                }
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {str(e)}")
-            return {
-                "status": "error",
-                "message": "Error parsing forecast response",
-                "forecast": None
+        
+        # If no valid JSON found, create a default forecast
+        latest_data = district_data['years'][0] if district_data['years'] else {}
+        detected = latest_data.get('cases_detected', 0)
+        
+        return {
+            "status": "outbreak_detected" if detected > 0 else "no_outbreak_observed",
+            "source": "fallback",
+            "district": district_data.get('district'),
+            "state": district_data.get('state'),
+            "forecast": {
+                "outbreak_status": "high_risk",
+                "disease_name": "Malaria",
+                "total_expected_cases": int(detected * 1.1),  # 10% increase projection
+                "forecast_by_gender": {
+                    "male": int(latest_data.get('male_case_detected', 0) * 1.1),
+                    "female": int(latest_data.get('female_case_detected', 0) * 1.1)
+                },
+                "forecast_by_age_group": {
+                    "children_0_5": int(detected * 0.15 * 1.1),
+                    "youth_5_18": int(detected * 0.20 * 1.1),
+                    "adults_18_60": int(detected * 0.50 * 1.1),
+                    "elderly_60_plus": int(detected * 0.15 * 1.1)
+                },
+                "confidence_level": 0.75,
+                "recommendations": "Maintain awareness of a healthy lifestyle. Use mosquito nets, ensure proper sanitation, and seek medical attention if symptoms appear."
             }
+        }
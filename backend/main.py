@@ -1,12 +1,18 @@
 """
 FastAPI REST API for Healthcare Data Analytics - Malaria Outbreak Forecasting
 """
-from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from datetime import date
 import os
+import json
+import asyncio
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import logging
 
@@ -14,8 +20,19 @@ import logging
 load_dotenv()
 
 # Import custom modules
-from database import DatabaseManager
+from database import DatabaseManager, SERVICE_REQUEST_STATUSES, TIMESERIES_GRANULARITIES
 from llm_service import LLMService
+from forecast_cache import ForecastCache
+from semantic_cache import SemanticCache
+from escalation import EscalationScheduler
+from write_behind import ServiceRequestWriter, replay_journals
+from events import EVENTS_HEARTBEAT_SECONDS, EventHub, event_scope
+from export_datasets import EXPORT_DATASETS, EXPORT_FORMATS
+from analytics import compare_districts, comparative_lines, comparative_summary, highly_affected_summary
+from resources import (SCENARIOS, ResourceCalculator, as_requirements, deployment_text, inventory_text,
+                       request_suggestions, tests_per_case)
+from structured_output import AshaActions, DcmoActions, ScmoActions, ScmoGuidance, parse_metrics
+from prompt_builder import render_prompt, token_metrics
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -37,9 +54,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database and LLM service
+# Initialize database (one connection per worker process); the LLM service is
+# built on first use so importing the app needs neither the LLM libraries nor an API key
 db_manager = DatabaseManager()
-llm_service = LLMService()
+llm_service = None
+_llm_service_lock = threading.Lock()
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "maleria_data.json")
+
+# Threads per worker for blocking LLM calls (asyncio.to_thread)
+API_WORKER_THREADS = int(os.getenv('API_WORKER_THREADS', '32'))
+
+# Forecast cache and batch settings
+forecast_cache = ForecastCache(ttl_seconds=int(os.getenv('FORECAST_CACHE_TTL', '3600')))
+# Older precomputed_forecasts rows are treated as misses and regenerated
+PRECOMPUTED_FORECAST_TTL = int(os.getenv('PRECOMPUTED_FORECAST_TTL', os.getenv('FORECAST_CACHE_TTL', '3600')))
+FORECAST_BATCH_CONCURRENCY = int(os.getenv('FORECAST_BATCH_CONCURRENCY', '8'))
+FORECAST_BATCH_MAX_DISTRICTS = int(os.getenv('FORECAST_BATCH_MAX_DISTRICTS', '200'))
+
+# Last data_change_log entry applied to forecast_cache (see _sync_forecast_invalidations)
+last_seen_change_id = 0
+
+# Answers to /action questions, reused for the same question (or, with
+# SEMANTIC_CACHE_MODEL, a paraphrase) in the same (role, risk band, location) bucket
+action_cache = SemanticCache(
+    threshold=float(os.getenv('ACTION_CACHE_THRESHOLD', '0.9')),
+    ttl_seconds=int(os.getenv('ACTION_CACHE_TTL', '3600'))
+)
+
+# Bulk escalation of stale pending service requests (started on startup)
+escalation_scheduler = EscalationScheduler(db_manager.db_path)
+resource_calculator = ResourceCalculator()
+
+# Optional write-behind for /service-request: acknowledge from a fsynced journal,
+# store in batches (started on startup)
+service_request_writer = None
+SERVICE_REQUEST_WRITE_BEHIND = os.getenv('SERVICE_REQUEST_WRITE_BEHIND', '0') == '1'
+
+# Push service request changes and outbreak alerts to SSE subscribers (started on startup)
+event_hub = EventHub(db_manager.get_service_request_events, db_manager.get_latest_audit_id, 'audit_id')
+alert_hub = EventHub(db_manager.get_outbreak_alert_events, db_manager.get_latest_alert_id, 'alert_id')
+
+# Service request list paging
+SERVICE_REQUEST_PAGE_SIZE = int(os.getenv('SERVICE_REQUEST_PAGE_SIZE', '50'))
+SERVICE_REQUEST_MAX_PAGE_SIZE = int(os.getenv('SERVICE_REQUEST_MAX_PAGE_SIZE', '200'))
+SERVICE_REQUEST_MAX_BATCH = int(os.getenv('SERVICE_REQUEST_MAX_BATCH', '500'))
 
 # ==================== Pydantic Models ====================
 
@@ -96,6 +154,22 @@ class ForecastResponse(BaseModel):
     message: Optional[str] = None
     forecast: Optional[dict] = None
 
+class StateSummaryResponse(BaseModel):
+    state: str
+    years: List[dict]
+    highly_affected_districts: List[dict]
+
+class ForecastBatchRequest(BaseModel):
+    districts: Optional[List[ForecastRequest]] = None
+    state: Optional[str] = None
+
+class ForecastBatchResponse(BaseModel):
+    status: str
+    total: int
+    cached: int
+    generated: int
+    forecasts: List[ForecastResponse]
+
 class RoleBasedGuidanceRequest(BaseModel):
     username: str
     password: str
@@ -151,7 +225,8 @@ class ServiceRequestItem(BaseModel):
 
 class ServiceRequestResponse(BaseModel):
     status: str
-    request_id: int
+    request_id: Optional[int] = None
+    queue_id: Optional[str] = None
     message: str
 
 class EscalateServiceRequestResponse(BaseModel):
@@ -160,6 +235,37 @@ class EscalateServiceRequestResponse(BaseModel):
     escalation_level: int
     message: str
 
+class BulkServiceRequestItem(ServiceRequestItem):
+    # Client-generated id; resubmitting it returns the existing request instead of a duplicate
+    client_id: Optional[str] = None
+
+class BulkServiceRequestItems(BaseModel):
+    requests: List[BulkServiceRequestItem]
+
+class BulkServiceRequestResponse(BaseModel):
+    status: str
+    request_ids: List[int]
+    created: int
+    existing: int
+    message: str
+
+class BulkServiceRequestUpdate(BaseModel):
+    request_ids: List[int]
+    status: Optional[str] = None
+    assigned_to: Optional[str] = None
+
+class BulkServiceRequestUpdateResponse(BaseModel):
+    status: str
+    updated: List[int]
+    not_found: List[int]
+    message: str
+
+class ServiceRequestPage(BaseModel):
+    status: str
+    requests: List[dict]
+    total: int
+    next_cursor: Optional[int] = None
+
 # ==================== Dependencies ====================
 
 def get_current_user(username: str, password: str) -> UserResponse:
@@ -325,6 +431,310 @@ async def get_all_locations():
         logger.error(f"Error fetching locations: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching locations")
 
+@app.get("/state/{state}/summary", response_model=StateSummaryResponse, tags=["Data"])
+async def get_state_summary(state: str, year: Optional[int] = None, limit: int = 5):
+    """
+    Get pre-aggregated state totals and the most affected districts
+    
+    Served from the rollup tables maintained on ingest, so the cost does not
+    depend on the number of districts in the state.
+    
+    Args:
+        state: State name (URL parameter)
+        year: Optional year for the district ranking (defaults to latest)
+        limit: Number of top districts to return
+        
+    Returns:
+        StateSummaryResponse with per-year totals and ranked districts
+    """
+    try:
+        years = db_manager.get_state_summary(state)
+        if not years:
+            raise HTTPException(status_code=404, detail=f"No data found for state '{state}'")
+        
+        return StateSummaryResponse(
+            state=state,
+            years=years,
+            highly_affected_districts=db_manager.get_top_districts(state, year, limit)
+        )
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching state summary: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching state summary")
+
+@app.get("/state/{state}/comparison", tags=["Data"])
+async def get_state_comparison(state: str, year: Optional[int] = None):
+    """
+    Compare every district of a state for one year
+    
+    Computed in one vectorized pass (no LLM call): state rank and percentile
+    of detected cases, year-over-year growth, test positivity, share of the
+    state's cases and incidence per 1000 population where the population is
+    known.
+    
+    Args:
+        state: State name (URL parameter)
+        year: Year to compare (defaults to the latest year on record)
+        
+    Returns:
+        State summary and districts ordered by rank
+    """
+    try:
+        analysis = compare_districts(db_manager, state, year)
+        if not analysis['districts']:
+            raise HTTPException(status_code=404, detail=f"No data found for state '{state}'")
+        return dict(analysis, status="success")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error comparing districts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error comparing districts")
+
+def _state_requirements(state: str, district: Optional[str] = None) -> List[dict]:
+    """
+    Resource quantities for every district of a state in one vectorized pass
+    
+    Expected cases come from cached or precomputed forecasts (no LLM call);
+    districts without one use their latest year's detected cases.
+    """
+    data = db_manager.get_state_data(state, as_arrays=True)
+    if not len(data['year']):
+        return []
+    
+    # Rows are ordered by district then year DESC: the first row of each district is its latest year
+    index = data['district_index']
+    latest = np.r_[True, index[1:] != index[:-1]]
+    location_ids = data['location_ids'].tolist()
+    detected = data['cases_detected'][latest].astype(float)
+    examined = data['cases_examined'][latest].astype(float)
+    
+    _sync_forecast_invalidations()
+    forecasts = {}
+    for location_id in location_ids:
+        cached = forecast_cache.get(location_id)
+        if cached is not None:
+            forecasts[location_id] = cached
+    forecasts.update(db_manager.get_precomputed_forecasts(
+        [location_id for location_id in location_ids if location_id not in forecasts],
+        max_age_seconds=PRECOMPUTED_FORECAST_TTL
+    ))
+    expected = [
+        (forecasts.get(location_id) or {}).get('forecast', {}).get('total_expected_cases')
+        for location_id in location_ids
+    ]
+    sources = ['forecast' if value is not None else 'latest_year' for value in expected]
+    expected_cases = np.where([value is None for value in expected], detected,
+                              [value or 0 for value in expected]).astype(float)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quantities = resource_calculator.calculate(
+            expected_cases, np.where(detected > 0, examined / detected, np.nan)
+        )
+    
+    results = []
+    for i, name in enumerate(data['districts'].tolist()):
+        if district and name != district:
+            continue
+        results.append({
+            'district': name,
+            'location_id': location_ids[i],
+            'expected_cases': int(round(expected_cases[i])),
+            'expected_cases_source': sources[i],
+            'requirements': as_requirements(quantities[i])
+        })
+    return results
+
+@app.get("/resources/requirements", tags=["Data"])
+async def get_resource_requirements(state: str, district: Optional[str] = None):
+    """
+    Get medicine, test kit, bed and staff requirements for a state's districts
+    
+    Deterministic per-case ratios (RESOURCE_RATIOS) applied to a low /
+    expected / high range of each district's expected cases; test kits follow
+    the district's own tests-per-positive ratio.
+    
+    Args:
+        state: State name
+        district: Optional district name (all districts of the state when omitted)
+        
+    Returns:
+        Requirements per district, the ratios used and the scenario spread
+    """
+    try:
+        districts = _state_requirements(state, district)
+        if not districts:
+            raise HTTPException(status_code=404, detail=f"No data found for '{district or state}'")
+        return {
+            "status": "success",
+            "state": state,
+            "scenarios": list(SCENARIOS),
+            "spread": resource_calculator.spread,
+            "ratios": resource_calculator.ratios,
+            "districts": districts
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error calculating resource requirements: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error calculating resource requirements")
+
+@app.get("/timeseries", tags=["Data"])
+async def get_timeseries(state: str, district: Optional[str] = None, granularity: str = 'weekly',
+                         start: Optional[date] = None, end: Optional[date] = None):
+    """
+    Get weekly or monthly case counts for a state's districts
+    
+    Each district's series is returned column-wise (parallel lists in period
+    order), which keeps multi-year weekly responses compact.
+    
+    Args:
+        state: State name
+        district: Optional district name (all districts of the state when omitted)
+        granularity: weekly or monthly
+        start: First period start to include (YYYY-MM-DD)
+        end: Last period start to include (YYYY-MM-DD)
+        
+    Returns:
+        Series per district with period_start, cases_examined and cases_detected lists
+    """
+    try:
+        if granularity not in TIMESERIES_GRANULARITIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"granularity must be one of: {', '.join(TIMESERIES_GRANULARITIES)}"
+            )
+        series = db_manager.get_timeseries(
+            state, granularity, district,
+            start.isoformat() if start else None, end.isoformat() if end else None
+        )
+        return {
+            "status": "success",
+            "granularity": granularity,
+            "series": series
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching time series: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching time series")
+
+@app.get("/facilities/nearest", tags=["Data"])
+async def get_nearest_facilities(state: Optional[str] = None, district: Optional[str] = None,
+                                 latitude: Optional[float] = None, longitude: Optional[float] = None,
+                                 k: int = Query(5, ge=1, le=50), facility_type: Optional[str] = None):
+    """
+    Get the health facilities nearest to a point or to a district's centroid
+    
+    Answered from the facilities R-tree, so the cost does not grow with the
+    number of facilities on record.
+    
+    Args:
+        state/district: District whose centroid is the search point
+        latitude/longitude: Search point (instead of a district)
+        k: Number of facilities
+        facility_type: Only facilities of this type (e.g. hospital)
+        
+    Returns:
+        Facilities with distance_km, nearest first
+    """
+    try:
+        if latitude is None or longitude is None:
+            if not (state and district):
+                raise HTTPException(status_code=400, detail="Give state and district, or latitude and longitude")
+            location_id = db_manager.verify_location(district, state)
+            centroid = db_manager.get_district_centroid(location_id) if location_id else None
+            if centroid is None:
+                raise HTTPException(status_code=404, detail=f"No coordinates on record for '{district}, {state}'")
+            latitude, longitude = centroid
+        
+        return {
+            "status": "success",
+            "facilities": db_manager.get_nearest_facilities(latitude, longitude, k, facility_type)
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching nearest facilities: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching nearest facilities")
+
+@app.get("/districts/neighbors", tags=["Data"])
+async def get_neighbor_districts(state: str, district: str, k: int = Query(5, ge=1, le=50),
+                                 max_km: float = Query(150, gt=0, le=1000)):
+    """
+    Get the districts nearest to a district, by centroid distance
+    
+    Args:
+        state: State name
+        district: District name
+        k: Number of neighbouring districts
+        max_km: Maximum centroid distance
+        
+    Returns:
+        Neighbouring districts (any state) with distance_km, nearest first
+    """
+    try:
+        location_id = db_manager.verify_location(district, state)
+        if location_id is None:
+            raise HTTPException(status_code=404, detail=f"Unknown district '{district}, {state}'")
+        return {
+            "status": "success",
+            "district": district,
+            "state": state,
+            "neighbors": db_manager.get_neighbor_districts(location_id, k, max_km)
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching neighbouring districts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching neighbouring districts")
+
+@app.get("/export", tags=["Data"])
+async def export_dataset(dataset: str = 'malaria', format: str = 'parquet', state: Optional[str] = None,
+                         year: Optional[int] = None, username: Optional[str] = None,
+                         password: Optional[str] = None):
+    """
+    Stream a dataset as a Parquet file or an Arrow IPC stream
+    
+    Rows are read in batches through a separate read-only connection, so an
+    export neither loads the table into memory nor blocks writers. Service
+    request datasets need SCMO (own state only) or admin credentials.
+    
+    Args:
+        dataset: malaria, timeseries, service_requests or service_request_audit
+        format: parquet or arrow
+        state: Only rows of this state
+        year: Only rows of this year
+        username/password: Required for the service request datasets
+        
+    Returns:
+        application/vnd.apache.parquet or application/vnd.apache.arrow.stream download
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=400, detail=f"dataset must be one of: {', '.join(EXPORT_DATASETS)}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if dataset.startswith('service_request'):
+        user = _get_requesting_user(username or '', password or '')
+        if user['role'] == 'SCMO':
+            if state and state != user['state']:
+                raise HTTPException(status_code=403, detail="SCMO users can only export their own state")
+            state = user['state']
+        elif user['role'] != 'admin':
+            raise HTTPException(status_code=403, detail="Only SCMO and admin users can export service requests")
+    
+    # pyarrow is only loaded once an export is requested, keeping API startup light
+    from export import stream_export
+    
+    extension = 'parquet' if format == 'parquet' else 'arrows'
+    filename = '_'.join(str(part) for part in (dataset, state, year) if part).replace(' ', '_')
+    return StreamingResponse(
+        stream_export(db_manager.db_path, dataset, format, state, year),
+        media_type=('application/vnd.apache.parquet' if format == 'parquet'
+                    else 'application/vnd.apache.arrow.stream'),
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{extension}"'}
+    )
+
 @app.post("/forecast", response_model=ForecastResponse, tags=["Forecasting"])
 async def get_outbreak_forecast(request: ForecastRequest):
     """
@@ -360,8 +770,9 @@ async def get_outbreak_forecast(request: ForecastRequest):
                 forecast=None
             )
         
-        # Generate forecast using LLM
-        forecast_result = llm_service.generate_outbreak_forecast(district_data)
+        # Generate forecast using LLM (served from cache when available)
+        forecast_results, _, _ = await _resolve_forecasts([district_data])
+        forecast_result = forecast_results[0]
         forecast_result['forecast']['outbreak_status'] = "very high"
         return ForecastResponse(
             status=forecast_result.get('status'),
@@ -390,6 +801,85 @@ async def get_forecast_by_district_name(district: str, state: Optional[str] = No
     request = ForecastRequest(district=district, state=state)
     return await get_outbreak_forecast(request)
 
+@app.post("/forecast/batch", response_model=ForecastBatchResponse, tags=["Forecasting"])
+async def get_batch_forecast(request: ForecastBatchRequest):
+    """
+    Get outbreak forecasts for many districts in one request
+    
+    Historical data for all requested districts is read with a single query.
+    Cached and precomputed forecasts are served directly; only the remaining
+    districts are sent to the LLM, concurrently.
+    
+    Args:
+        request: ForecastBatchRequest with a list of districts and/or a state
+        
+    Returns:
+        ForecastBatchResponse with one ForecastResponse per district
+    """
+    try:
+        if not request.districts and not request.state:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide a list of districts or a state"
+            )
+        
+        locations = [(item.district, item.state) for item in request.districts or []]
+        logger.info(f"Batch forecast request for {len(locations)} districts, state: {request.state}")
+        
+        if request.districts:
+            district_datas = db_manager.get_districts_data(locations, request.state)
+        else:
+            district_datas = db_manager.get_districts_data(state=request.state)
+        
+        if len(district_datas) > FORECAST_BATCH_MAX_DISTRICTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Batch too large: {len(district_datas)} districts (max {FORECAST_BATCH_MAX_DISTRICTS})"
+            )
+        
+        forecast_results, cached, generated = await _resolve_forecasts(list(district_datas.values()))
+        forecasts = []
+        for district_data, forecast_result in zip(district_datas.values(), forecast_results):
+            if forecast_result.get('forecast'):
+                forecast_result['forecast']['outbreak_status'] = "very high"
+            forecasts.append(ForecastResponse(
+                status=forecast_result.get('status'),
+                district=district_data['district'],
+                state=district_data['state'],
+                message=forecast_result.get('message', 'Alert, there is a potential outbreak observed.'),
+                forecast=forecast_result.get('forecast')
+            ))
+        
+        # Requested districts with no data get the same answer as /forecast; district
+        # names repeat across states, so a district with a state is matched on both
+        found_districts = {district for district, _ in district_datas}
+        for district, state_name in locations:
+            state_name = state_name or request.state
+            found = ((district, state_name) in district_datas if state_name
+                     else district in found_districts)
+            if not found:
+                forecasts.append(ForecastResponse(
+                    status="no_outbreak_observed",
+                    district=district,
+                    state=state_name,
+                    message="No outbreak observed. Please spread awareness for a healthy lifestyle.",
+                    forecast=None
+                ))
+        
+        return ForecastBatchResponse(
+            status="success",
+            total=len(forecasts),
+            cached=cached,
+            generated=generated,
+            forecasts=forecasts
+        )
+        
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error generating batch forecast: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error generating batch forecast: {str(e)}")
+
 @app.post("/guidance", response_model=RoleBasedGuidanceResponse, tags=["Guidance"])
 async def get_role_based_guidance(request: RoleBasedGuidanceRequest):
     """
@@ -469,7 +959,7 @@ async def get_role_based_guidance(request: RoleBasedGuidanceRequest):
         logger.info(f"Generating guidance for: {district}, {state_name}, Role: {user_role}")
         
         # Fetch forecast data
-        forecast_result = _get_forecast_for_guidance(district, state_name, user_role)
+        forecast_result = await _get_forecast_for_guidance(district, state_name, user_role)
         
         if not forecast_result or forecast_result.get('status') == 'error':
             logger.warning(f"No forecast data found for {district}")
@@ -513,23 +1003,106 @@ async def get_role_based_guidance(request: RoleBasedGuidanceRequest):
 
 # ==================== Helper Functions ====================
 
-def _get_forecast_for_guidance(district: str, state: str, role: str) -> dict:
+def get_llm_service() -> LLMService:
+    """Get the process-wide LLM service, creating it on first use"""
+    global llm_service
+    if llm_service is None:
+        with _llm_service_lock:
+            if llm_service is None:
+                llm_service = LLMService()
+    return llm_service
+
+def _sync_forecast_invalidations():
+    """
+    Drop cached forecasts for districts changed by delta ingests
+    
+    Ingests run as a separate command and record changed locations in
+    data_change_log; this indexed read picks up the new entries so only those
+    districts are evicted from this process's cache.
+    """
+    global last_seen_change_id
+    last_seen_change_id, changed, changed_states = db_manager.get_changes_since(last_seen_change_id)
+    for location_id in changed:
+        forecast_cache.invalidate(location_id)
+    if changed:
+        # District buckets are keyed by location_id, SCMO buckets by state name
+        changed_keys = set(changed) | set(changed_states)
+        action_cache.invalidate(lambda bucket: bucket[2] in changed_keys)
+
+async def _resolve_forecasts(district_datas: List[dict]) -> Tuple[List[dict], int, int]:
+    """
+    Get forecast results for several districts, calling the LLM only for misses
+    
+    Lookup order per district: in-process cache, precomputed_forecasts table, LLM.
+    Several misses are packed into multi-district prompts of
+    LLMService.forecast_batch_size districts; those LLM calls run concurrently
+    in worker threads (bounded by FORECAST_BATCH_CONCURRENCY). All DB access
+    stays on the caller's thread.
+    
+    Returns:
+        (forecast results in input order, number served from cache/precomputed, number generated)
+    """
+    _sync_forecast_invalidations()
+    
+    results = {}
+    for district_data in district_datas:
+        cached = forecast_cache.get(district_data['location_id'])
+        if cached is not None:
+            results[district_data['location_id']] = cached
+    
+    missing_ids = [d['location_id'] for d in district_datas if d['location_id'] not in results]
+    for location_id, stored in db_manager.get_precomputed_forecasts(
+            missing_ids, max_age_seconds=PRECOMPUTED_FORECAST_TTL).items():
+        forecast_cache.put(location_id, stored)
+        results[location_id] = stored
+    
+    misses = [d for d in district_datas if d['location_id'] not in results]
+    cached_count = len(district_datas) - len(misses)
+    
+    if misses:
+        semaphore = asyncio.Semaphore(FORECAST_BATCH_CONCURRENCY)
+        
+        service = get_llm_service()
+        batch_size = max(1, service.forecast_batch_size)
+        
+        async def generate(chunk: List[dict]) -> List[dict]:
+            async with semaphore:
+                if len(chunk) == 1:
+                    return [await asyncio.to_thread(service.generate_outbreak_forecast, chunk[0])]
+                return await asyncio.to_thread(service.generate_outbreak_forecast_batch, chunk)
+        
+        chunks = [misses[i:i + batch_size] for i in range(0, len(misses), batch_size)]
+        generated = [
+            forecast_result
+            for chunk_results in await asyncio.gather(*(generate(chunk) for chunk in chunks))
+            for forecast_result in chunk_results
+        ]
+        
+        to_store = {}
+        for district_data, forecast_result in zip(misses, generated):
+            results[district_data['location_id']] = forecast_result
+            # Never cache failures or trend fallbacks; the next request should retry the LLM
+            if (forecast_result.get('status') != 'error' and forecast_result.get('forecast')
+                    and forecast_result.get('source') != 'fallback'):
+                forecast_cache.put(district_data['location_id'], forecast_result)
+                to_store[district_data['location_id']] = forecast_result
+        db_manager.save_precomputed_forecasts(to_store)
+    
+    return [results[d['location_id']] for d in district_datas], cached_count, len(misses)
+
+async def _get_forecast_for_guidance(district: str, state: str, role: str) -> dict:
     """
     Get forecast data for guidance generation
     
-    For SCMO role, gets data for all districts in the state
+    For SCMO role, gets data for all districts in the state (one query)
     For ASHA and DCMO, gets data for the specific district
     """
     try:
         if role == 'SCMO':
-            # Get all districts in the state
-            db_manager.cursor.execute(
-                'SELECT DISTINCT district FROM location WHERE state = ?',
-                (state,)
-            )
-            districts = db_manager.cursor.fetchall()
+            # Get all districts in the state with their history in one query
+            state_data = db_manager.get_state_data(state)
             
-            if not districts:
+            if not state_data:
                 return {'status': 'error', 'message': 'No districts found for state'}
             
             # Get forecast for each district
@@ -539,14 +1112,13 @@ def _get_forecast_for_guidance(district: str, state: str, role: str) -> dict:
                 'districts': []
             }
             
-            for (dist,) in districts:
-                district_data = db_manager.get_district_data(dist, state)
-                if district_data and 'years' in district_data and len(district_data['years']) > 0:
-                    forecast = llm_service.generate_outbreak_forecast(district_data)
-                    state_forecast['districts'].append({
-                        'district': dist,
-                        'forecast': forecast.get('forecast')
-                    })
+            district_datas = list(state_data.values())
+            forecasts, _, _ = await _resolve_forecasts(district_datas)
+            for district_data, forecast in zip(district_datas, forecasts):
+                state_forecast['districts'].append({
+                    'district': district_data['district'],
+                    'forecast': forecast.get('forecast')
+                })
             
             return {
                 'status': 'success',
@@ -559,17 +1131,61 @@ def _get_forecast_for_guidance(district: str, state: str, role: str) -> dict:
             if not district_data or 'years' not in district_data or len(district_data['years']) == 0:
                 return {'status': 'error', 'message': 'No data found for district'}
             
-            forecast = llm_service.generate_outbreak_forecast(district_data)
+            forecasts, _, _ = await _resolve_forecasts([district_data])
             
             return {
                 'status': 'success',
-                'forecast': forecast.get('forecast')
+                'forecast': forecasts[0].get('forecast')
             }
             
     except Exception as e:
         logger.error(f"Error getting forecast for guidance: {str(e)}")
         return {'status': 'error', 'message': str(e)}
 
+def _state_context_lines(analysis: dict) -> List[str]:
+    """Summarize the district comparison (totals, ranked districts, neighbours) as SCMO prompt data lines"""
+    if not analysis['districts']:
+        return ["No district data on record for this state."]
+    
+    summary = analysis['summary']
+    lines = [
+        f"State data {analysis['year']}: {summary['cases_detected']} cases detected out of "
+        f"{summary['cases_examined']} examined across {summary['district_count']} districts."
+    ]
+    lines.extend(comparative_lines(analysis))
+    # Nearby districts of the worst affected, as grounding for inter-district coordination
+    for row in analysis['districts'][:3]:
+        neighbors = db_manager.get_neighbor_districts(row['location_id'], k=3)
+        if neighbors:
+            lines.append(f"Near {row['district']}: " + ", ".join(
+                f"{neighbor['district']} ({neighbor['distance_km']:.0f} km)" for neighbor in neighbors
+            ))
+    return lines
+
+def _with_state_comparison(result: dict, analysis: dict) -> dict:
+    """Replace the ranking and comparison fields of an SCMO response with the computed analysis"""
+    if analysis['districts']:
+        result = dict(result)
+        result['highly_affected_districts'] = highly_affected_summary(analysis)
+        result['comparative_analysis'] = comparative_summary(analysis)
+    return result
+
+def _question_lines(question: Optional[str]) -> List[str]:
+    """Prompt data line for the user's free-text question, if any"""
+    question = (question or '').strip()
+    return [f"Question: {question}"] if question else []
+
+def _risk_band(district_data: dict) -> str:
+    """Coarse risk band from the latest detected case count (part of the action cache key)"""
+    detected = district_data['years'][0].get('cases_detected', 0) if district_data.get('years') else 0
+    if detected == 0:
+        return 'none'
+    if detected < 100:
+        return 'low'
+    if detected < 1000:
+        return 'moderate'
+    return 'high'
+
 def _generate_role_specific_actions(user_role: str, forecast_data: dict, district: str, state: str, question: Optional[str] = None) -> dict:
     """
     Generate role-specific actions based on forecast data
@@ -598,31 +1214,15 @@ def _generate_asha_actions(forecast: dict, district: str, state: str, question:
         total_cases = forecast.get('total_expected_cases', 0)
         outbreak_status = forecast.get('outbreak_status', 'low_risk')
         
-        prompt = f"""
-You are an ASHA worker (community health worker) in {district}, {state}.
-
-Outbreak Status: {outbreak_status}
-Expected Cases: {total_cases}
-
-Generate CONCISE recommendations in 4 categories (keep each under 50 words):
-
-{{
-    "general_remedies": "Health practices individuals should follow (sleep, diet, hygiene, prevention)",
-    "social_remedies": "Community-scale initiatives (awareness camps, mosquito nets distribution, cleaning drives)",
-    "govt_regulatory_actions": "Government actions needed (camps, awareness, inspection of water sources)",
-    "healthcare_body_actions": "Healthcare facility requirements (medicines, testing kits, beds, doctors, staff, vaccination)"
-}}
-
-Return ONLY valid JSON. Be specific and actionable.
-"""
-        
-        response = llm_service.generate_response(prompt)
+        prompt = render_prompt('asha_actions', [
+            f"Location: {district}, {state}",
+            f"Outbreak status: {outbreak_status}",
+            f"Expected cases: {total_cases}"
+        ] + _question_lines(question))
         
-        import json
-        import re
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group(0))
+        actions = get_llm_service().generate_structured(prompt, AshaActions, 'asha_actions')
+        if actions is not None:
+            return actions
         else:
             return {
                 "general_remedies": "Use mosquito nets, apply repellent, maintain hygiene",
@@ -641,88 +1241,67 @@ Return ONLY valid JSON. Be specific and actionable.
 
 def _generate_dcmo_actions(forecast: dict, district: str, state: str, question: Optional[str] = None) -> dict:
     """Generate DCMO (District Medical Officer) specific actions - 6 components"""
+    requirements = None
     try:
         total_cases = forecast.get('total_expected_cases', 0)
         male_cases = forecast.get('forecast_by_gender', {}).get('male', 0)
         female_cases = forecast.get('forecast_by_gender', {}).get('female', 0)
-        
-        prompt = f"""
-You are DCMO (District Medical Officer) for {district}, {state}.
-
-Cases Expected: {total_cases} (Male: {male_cases}, Female: {female_cases})
-
-Generate CONCISE district-level action plan in 6 categories (keep each under 100 words):
-
-{{
-    "cases_identified": "Current count: {total_cases}",
-    "department_actions": "Healthcare department initiatives and deployment",
-    "inventory_arrangements": "Required medicines, kits, beds quantities",
-    "resource_deployment": "Number of doctors, nurses, paramedics needed",
-    "coordination_plan": "Coordination with administration and local authorities"
-}}
-
-Return ONLY valid JSON. Focus on district-level resource management. ###table...!!!!####
-"""
-        
-        response = llm_service.generate_response(prompt)
-        
-        import json
-        import re
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group(0))
+        requirements = _district_requirements(total_cases, district, state)
+        
+        prompt = render_prompt('dcmo_actions', [
+            f"Location: {district}, {state}",
+            f"Expected cases: {total_cases} (male {male_cases}, female {female_cases})",
+            f"Planned stock: {inventory_text(requirements)}",
+            f"Planned staff: {deployment_text(requirements)}"
+        ] + _question_lines(question))
+        
+        actions = get_llm_service().generate_structured(prompt, DcmoActions, 'dcmo_actions')
+        if actions is not None:
+            return _with_resource_plan(actions, requirements)
         else:
-            return {
+            return _with_resource_plan({
                 "cases_identified": f"{total_cases} cases expected",
                 "department_actions": "Activate healthcare teams and testing centers",
-                "inventory_arrangements": f"Prepare for {total_cases} cases: medicines, testing kits, beds",
-                "resource_deployment": f"Deploy {int(total_cases/50)} doctors, {int(total_cases/30)} nurses",
                 "coordination_plan": "Coordinate with district administration",
-            }
+            }, requirements)
     except Exception as e:
         logger.error(f"Error generating DCMO actions: {str(e)}")
-        return {
+        return _with_resource_plan({
             "cases_identified": "0 cases",
             "department_actions": "Pending analysis",
             "inventory_arrangements": "Assess requirements",
             "resource_deployment": "Deploy as needed",
             "coordination_plan": "Coordinate with authorities",
             "budget_allocation": "Pending allocation"
-        }
+        }, requirements)
+
+def _district_requirements(expected_cases: float, district: str, state: str) -> dict:
+    """Resource quantities for a district's expected cases, using its own tests-per-positive ratio"""
+    district_data = db_manager.get_district_data(district, state)
+    return resource_calculator.requirements(expected_cases or 0, tests_per_case(district_data))
+
+def _with_resource_plan(result: dict, requirements: Optional[dict]) -> dict:
+    """Replace the inventory and deployment fields of a DCMO response with the computed quantities"""
+    if requirements is None:
+        return result
+    result = dict(result)
+    result['inventory_arrangements'] = inventory_text(requirements)
+    result['resource_deployment'] = deployment_text(requirements)
+    result['resource_requirements'] = requirements
+    return result
 
 def _generate_scmo_actions(forecast: dict, district: str, state: str, question: Optional[str] = None) -> dict:
     """Generate SCMO (State Medical Officer) specific actions - 9 components"""
+    analysis = {'districts': []}
     try:
-        prompt = f"""
-You are SCMO (State Medical Officer) for {state}.
-
-Generate CONCISE state-level strategic response in 9 categories (select any top-5 most relevant, keep each under 100 words  ):
-
-{{
-    "state_overview": "Overall outbreak status across the state",
-    "highly_affected_districts": "Top 3-5 most affected districts with severity",
-    "comparative_analysis": "District-wise comparison of infection rates",
-    "budget_allocation": "Estimated budget requirement"
-    "state_level_remedies": "State-wide public health initiatives",
-    "medical_professional_deployment": "Deploy doctors, paramedics, army medical corps to high-risk areas",
-    "emergency_measures": "Emergency protocols and quarantine facilities",
-    "inter_district_coordination": "Resource sharing and support between districts",
-    "emergency_funding": "Emergency fund sanctioning recommendation",
-    "timeline_and_milestones": "Phased implementation: Week 1-2 (assessment), Week 2-4 (deployment)"
-}}
-
-Return ONLY valid JSON. Focus on state-level strategic decisions.
-"""
-        
-        response = llm_service.generate_response(prompt)
+        analysis = compare_districts(db_manager, state)
+        prompt = render_prompt('scmo_actions', [f"State: {state}"] + _question_lines(question), _state_context_lines(analysis))
         
-        import json
-        import re
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group(0))
+        actions = get_llm_service().generate_structured(prompt, ScmoActions, 'scmo_actions')
+        if actions is not None:
+            return _with_state_comparison(actions, analysis)
         else:
-            return {
+            return _with_state_comparison({
                 "state_overview": "Outbreak management for the state",
                 "highly_affected_districts": "Identify high-risk districts",
                 "comparative_analysis": "Compare infection rates across districts",
@@ -732,10 +1311,10 @@ Return ONLY valid JSON. Focus on state-level strategic decisions.
                 "inter_district_coordination": "Facilitate inter-district resource sharing",
                 "emergency_funding": "Sanction emergency funds",
                 "timeline_and_milestones": "Phase 1: Assessment, Phase 2: Deployment, Phase 3: Monitoring"
-            }
+            }, analysis)
     except Exception as e:
         logger.error(f"Error generating SCMO actions: {str(e)}")
-        return {
+        return _with_state_comparison({
             "state_overview": "State-level outbreak management",
             "highly_affected_districts": "Pending analysis",
             "comparative_analysis": "Pending comparison",
@@ -745,7 +1324,7 @@ Return ONLY valid JSON. Focus on state-level strategic decisions.
             "inter_district_coordination": "Coordinate",
             "emergency_funding": "Request funds",
             "timeline_and_milestones": "To be determined"
-        }
+        }, analysis)
 
 def _generate_role_specific_guidance(user_role: str, forecast_data: dict, district: str, state: str) -> dict:
     """
@@ -779,32 +1358,14 @@ def _generate_asha_guidance(forecast: dict, district: str, state: str) -> dict:
         outbreak_status = forecast.get('outbreak_status', 'low_risk')
         total_cases = forecast.get('total_expected_cases', 0)
         
-        prompt = f"""
-Based on the malaria outbreak forecast for {district}, {state}, generate ASHA worker guidance.
-
-Outbreak Status: {outbreak_status}
-Expected Cases: {total_cases}
-
-Please provide guidance in JSON format with these 4 components:
-
-{{
-    "general_remedies": "Provide specific remedies and preventive measures that individuals can follow to remain healthy and avoid malaria infection (e.g., proper sleep, balanced diet, mosquito prevention, sanitation)",
-    "social_remedies": "Provide community-level interventions and mass-scale initiatives that can be implemented (e.g., community awareness camps, mass distribution of mosquito nets, neighborhood sanitation drives)",
-    "govt_regulatory_actions": "Provide actions that government agencies should take (e.g., conducting medical camps, awareness sessions, educational programs, inspection of water sources)",
-    "healthcare_body_actions": "Provide actions that healthcare facilities should take (e.g., stockpiling medicines, testing kits availability, ensuring adequate beds, doctor availability, nursing staff deployment, vaccination programs)"
-}}
-
-IMPORTANT: Return ONLY valid JSON with these 4 fields. Make recommendations specific to the current outbreak status and expected cases.
-"""
-        
-        response = llm_service.generate_response(prompt)
+        prompt = render_prompt('asha_guidance', [
+            f"Location: {district}, {state}",
+            f"Outbreak status: {outbreak_status}",
+            f"Expected cases: {total_cases}"
+        ])
         
-        # Parse the response
-        import json
-        import re
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            guidance = json.loads(json_match.group(0))
+        guidance = get_llm_service().generate_structured(prompt, AshaActions, 'asha_guidance')
+        if guidance is not None:
             return guidance
         else:
             return {
@@ -828,55 +1389,35 @@ def _generate_dcmo_guidance(forecast: dict, district: str, state: str) -> dict:
     Generate DCMO (District Chief Medical Officer) level guidance
     DCMO focus: District-level resource management and healthcare arrangements
     """
+    requirements = None
     try:
         outbreak_status = forecast.get('outbreak_status', 'low_risk')
         total_cases = forecast.get('total_expected_cases', 0)
         male_cases = forecast.get('forecast_by_gender', {}).get('male', 0)
         female_cases = forecast.get('forecast_by_gender', {}).get('female', 0)
-        
-        prompt = f"""
-Generate DCMO (District Chief Medical Officer) level action plan for {district}, {state}.
-
-Outbreak Status: {outbreak_status}
-Cases Identified So Far: {total_cases}
-Male Cases: {male_cases}
-Female Cases: {female_cases}
-
-As DCMO, provide a high-level inventory and resource arrangement plan in JSON format:
-
-{{
-    "cases_identified": {total_cases},
-    "department_actions": "List healthcare department initiatives and actions taken (e.g., mobilizing healthcare teams, setting up testing centers, activating surveillance systems)",
-    "inventory_arrangements": "Provide high-level inventory management plan (e.g., quantitative requirements for medicines, testing kits, PPE, beds, ventilators)",
-    "resource_deployment": "Resource allocation strategy (e.g., number of doctors, nurses, paramedics needed, establishment of testing centers, quarantine facilities)",
-    "coordination_plan": "Inter-departmental coordination with other authorities for district-level response",
-    "budget_allocation": "Estimated budget requirements for the response"
-}}
-
-IMPORTANT: Return ONLY valid JSON. Focus on district-level resource management, not community level. Be specific about quantities and deployment.
-"""
-        
-        response = llm_service.generate_response(prompt)
-        
-        # Parse the response
-        import json
-        import re
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            guidance = json.loads(json_match.group(0))
-            return guidance
+        requirements = _district_requirements(total_cases, district, state)
+        
+        prompt = render_prompt('dcmo_guidance', [
+            f"Location: {district}, {state}",
+            f"Outbreak status: {outbreak_status}",
+            f"Cases identified so far: {total_cases} (male {male_cases}, female {female_cases})",
+            f"Planned stock: {inventory_text(requirements)}",
+            f"Planned staff: {deployment_text(requirements)}"
+        ])
+        
+        guidance = get_llm_service().generate_structured(prompt, DcmoActions, 'dcmo_guidance')
+        if guidance is not None:
+            return _with_resource_plan(guidance, requirements)
         else:
-            return {
+            return _with_resource_plan({
                 "cases_identified": total_cases,
                 "department_actions": "Activate healthcare surveillance, mobilize medical teams, establish testing centers",
-                "inventory_arrangements": f"Prepare for {total_cases} cases: {int(total_cases*2)} antimalarial doses, {int(total_cases*1.5)} testing kits, appropriate beds",
-                "resource_deployment": f"Deploy {int(total_cases/50)} doctors, {int(total_cases/30)} nurses, {int(total_cases/20)} paramedics across district",
                 "coordination_plan": "Coordinate with district administration, police, and local authorities for compliance",
                 "budget_allocation": f"Estimated budget: Rs. {int(total_cases*500)} for medicines and equipment"
-            }
+            }, requirements)
     except Exception as e:
         logger.error(f"Error generating DCMO guidance: {str(e)}")
-        return {
+        return _with_resource_plan({
             "error": str(e),
             "cases_identified": 0,
             "department_actions": "Consult with state health department",
@@ -884,47 +1425,23 @@ IMPORTANT: Return ONLY valid JSON. Focus on district-level resource management,
             "resource_deployment": "Deploy available healthcare resources",
             "coordination_plan": "Coordinate with all stakeholders",
             "budget_allocation": "Allocate as per state guidelines"
-        }
+        }, requirements)
 
 def _generate_scmo_guidance(forecast: dict, district: str, state: str) -> dict:
     """
     Generate SCMO (State Chief Medical Officer) level guidance
     SCMO focus: State-level analysis, inter-district coordination, emergency measures
     """
+    analysis = {'districts': []}
     try:
-        prompt = f"""
-Generate SCMO (State Chief Medical Officer) level strategic plan for the state of {state}.
-
-The forecast data includes district-wise analysis showing which districts are heavily infected.
-
-Provide a state-level strategic response in JSON format:
-
-{{
-    "state_overview": "Summary of outbreak status across the state",
-    "highly_affected_districts": "List of districts most badly infected with severity ranking",
-    "comparative_analysis": "Analysis comparing district-wise infection rates and trends",
-    "state_level_remedies": "State-wide initiatives and countermeasures",
-    "medical_professional_deployment": "Strategy for deploying doctors, paramedics, and army medical personnel to high-risk districts",
-    "emergency_measures": "Emergency protocols and resource mobilization",
-    "inter_district_coordination": "Coordination strategy between districts for resource sharing",
-    "emergency_funding": "Recommendation for emergency fund sanctioning and allocation",
-    "timeline_and_milestones": "Phased implementation plan with timelines"
-}}
-
-IMPORTANT: Return ONLY valid JSON. Focus on state-level strategic decisions, resource allocation across districts, and emergency measures.
-"""
+        analysis = compare_districts(db_manager, state)
+        prompt = render_prompt('scmo_guidance', [f"State: {state}"], _state_context_lines(analysis))
         
-        response = llm_service.generate_response(prompt)
-        
-        # Parse the response
-        import json
-        import re
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            guidance = json.loads(json_match.group(0))
-            return guidance
+        guidance = get_llm_service().generate_structured(prompt, ScmoGuidance, 'scmo_guidance')
+        if guidance is not None:
+            return _with_state_comparison(guidance, analysis)
         else:
-            return {
+            return _with_state_comparison({
                 "state_overview": f"Malaria outbreak management for {state}",
                 "highly_affected_districts": "Identify and prioritize high-risk districts from forecast data",
                 "comparative_analysis": "Compare infection rates across all districts in the state",
@@ -934,10 +1451,10 @@ IMPORTANT: Return ONLY valid JSON. Focus on state-level strategic decisions, res
                 "inter_district_coordination": "Facilitate resource sharing between better-resourced and under-resourced districts",
                 "emergency_funding": "Recommend emergency fund sanctioning for outbreak response",
                 "timeline_and_milestones": "Phase 1: Assessment (Week 1), Phase 2: Deployment (Week 2-3), Phase 3: Monitoring (Ongoing)"
-            }
+            }, analysis)
     except Exception as e:
         logger.error(f"Error generating SCMO guidance: {str(e)}")
-        return {
+        return _with_state_comparison({
             "error": str(e),
             "state_overview": "State-level outbreak management",
             "highly_affected_districts": "Pending analysis",
@@ -948,7 +1465,7 @@ IMPORTANT: Return ONLY valid JSON. Focus on state-level strategic decisions, res
             "inter_district_coordination": "Coordinate across districts",
             "emergency_funding": "Request emergency allocation",
             "timeline_and_milestones": "To be determined based on situation"
-        }
+        }, analysis)
 
 @app.post("/outbreak-check", response_model=OutbreakCheckResponse, tags=["Forecasting"])
 async def check_outbreak(request: OutbreakCheckRequest):
@@ -1006,7 +1523,7 @@ async def check_outbreak(request: OutbreakCheckRequest):
             )
         
         # Generate forecast (includes counts only, no guidance)
-        forecast_result = llm_service.generate_outbreak_forecast_number(district_data)
+        forecast_result = get_llm_service().generate_outbreak_forecast_number(district_data)
         
         outbreak_detected = forecast_result.get('status') != 'no_outbreak_observed'
         return OutbreakCheckResponse(
@@ -1106,9 +1623,27 @@ async def get_actions(request: ActionRequest):
                 message="No outbreak data found"
             )
         
-        # Generate forecast
-        forecast_result = llm_service.generate_outbreak_forecast(district_data)
-        forecast = forecast_result.get('forecast')
+        # Near-duplicate questions for the same role, risk band and location reuse the answer
+        # (SCMO answers cover the whole state)
+        location_key = state_name if user_role == 'SCMO' else district_data['location_id']
+        bucket = (user_role, _risk_band(district_data), location_key)
+        _sync_forecast_invalidations()
+        cached = action_cache.get(bucket, request.question)
+        if cached is not None:
+            return ActionResponse(
+                status="success",
+                username=username,
+                role=user_role,
+                district=district,
+                state=state_name,
+                forecast=cached['forecast'],
+                actions=cached['actions'],
+                message=f"Actions generated for {user_role} (cached)"
+            )
+        
+        # Generate forecast (served from the forecast cache when available)
+        forecast_results, _, _ = await _resolve_forecasts([district_data])
+        forecast = forecast_results[0].get('forecast')
         
         # Generate role-specific actions
         actions = _generate_role_specific_actions(
@@ -1119,6 +1654,9 @@ async def get_actions(request: ActionRequest):
             question=request.question
         )
         
+        if forecast and actions and 'error' not in actions:
+            action_cache.put(bucket, request.question, {'forecast': forecast, 'actions': actions})
+        
         return ActionResponse(
             status="success",
             username=username,
@@ -1136,123 +1674,469 @@ async def get_actions(request: ActionRequest):
         logger.error(f"Error generating actions: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+def _get_requesting_user(username: str, password: str) -> dict:
+    """Authenticate and load the profile fields stored on service requests (one query)"""
+    db_manager.cursor.execute(
+        'SELECT user_id, username, role, district, state FROM users WHERE username = ? AND password = ?',
+        (username, password)
+    )
+    user = db_manager.cursor.fetchone()
+    
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    
+    return {
+        'user_id': user[0],
+        'username': user[1],
+        'role': user[2],
+        'district': user[3],
+        'state': user[4]
+    }
+
 @app.post("/service-request", response_model=ServiceRequestResponse, tags=["Service"])
 async def submit_service_request(username: str, password: str, request: ServiceRequestItem):
     """
     Submit a service request for required items/resources
     Stores in service_requests table
     
+    With SERVICE_REQUEST_WRITE_BEHIND=1 the request is acknowledged as
+    "queued" once it is in the durable journal and stored shortly after in a
+    batched transaction; the response then carries a queue_id instead of the
+    request_id.
+    
     Args:
         username: Username
         password: Password
         request: ServiceRequestItem with item name and details
         
     Returns:
-        ServiceRequestResponse with request_id
+        ServiceRequestResponse with request_id (or queue_id when queued)
     """
     try:
-        # Authenticate user
-        db_manager.cursor.execute(
-            'SELECT user_id, username, role FROM users WHERE username = ? AND password = ?',
-            (username, password)
-        )
-        user = db_manager.cursor.fetchone()
+        user = _get_requesting_user(username, password)
+        
+        if service_request_writer is not None:
+            queue_id = await asyncio.wrap_future(service_request_writer.submit(
+                dict(user, request_item=request.request_item, request_details=request.request_details)
+            ))
+            return ServiceRequestResponse(
+                status="queued",
+                queue_id=queue_id,
+                message="Service request queued"
+            )
         
-        if not user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        request_id = db_manager.create_service_requests(
+            user,
+            [(request.request_item, request.request_details, None)]
+        )[0][0]
         
-        user_id, username, user_role = user[0], user[1], user[2]
+        logger.info(f"Service request {request_id} created for {username}")
         
-        # Get user profile
-        db_manager.cursor.execute(
-            'SELECT district, state FROM users WHERE username = ?',
-            (username,)
+        return ServiceRequestResponse(
+            status="success",
+            request_id=request_id,
+            message=f"Service request created successfully"
         )
-        user_profile = db_manager.cursor.fetchone()
         
-        if not user_profile:
-            raise HTTPException(status_code=400, detail="User profile not found")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error creating service request: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+def _service_request_filters(status_filter: Optional[str], escalation_level: Optional[int],
+                             date_from: Optional[str], date_to: Optional[str]) -> dict:
+    """Validate the optional list filters shared by the service request endpoints"""
+    for value in (date_from, date_to):
+        if value:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid date '{value}', expected YYYY-MM-DD")
+    return {
+        'status': status_filter,
+        'escalation_level': escalation_level,
+        'date_from': date_from,
+        'date_to': date_to
+    }
+
+def _page_size(limit: Optional[int]) -> int:
+    return max(1, min(limit or SERVICE_REQUEST_PAGE_SIZE, SERVICE_REQUEST_MAX_PAGE_SIZE))
+
+@app.post("/service-requests/bulk", response_model=BulkServiceRequestResponse, tags=["Service"])
+async def submit_service_requests_bulk(username: str, password: str, request: BulkServiceRequestItems):
+    """
+    Submit many service requests at once (e.g. a field team's offline queue)
+    
+    All requests are stored in one transaction: either every request is
+    created or none is. Items with a client_id can be resubmitted safely (e.g.
+    after a lost response); already stored items return their existing request_id.
+    
+    Args:
+        username: Username
+        password: Password
+        request: BulkServiceRequestItems with the queued requests
         
-        district = user_profile[0]
-        state_name = user_profile[1]
+    Returns:
+        BulkServiceRequestResponse with the request_ids in submission order and
+        how many were created now or already stored
+    """
+    try:
+        if not request.requests:
+            raise HTTPException(status_code=400, detail="No requests to submit")
+        if len(request.requests) > SERVICE_REQUEST_MAX_BATCH:
+            raise HTTPException(status_code=400, detail=f"At most {SERVICE_REQUEST_MAX_BATCH} requests per batch")
+        
+        client_ids = [item.client_id for item in request.requests if item.client_id]
+        if len(client_ids) != len(set(client_ids)):
+            raise HTTPException(status_code=400, detail="Each client_id may appear only once per batch")
+        
+        user = _get_requesting_user(username, password)
+        request_ids, created = db_manager.create_service_requests(
+            user,
+            [(item.request_item, item.request_details, item.client_id) for item in request.requests]
+        )
+        existing = len(request_ids) - created
         
-        # Insert service request
-        db_manager.cursor.execute('''
-            INSERT INTO service_requests 
-            (user_id, username, role, district, state, request_item, request_details, status, escalation_level)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', 0)
-        ''', (user_id, username, user_role, district, state_name, request.request_item, request.request_details))
+        logger.info(f"{created} service requests created for {user['username']} ({existing} already stored)")
         
-        db_manager.conn.commit()
+        message = f"{created} service requests created"
+        if existing:
+            message += f", {existing} already submitted"
+        return BulkServiceRequestResponse(
+            status="success",
+            request_ids=request_ids,
+            created=created,
+            existing=existing,
+            message=message
+        )
         
-        request_id = db_manager.cursor.lastrowid
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error creating service requests: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@app.post("/service-requests/bulk-update", response_model=BulkServiceRequestUpdateResponse, tags=["Service"])
+async def update_service_requests_bulk(username: str, password: str, request: BulkServiceRequestUpdate):
+    """
+    Change the status and/or assignee of many service requests at once
+    
+    DCMO users can update requests in their district and SCMO users in their
+    state; ids outside that scope are reported as not found. All changes are
+    applied in one transaction and recorded in the audit trail.
+    
+    Args:
+        username: Username
+        password: Password
+        request: BulkServiceRequestUpdate with request_ids and the new status/assigned_to
         
-        logger.info(f"Service request {request_id} created for {username}")
+    Returns:
+        BulkServiceRequestUpdateResponse with the updated and not found ids
+    """
+    try:
+        changes = request.model_dump(include={'status', 'assigned_to'}, exclude_none=True)
+        if not changes:
+            raise HTTPException(status_code=400, detail="Nothing to update: give status and/or assigned_to")
+        if 'status' in changes and changes['status'] not in SERVICE_REQUEST_STATUSES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status '{changes['status']}'; expected one of {', '.join(SERVICE_REQUEST_STATUSES)}"
+            )
+        request_ids = list(dict.fromkeys(request.request_ids))
+        if not request_ids:
+            raise HTTPException(status_code=400, detail="No request_ids given")
+        if len(request_ids) > SERVICE_REQUEST_MAX_BATCH:
+            raise HTTPException(status_code=400, detail=f"At most {SERVICE_REQUEST_MAX_BATCH} requests per batch")
+        
+        user = _get_requesting_user(username, password)
+        if user['role'] == 'DCMO':
+            district = user['district']
+        elif user['role'] == 'SCMO':
+            district = None
+        else:
+            raise HTTPException(status_code=403, detail="Only DCMO and SCMO users can update service requests")
+        
+        updated = db_manager.update_service_requests(
+            request_ids,
+            changes,
+            actor=user['username'],
+            state=user['state'],
+            district=district
+        )
+        updated_set = set(updated)
         
-        return ServiceRequestResponse(
+        logger.info(f"{len(updated)} service requests updated by {user['username']}")
+        
+        return BulkServiceRequestUpdateResponse(
             status="success",
-            request_id=request_id,
-            message=f"Service request created successfully"
+            updated=updated,
+            not_found=[request_id for request_id in request_ids if request_id not in updated_set],
+            message=f"{len(updated)} service requests updated"
         )
         
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Error creating service request: {str(e)}")
+        logger.error(f"Error updating service requests: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-@app.get("/service-requests", tags=["Service"])
-async def get_service_requests(username: str, password: str):
+@app.get("/service-requests", response_model=ServiceRequestPage, tags=["Service"])
+async def get_service_requests(username: str, password: str, status_filter: Optional[str] = Query(None, alias="status"),
+                               escalation_level: Optional[int] = None, date_from: Optional[str] = None,
+                               date_to: Optional[str] = None, cursor: Optional[int] = None,
+                               limit: Optional[int] = None):
     """
-    Get all service requests for a user
+    Get a page of the user's service requests, newest first
+    
+    Args:
+        username: Username
+        password: Password
+        status_filter: Only requests with this status (query parameter 'status')
+        escalation_level: Only requests at this escalation level
+        date_from: Created on or after this day (YYYY-MM-DD)
+        date_to: Created on or before this day (YYYY-MM-DD)
+        cursor: next_cursor from the previous page
+        limit: Page size (default 50, max 200)
+        
+    Returns:
+        ServiceRequestPage with the requests, the total matching count and the next cursor
     """
     try:
-        # Authenticate user
-        db_manager.cursor.execute(
-            'SELECT user_id, username FROM users WHERE username = ? AND password = ?',
-            (username, password)
+        user = get_current_user(username, password)
+        filters = _service_request_filters(status_filter, escalation_level, date_from, date_to)
+        
+        page = db_manager.list_service_requests(
+            after_id=cursor,
+            limit=_page_size(limit),
+            user_id=user.user_id,
+            **filters
         )
-        user = db_manager.cursor.fetchone()
         
-        if not user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        return ServiceRequestPage(status="success", **page)
         
-        user_id = user[0]
-        
-        # Get service requests
-        db_manager.cursor.execute('''
-            SELECT request_id, request_item, request_details, status, escalation_level, created_at
-            FROM service_requests
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-        ''', (user_id,))
-        
-        requests = db_manager.cursor.fetchall()
-        
-        result = []
-        for req in requests:
-            result.append({
-                'request_id': req[0],
-                'request_item': req[1],
-                'request_details': req[2],
-                'status': req[3],
-                'escalation_level': req[4],
-                'created_at': req[5],
-                'can_escalate': req[3] == 'pending'
-            })
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching service requests: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@app.get("/service-requests/suggestions", tags=["Service"])
+async def get_service_request_suggestions(username: str, password: str, scenario: str = 'expected'):
+    """
+    Suggest service requests that cover the user's district resource requirements
+    
+    Quantities come from the resource calculator (see /resources/requirements)
+    for the chosen scenario. The items can be submitted as they are through
+    /service-requests/bulk.
+    
+    Args:
+        username: Username
+        password: Password
+        scenario: low, expected or high
         
+    Returns:
+        Suggested items with request_item, request_details and quantity
+    """
+    try:
+        if scenario not in SCENARIOS:
+            raise HTTPException(status_code=400, detail=f"scenario must be one of: {', '.join(SCENARIOS)}")
+        user = _get_requesting_user(username, password)
+        districts = _state_requirements(user['state'], user['district'])
+        if not districts:
+            raise HTTPException(status_code=404, detail=f"No data found for '{user['district']}'")
         return {
             "status": "success",
-            "requests": result,
-            "total": len(result)
+            "district": user['district'],
+            "state": user['state'],
+            "scenario": scenario,
+            "expected_cases": districts[0]['expected_cases'],
+            "suggestions": request_suggestions(districts[0]['requirements'], scenario)
         }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error suggesting service requests: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@app.get("/service-requests/queue", response_model=ServiceRequestPage, tags=["Service"])
+async def get_service_request_queue(username: str, password: str, district: Optional[str] = None,
+                                    status_filter: Optional[str] = Query(None, alias="status"), escalation_level: Optional[int] = None,
+                                    date_from: Optional[str] = None, date_to: Optional[str] = None,
+                                    cursor: Optional[int] = None, limit: Optional[int] = None):
+    """
+    Get a page of all service requests a supervisor oversees, newest first
+    
+    DCMO users see their district and SCMO users their state (optionally
+    narrowed to one district). Filters and paging work as in /service-requests.
+    
+    Returns:
+        ServiceRequestPage with the requests, the total matching count and the next cursor
+    """
+    try:
+        user = get_current_user(username, password)
+        profile = db_manager.get_user_by_username(user.username)
+        
+        if user.role == 'DCMO':
+            scope = {'state': profile['state'], 'district': profile['district']}
+        elif user.role == 'SCMO':
+            scope = {'state': profile['state'], 'district': district}
+        else:
+            raise HTTPException(status_code=403, detail="Only DCMO and SCMO users can view the request queue")
+        
+        filters = _service_request_filters(status_filter, escalation_level, date_from, date_to)
+        page = db_manager.list_service_requests(
+            after_id=cursor,
+            limit=_page_size(limit),
+            **scope,
+            **filters
+        )
+        
+        return ServiceRequestPage(status="success", **page)
         
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Error fetching service requests: {str(e)}")
+        logger.error(f"Error fetching service request queue: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+def _event_stream(request: Request, hub: EventHub, scope: dict, fetch_backlog, event_name: str,
+                  last_event_id: Optional[int]) -> StreamingResponse:
+    """
+    Server-Sent Events response fed by an EventHub
+    
+    Events after last_event_id (or the Last-Event-ID header a browser sends on
+    reconnect) are read from the database first, then live events follow.
+    """
+    header_id = request.headers.get('last-event-id')
+    after = int(header_id) if header_id and header_id.isdigit() else last_event_id
+    
+    # Subscribe before reading the backlog so nothing falls in between
+    subscriber = hub.subscribe(scope)
+    
+    def message(event: dict) -> str:
+        return f"id: {event[hub.id_key]}\nevent: {event_name}\ndata: {json.dumps(event)}\n\n"
+    
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            last_sent = after
+            while last_sent is not None:
+                backlog = fetch_backlog(last_sent, limit=500, **scope)
+                for event in backlog:
+                    yield message(event)
+                if backlog:
+                    last_sent = backlog[-1][hub.id_key]
+                if len(backlog) < 500:
+                    break
+            
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), timeout=EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                if last_sent is not None and event[hub.id_key] <= last_sent:
+                    continue
+                yield message(event)
+                last_sent = event[hub.id_key]
+        finally:
+            hub.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/service-requests/events", tags=["Service"])
+async def stream_service_request_events(request: Request, username: str, password: str,
+                                        last_event_id: Optional[int] = None):
+    """
+    Stream service request changes as Server-Sent Events
+    
+    ASHA users receive changes to their own requests, DCMO users those in
+    their district and SCMO users those in their state. Each event carries the
+    change (action, old_value, new_value, actor) and the request's current
+    status, escalation level and assignee, so clients update their list in
+    place instead of re-fetching it.
+    
+    Args:
+        username: Username
+        password: Password
+        last_event_id: Resume after this event id (browsers send the Last-Event-ID
+            header on reconnect, which takes precedence)
+        
+    Returns:
+        text/event-stream of 'service_request' events
+    """
+    user = _get_requesting_user(username, password)
+    return _event_stream(
+        request, event_hub, event_scope(user), db_manager.get_service_request_events,
+        'service_request', last_event_id
+    )
+
+def _alert_scope(user: dict) -> dict:
+    """Alerts a supervisor follows: their district (DCMO) or state (SCMO)"""
+    if user['role'] == 'DCMO':
+        return {'state': user['state'], 'district': user['district']}
+    if user['role'] == 'SCMO':
+        return {'state': user['state']}
+    raise HTTPException(status_code=403, detail="Only DCMO and SCMO users receive outbreak alerts")
+
+@app.get("/alerts", tags=["Alerts"])
+async def get_outbreak_alerts(username: str, password: str, severity: Optional[str] = None):
+    """
+    Get current outbreak alerts for the user's district (DCMO) or state (SCMO)
+    
+    Alerts are computed for every district after each data ingest from
+    year-over-year growth, test positivity and the z-score against the
+    district's own history; no LLM call is involved.
+    
+    Args:
+        username: Username
+        password: Password
+        severity: Only alerts of this severity (watch, warning, critical)
+        
+    Returns:
+        Alerts, most severe first
+    """
+    try:
+        scope = _alert_scope(_get_requesting_user(username, password))
+        alerts = db_manager.get_outbreak_alerts(scope['state'], scope.get('district'), severity)
+        return {
+            "status": "success",
+            "alerts": alerts,
+            "total": len(alerts)
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching outbreak alerts: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@app.get("/alerts/events", tags=["Alerts"])
+async def stream_outbreak_alerts(request: Request, username: str, password: str,
+                                 last_event_id: Optional[int] = None):
+    """
+    Stream new and escalated outbreak alerts as Server-Sent Events
+    
+    DCMO users receive alerts for their district and SCMO users for their
+    state, as soon as an ingest raises them in any worker or process.
+    
+    Returns:
+        text/event-stream of 'outbreak_alert' events
+    """
+    scope = _alert_scope(_get_requesting_user(username, password))
+    return _event_stream(
+        request, alert_hub, scope, db_manager.get_outbreak_alert_events,
+        'outbreak_alert', last_event_id
+    )
+
 @app.post("/service-request/{request_id}/escalate", response_model=EscalateServiceRequestResponse, tags=["Service"])
 async def escalate_service_request(username: str, password: str, request_id: int):
     """
@@ -1304,6 +2188,10 @@ async def escalate_service_request(username: str, password: str, request_id: int
             SET escalation_level = ?, escalated_at = CURRENT_TIMESTAMP
             WHERE request_id = ?
         ''', (new_level, request_id))
+        db_manager.record_service_request_audit(
+            [(request_id, 'escalate', str(req[1]), str(new_level), username)],
+            commit=False
+        )
         
         db_manager.conn.commit()
         
@@ -1328,7 +2216,14 @@ async def health_check():
     return {
         "status": "healthy",
         "database": "connected",
-        "llm_service": "initialized"
+        "llm_service": "initialized" if llm_service is not None else "not_initialized",
+        "llm_parse_metrics": parse_metrics.snapshot(),
+        "llm_token_metrics": token_metrics.snapshot(),
+        "action_cache": action_cache.stats(),
+        "escalation_scheduler": escalation_scheduler.stats(),
+        "service_request_writer": service_request_writer.stats() if service_request_writer is not None else None,
+        "service_request_events": event_hub.stats(),
+        "alert_events": alert_hub.stats()
     }
 
 # ==================== Error Handlers ====================
@@ -1347,24 +2242,37 @@ async def http_exception_handler(request, exc):
 async def startup_event():
     """Initialize database on startup"""
     try:
-        logger.info("Initializing database...")
-        db_manager.create_tables()
-        
-        # Check if data already loaded
-        db_manager.cursor.execute('SELECT COUNT(*) FROM malaria_state_data')
-        count = db_manager.cursor.fetchone()[0]
-        
-        if count == 0:
-            logger.info("Loading malaria data from JSON...")
-            # Use parent directory to access data folder
-            import os
-            data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "maleria_data.json")
-            db_manager.load_json_data(data_path)
+        if os.getenv('DB_INIT_DONE') == '1':
+            # serve.py already migrated and seeded the database before forking workers
+            logger.info("Database initialized by launcher")
         else:
-            logger.info(f"Database already contains {count} records")
+            if db_manager.initialize(DATA_PATH):
+                logger.info("Database initialized")
+            else:
+                logger.info("Database already initialized")
+        # Journals of crashed workers; live siblings hold locks on theirs and are skipped
+        replay_journals(db_manager)
+        
+        # Per-worker thread pool for LLM calls run via asyncio.to_thread
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=API_WORKER_THREADS, thread_name_prefix="api-worker")
+        )
+        
+        # Cache starts empty, so earlier data changes need no invalidation
+        global last_seen_change_id
+        last_seen_change_id = db_manager.get_latest_change_id()
+        
+        if SERVICE_REQUEST_WRITE_BEHIND:
+            global service_request_writer
+            service_request_writer = ServiceRequestWriter(db_manager.db_path)
+            service_request_writer.start()
+            logger.info(f"Service request write-behind journal: {service_request_writer.journal_path}")
+        
+        event_hub.start()
+        alert_hub.start()
         
-        # Add default users
-        db_manager.add_default_users()
+        if escalation_scheduler.start():
+            logger.info(f"Escalation scheduler running every {escalation_scheduler.interval_seconds:g}s")
         
         logger.info("✓ Database initialization complete")
     except Exception as e:
@@ -1375,6 +2283,11 @@ async def startup_event():
 async def shutdown_event():
     """Close database connection on shutdown"""
     try:
+        await escalation_scheduler.stop()
+        await event_hub.stop()
+        await alert_hub.stop()
+        if service_request_writer is not None:
+            await asyncio.to_thread(service_request_writer.stop)
         db_manager.close()
         logger.info("✓ Database connection closed")
     except Exception as e:
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script to apply pending schema migrations
+
+Usage:
+    python migrate.py            # apply all pending migrations
+    python migrate.py --status   # show applied and pending migrations
+    python migrate.py --target N # apply up to version N
+"""
+import argparse
+import sys
+import os
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseManager
+from migrations import MigrationRunner
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations")
+    parser.add_argument('--status', action='store_true', help="Show migration status only")
+    parser.add_argument('--target', type=int, help="Apply migrations up to this version")
+    args = parser.parse_args()
+    
+    db_manager = DatabaseManager()
+    runner = MigrationRunner(db_manager)
+    
+    print(f"Current schema version: {runner.current_version()}")
+    pending = runner.pending()
+    
+    if args.status:
+        if pending:
+            print("Pending migrations:")
+            for version, name in pending:
+                print(f"  - {version}: {name}")
+        else:
+            print("✓ Schema is up to date")
+    else:
+        applied = runner.run(args.target)
+        if applied:
+            print(f"✓ Applied migrations: {', '.join(str(version) for version in applied)}")
+        else:
+            print("✓ Schema is up to date")
+        print(f"Schema version: {runner.current_version()}")
+    
+    db_manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+Versioned schema migrations
+
+Applied migrations are recorded in schema_migrations; each run applies the
+pending ones in order. Every migration must be idempotent (safe to re-run if
+a previous run stopped before recording it).
+
+Online table rewrites use rebuild_table: the new table is filled in small
+committed batches while triggers mirror live writes into it, and only the
+final swap takes the write lock, so the API keeps serving during the copy.
+"""
+import os
+import time
+from typing import Iterable, List, Optional, Tuple
+
+
+MIGRATION_BATCH_SIZE = int(os.getenv('MIGRATION_BATCH_SIZE', '5000'))
+
+
+# ==================== Helpers ====================
+
+def table_exists(db_manager, table: str) -> bool:
+    db_manager.cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    )
+    return db_manager.cursor.fetchone() is not None
+
+
+def column_names(db_manager, table: str) -> List[str]:
+    db_manager.cursor.execute(f'PRAGMA table_info({table})')
+    return [row[1] for row in db_manager.cursor.fetchall()]
+
+
+def add_column(db_manager, table: str, column: str, definition: str):
+    """Add a column if it is missing (a metadata-only change in SQLite)"""
+    if column not in column_names(db_manager, table):
+        db_manager.cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        db_manager.conn.commit()
+
+
+def create_index(db_manager, name: str, table: str, columns: str, unique: bool = False):
+    """Create an index if it is missing"""
+    db_manager.cursor.execute(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+    )
+    db_manager.conn.commit()
+
+
+def rebuild_table(db_manager, table: str, create_sql: str, indexes: Optional[Iterable[str]] = None,
+                  batch_size: int = MIGRATION_BATCH_SIZE, pause_seconds: float = 0.0) -> int:
+    """
+    Rewrite a table into a new definition without blocking traffic
+
+    1. Create <table>__rebuild from create_sql and add triggers that mirror
+       inserts, updates and deletes on the live table into it.
+    2. Copy existing rows in primary-key order, one committed batch at a time
+       (rows already mirrored by the triggers are newer and are kept).
+    3. In one short transaction drop the old table, rename the new one into
+       place and recreate the indexes and triggers.
+
+    Columns present in both definitions are copied; new columns take their
+    defaults. The table must have an INTEGER PRIMARY KEY.
+
+    Args:
+        db_manager: DatabaseManager
+        table: Table to rebuild
+        create_sql: CREATE TABLE statement with {table} where the table name goes
+        indexes: CREATE INDEX/TRIGGER statements to run after the swap (default: the old table's)
+        batch_size: Rows per copy transaction
+        pause_seconds: Sleep between batches to leave room for other writers
+
+    Returns:
+        Number of rows copied by the batch phase
+    """
+    cursor = db_manager.cursor
+    conn = db_manager.conn
+    new_table = f"{table}__rebuild"
+
+    cursor.execute(f'PRAGMA table_info({table})')
+    old_columns = cursor.fetchall()
+    keys = [row[1] for row in old_columns if row[5] == 1 and row[2].upper() == 'INTEGER']
+    if len(keys) != 1:
+        raise ValueError(f"rebuild_table needs an INTEGER PRIMARY KEY on {table}")
+    key = keys[0]
+
+    if indexes is None:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND tbl_name = ? "
+            "AND sql IS NOT NULL AND name NOT LIKE ? ORDER BY type",
+            (table, f'{new_table}%')
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+
+    # Start from a clean shadow table (an earlier run may have stopped half way)
+    conn.commit()
+    for suffix in ('ins', 'upd', 'del'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {new_table}_{suffix}')
+    cursor.execute(f'DROP TABLE IF EXISTS {new_table}')
+    cursor.execute(create_sql.format(table=new_table))
+
+    new_column_names = set(column_names(db_manager, new_table))
+    columns = [row[1] for row in old_columns if row[1] in new_column_names]
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'NEW.{column}' for column in columns)
+
+    cursor.execute(f'''
+        CREATE TRIGGER {new_table}_ins AFTER INSERT ON {table} BEGIN
+            INSERT OR REPLACE INTO {new_table} ({column_list}) VALUES ({new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER {new_table}_upd AFTER UPDATE ON {table} BEGIN
+            DELETE FROM {new_table} WHERE {key} = OLD.{key};
+            INSERT OR REPLACE INTO {new_table} ({column_list}) VALUES ({new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER {new_table}_del AFTER DELETE ON {table} BEGIN
+            DELETE FROM {new_table} WHERE {key} = OLD.{key};
+        END
+    ''')
+    conn.commit()
+
+    copied = 0
+    last_key = None
+    while True:
+        cursor.execute('BEGIN IMMEDIATE')
+        where = f'WHERE {key} > ?' if last_key is not None else ''
+        params = (last_key,) if last_key is not None else ()
+        cursor.execute(
+            f'SELECT MAX({key}), COUNT(*) FROM (SELECT {key} FROM {table} {where} ORDER BY {key} LIMIT ?)',
+            params + (batch_size,)
+        )
+        batch_end, batch_rows = cursor.fetchone()
+        if not batch_rows:
+            conn.commit()
+            break
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO {new_table} ({column_list})
+            SELECT {column_list} FROM {table} {where} {'AND' if where else 'WHERE'} {key} <= ?
+        ''', params + (batch_end,))
+        conn.commit()
+        copied += batch_rows
+        last_key = batch_end
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    # Swap: dropping the old table also drops its triggers and indexes
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute(f'ALTER TABLE {new_table} RENAME TO {table}')
+        for index_sql in indexes:
+            cursor.execute(index_sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return copied
+
+
+# ==================== Migrations ====================
+
+def _baseline_schema(db_manager):
+    """All tables as created by DatabaseManager.create_tables"""
+    db_manager.create_tables()
+
+
+def _service_request_queue(db_manager):
+    """Composite indexes for the paginated request lists and a trigger-maintained count table"""
+    cursor = db_manager.cursor
+
+    # Every list query pages on request_id, so each filter prefix ends with it
+    create_index(db_manager, 'idx_service_requests_user', 'service_requests', 'user_id, request_id')
+    create_index(db_manager, 'idx_service_requests_district', 'service_requests', 'state, district, status, request_id')
+    create_index(db_manager, 'idx_service_requests_state', 'service_requests', 'state, status, escalation_level, request_id')
+    create_index(db_manager, 'idx_service_requests_status', 'service_requests', 'status, escalation_level, request_id')
+    create_index(db_manager, 'idx_service_requests_created', 'service_requests', 'created_at')
+
+    # One row per (user, location, status, level, day); totals are sums over a few rows
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS service_request_counts (
+            user_id INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            district TEXT NOT NULL,
+            status TEXT NOT NULL,
+            escalation_level INTEGER NOT NULL,
+            created_day TEXT NOT NULL,
+            request_count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, state, district, status, escalation_level, created_day)
+        ) WITHOUT ROWID
+    ''')
+    create_index(db_manager, 'idx_service_request_counts_location', 'service_request_counts',
+                 'state, district, status, escalation_level')
+
+    key_columns = 'user_id, state, district, status, escalation_level, created_day'
+
+    def row_values(ref: str) -> str:
+        return (f"{ref}.user_id, {ref}.state, {ref}.district, COALESCE({ref}.status, ''), "
+                f"COALESCE({ref}.escalation_level, 0), date({ref}.created_at)")
+
+    def key_match(ref: str) -> str:
+        return (f"user_id = {ref}.user_id AND state = {ref}.state AND district = {ref}.district "
+                f"AND status = COALESCE({ref}.status, '') "
+                f"AND escalation_level = COALESCE({ref}.escalation_level, 0) "
+                f"AND created_day = date({ref}.created_at)")
+
+    add_row = f'''
+            INSERT INTO service_request_counts ({key_columns}, request_count)
+            VALUES ({row_values('NEW')}, 1)
+            ON CONFLICT ({key_columns}) DO UPDATE SET request_count = request_count + 1;
+    '''
+    remove_row = f'''
+            UPDATE service_request_counts SET request_count = request_count - 1 WHERE {key_match('OLD')};
+            DELETE FROM service_request_counts WHERE request_count <= 0 AND {key_match('OLD')};
+    '''
+
+    # Triggers and the backfill go in one transaction so no write is counted twice or missed
+    db_manager.conn.commit()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        for name in ('ins', 'upd', 'del'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS service_request_counts_{name}')
+        cursor.execute(f'''
+            CREATE TRIGGER service_request_counts_ins AFTER INSERT ON service_requests BEGIN
+                {add_row}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER service_request_counts_upd
+            AFTER UPDATE OF user_id, state, district, status, escalation_level, created_at ON service_requests
+            BEGIN
+                {remove_row}
+                {add_row}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER service_request_counts_del AFTER DELETE ON service_requests BEGIN
+                {remove_row}
+            END
+        ''')
+        cursor.execute('DELETE FROM service_request_counts')
+        cursor.execute(f'''
+            INSERT INTO service_request_counts ({key_columns}, request_count)
+            SELECT user_id, state, district, COALESCE(status, ''), COALESCE(escalation_level, 0),
+                   date(created_at), COUNT(*)
+            FROM service_requests
+            GROUP BY 1, 2, 3, 4, 5, 6
+        ''')
+        db_manager.conn.commit()
+    except Exception:
+        db_manager.conn.rollback()
+        raise
+
+
+def _service_request_audit(db_manager):
+    """Audit trail of service request changes and an index for the stale-request scan"""
+    db_manager.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS service_request_audit (
+            audit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            request_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            old_value TEXT,
+            new_value TEXT,
+            actor TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    create_index(db_manager, 'idx_service_request_audit_request', 'service_request_audit', 'request_id')
+    # Matches the per-level predicate of DatabaseManager.escalate_stale_service_requests
+    create_index(db_manager, 'idx_service_requests_stale', 'service_requests',
+                 'status, escalation_level, COALESCE(escalated_at, created_at)')
+
+
+def _service_request_assignment(db_manager):
+    """Who a service request is assigned to (set by the bulk update endpoint)"""
+    add_column(db_manager, 'service_requests', 'assigned_to', 'TEXT')
+
+
+def _service_request_queue_id(db_manager):
+    """Journal entry id of requests stored by the write-behind writer (makes replays idempotent)"""
+    add_column(db_manager, 'service_requests', 'queue_id', 'TEXT')
+    create_index(db_manager, 'idx_service_requests_queue_id', 'service_requests', 'queue_id', unique=True)
+
+
+def _outbreak_alerts(db_manager):
+    """Current outbreak alert per district and year (written by OutbreakAlertEngine)"""
+    db_manager.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS outbreak_alerts (
+            alert_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            location_id INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            district TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            severity TEXT NOT NULL,
+            signals TEXT NOT NULL,
+            cases_detected INTEGER NOT NULL,
+            yoy_growth REAL,
+            test_positivity_rate REAL,
+            z_score REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(location_id, year),
+            FOREIGN KEY (location_id) REFERENCES location(location_id)
+        )
+    ''')
+    create_index(db_manager, 'idx_outbreak_alerts_location', 'outbreak_alerts', 'state, district, year')
+    db_manager.conn.commit()
+
+
+def _malaria_timeseries(db_manager):
+    """Weekly/monthly surveillance counts, clustered by district and period for range scans"""
+    db_manager.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS malaria_timeseries (
+            location_id INTEGER NOT NULL,
+            granularity TEXT NOT NULL,
+            period_start TEXT NOT NULL,
+            cases_examined INTEGER NOT NULL,
+            cases_detected INTEGER NOT NULL,
+            PRIMARY KEY (location_id, granularity, period_start)
+        ) WITHOUT ROWID
+    ''')
+    db_manager.conn.commit()
+
+
+def _geo_index(db_manager):
+    """District centroids and facility coordinates, each with an R-tree kept in sync by triggers"""
+    cursor = db_manager.cursor
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS district_geometry (
+            location_id INTEGER PRIMARY KEY,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            FOREIGN KEY (location_id) REFERENCES location(location_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS facilities (
+            facility_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            facility_type TEXT NOT NULL DEFAULT 'hospital',
+            location_id INTEGER NOT NULL,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            UNIQUE(location_id, name),
+            FOREIGN KEY (location_id) REFERENCES location(location_id)
+        )
+    ''')
+    for table, key in (('district_geometry', 'location_id'), ('facilities', 'facility_id')):
+        index = f"{table}_rtree"
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {index}
+            USING rtree({key}, min_lat, max_lat, min_lon, max_lon)
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_rtree_ins AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {index} VALUES (NEW.{key}, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_rtree_upd AFTER UPDATE OF latitude, longitude ON {table}
+            BEGIN
+                UPDATE {index}
+                SET min_lat = NEW.latitude, max_lat = NEW.latitude,
+                    min_lon = NEW.longitude, max_lon = NEW.longitude
+                WHERE {key} = NEW.{key};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_rtree_del AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM {index} WHERE {key} = OLD.{key};
+            END
+        ''')
+    db_manager.conn.commit()
+
+
+# (version, name, function(db_manager)) in application order; append only
+MIGRATIONS = [
+    (1, 'baseline_schema', _baseline_schema),
+    (2, 'service_request_queue', _service_request_queue),
+    (3, 'service_request_audit', _service_request_audit),
+    (4, 'service_request_assignment', _service_request_assignment),
+    (5, 'service_request_queue_id', _service_request_queue_id),
+    (6, 'outbreak_alerts', _outbreak_alerts),
+    (7, 'malaria_timeseries', _malaria_timeseries),
+    (8, 'geo_index', _geo_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+class MigrationRunner:
+    def __init__(self, db_manager):
+        """Apply pending migrations to a DatabaseManager's database"""
+        self.db = db_manager
+
+    def _ensure_version_table(self):
+        self.db.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.db.conn.commit()
+
+    def current_version(self) -> int:
+        """Highest applied migration version (0 for a new database)"""
+        if not table_exists(self.db, 'schema_migrations'):
+            return 0
+        self.db.cursor.execute('SELECT MAX(version) FROM schema_migrations')
+        return self.db.cursor.fetchone()[0] or 0
+
+    def pending(self) -> List[Tuple[int, str]]:
+        current = self.current_version()
+        return [(version, name) for version, name, _ in MIGRATIONS if version > current]
+
+    def run(self, target: Optional[int] = None) -> List[int]:
+        """
+        Apply pending migrations in order
+
+        Args:
+            target: Stop after this version (default: latest)
+
+        Returns:
+            Versions applied by this run
+        """
+        current = self.current_version()
+        if current >= (target or LATEST_VERSION):
+            return []
+
+        self._ensure_version_table()
+        applied = []
+        for version, name, apply in MIGRATIONS:
+            if version <= current or (target is not None and version > target):
+                continue
+            print(f"Applying migration {version}: {name}...")
+            apply(self.db)
+            self.db.cursor.execute(
+                'INSERT OR IGNORE INTO schema_migrations (version, name) VALUES (?, ?)',
+                (version, name)
+            )
+            self.db.conn.commit()
+            applied.append(version)
+        return applied
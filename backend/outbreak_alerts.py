@@ -0,0 +1,185 @@
+"""
+Outbreak alert engine
+
+Evaluates every district in one vectorized pass over the malaria data (a
+district x year matrix) and flags the latest year of each district on three
+signals:
+
+- growth:     year-over-year increase in detected cases
+- positivity: detected / examined
+- zscore:     detected cases against the district's own earlier years
+
+Alerts are stored in outbreak_alerts, one row per district and year. A row is
+rewritten (with a new alert_id) only when its severity or signals change, so
+the /alerts/events stream pushes new and escalated alerts, not repeats.
+Districts that no longer trip any signal have their alert removed.
+
+Configuration (environment):
+    ALERT_GROWTH_THRESHOLD       Minimum year-over-year growth, as a fraction (0.5)
+    ALERT_POSITIVITY_THRESHOLD   Minimum test positivity rate (0.01)
+    ALERT_ZSCORE_THRESHOLD       Minimum z-score against the district's history (2.0)
+    ALERT_MIN_CASES              Detected cases below which growth and z-score are ignored (10)
+    ALERT_MIN_HISTORY_YEARS      Earlier years needed for a z-score (3)
+"""
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+SEVERITIES = {1: 'watch', 2: 'warning', 3: 'critical'}
+
+
+class OutbreakAlertEngine:
+    def __init__(self, db_manager, growth_threshold: Optional[float] = None,
+                 positivity_threshold: Optional[float] = None, zscore_threshold: Optional[float] = None,
+                 min_cases: Optional[int] = None, min_history_years: Optional[int] = None):
+        """Threshold-based outbreak detection over all districts"""
+        self.db = db_manager
+        self.growth_threshold = (growth_threshold if growth_threshold is not None
+                                 else float(os.getenv('ALERT_GROWTH_THRESHOLD', '0.5')))
+        self.positivity_threshold = (positivity_threshold if positivity_threshold is not None
+                                     else float(os.getenv('ALERT_POSITIVITY_THRESHOLD', '0.01')))
+        self.zscore_threshold = (zscore_threshold if zscore_threshold is not None
+                                 else float(os.getenv('ALERT_ZSCORE_THRESHOLD', '2.0')))
+        self.min_cases = min_cases if min_cases is not None else int(os.getenv('ALERT_MIN_CASES', '10'))
+        self.min_history_years = (min_history_years if min_history_years is not None
+                                  else int(os.getenv('ALERT_MIN_HISTORY_YEARS', '3')))
+
+    def compute_signals(self) -> List[Dict]:
+        """
+        Compute the signals for the latest year of every district
+
+        Returns:
+            One dict per district with the metric values and the signals it trips
+        """
+        self.db.cursor.execute('''
+            SELECT m.location_id, l.state, l.district, m.year, m.cases_examined, m.cases_detected
+            FROM malaria_state_data m
+            JOIN location l ON m.location_id = l.location_id
+        ''')
+        rows = self.db.cursor.fetchall()
+        if not rows:
+            return []
+
+        location_ids = np.array([row[0] for row in rows])
+        years = np.array([row[3] for row in rows])
+        examined = np.array([row[4] for row in rows], dtype=float)
+        detected = np.array([row[5] for row in rows], dtype=float)
+        names = {row[0]: (row[1], row[2]) for row in rows}
+
+        # District x year matrices; NaN where a district has no row for a year
+        district_ids, district_index = np.unique(location_ids, return_inverse=True)
+        year_values, year_index = np.unique(years, return_inverse=True)
+        cases = np.full((len(district_ids), len(year_values)), np.nan)
+        tested = np.full_like(cases, np.nan)
+        cases[district_index, year_index] = detected
+        tested[district_index, year_index] = examined
+
+        present = ~np.isnan(cases)
+        columns = np.arange(len(year_values))
+        latest_column = len(year_values) - 1 - np.argmax(present[:, ::-1], axis=1)
+        district_rows = np.arange(len(district_ids))
+        latest = cases[district_rows, latest_column]
+        latest_tested = tested[district_rows, latest_column]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Growth against the previous year in the data (NaN if the district has no row for it)
+            previous = np.where(latest_column > 0, cases[district_rows, np.maximum(latest_column - 1, 0)], np.nan)
+            growth = np.where(previous > 0, (latest - previous) / previous, np.nan)
+
+            positivity = np.where(latest_tested > 0, latest / latest_tested, np.nan)
+
+            # Mean and standard deviation of each district's years before its latest
+            history = present & (columns[None, :] < latest_column[:, None])
+            history_count = history.sum(axis=1)
+            history_cases = np.where(history, cases, 0.0)
+            mean = history_cases.sum(axis=1) / history_count
+            variance = (np.where(history, (cases - mean[:, None]) ** 2, 0.0)).sum(axis=1) / history_count
+            std = np.sqrt(variance)
+            z_score = np.where((history_count >= self.min_history_years) & (std > 0), (latest - mean) / std, np.nan)
+
+        enough_cases = latest >= self.min_cases
+        trips = {
+            'growth': enough_cases & (growth >= self.growth_threshold),
+            'positivity': positivity >= self.positivity_threshold,
+            'zscore': enough_cases & (z_score >= self.zscore_threshold)
+        }
+
+        results = []
+        for i, location_id in enumerate(district_ids.tolist()):
+            state, district = names[location_id]
+            results.append({
+                'location_id': location_id,
+                'state': state,
+                'district': district,
+                'year': int(year_values[latest_column[i]]),
+                'cases_detected': int(latest[i]),
+                'yoy_growth': _finite(growth[i]),
+                'test_positivity_rate': _finite(positivity[i]),
+                'z_score': _finite(z_score[i]),
+                'signals': [signal for signal, tripped in trips.items() if tripped[i]]
+            })
+        return results
+
+    def run(self) -> Dict:
+        """
+        Evaluate all districts and store the changed alerts in one transaction
+
+        Returns:
+            Dict with the number of districts evaluated, the active alerts and
+            how many were raised/updated and cleared
+        """
+        results = self.compute_signals()
+        alerts = {
+            (result['location_id'], result['year']): dict(result, severity=SEVERITIES[min(len(result['signals']), 3)])
+            for result in results if result['signals']
+        }
+
+        cursor = self.db.cursor
+        cursor.execute('SELECT location_id, year, severity, signals FROM outbreak_alerts')
+        stored = {(row[0], row[1]): (row[2], row[3]) for row in cursor.fetchall()}
+        latest_years = {result['location_id']: result['year'] for result in results}
+
+        changed = [
+            alert for key, alert in alerts.items()
+            if stored.get(key) != (alert['severity'], ','.join(alert['signals']))
+        ]
+        # Only the latest year of a district is re-evaluated; older alerts stay as history
+        cleared = [
+            key for key in stored
+            if key not in alerts and latest_years.get(key[0]) == key[1]
+        ]
+
+        try:
+            cursor.executemany(
+                'DELETE FROM outbreak_alerts WHERE location_id = ? AND year = ?',
+                [(alert['location_id'], alert['year']) for alert in changed] + cleared
+            )
+            cursor.executemany('''
+                INSERT INTO outbreak_alerts
+                (location_id, state, district, year, severity, signals, cases_detected,
+                 yoy_growth, test_positivity_rate, z_score)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (alert['location_id'], alert['state'], alert['district'], alert['year'], alert['severity'],
+                 ','.join(alert['signals']), alert['cases_detected'], alert['yoy_growth'],
+                 alert['test_positivity_rate'], alert['z_score'])
+                for alert in changed
+            ])
+            self.db.conn.commit()
+        except Exception:
+            self.db.conn.rollback()
+            raise
+
+        return {
+            'districts': len(results),
+            'active': len(alerts),
+            'raised': len(changed),
+            'cleared': len(cleared)
+        }
+
+
+def _finite(value) -> Optional[float]:
+    value = float(value)
+    return round(value, 4) if np.isfinite(value) else None
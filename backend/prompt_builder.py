@@ -0,0 +1,214 @@
+"""
+Compact prompt templates and token accounting for LLM calls
+
+Every template is a fixed instruction prefix followed by the request-specific
+data, so consecutive calls of the same prompt share an identical, cacheable
+prefix. Prompts are measured before sending and trimmed to a token budget by
+dropping optional data lines from the end.
+"""
+import math
+import os
+import threading
+from typing import Dict, List, Optional
+
+
+# Rough tokens-per-character ratio for English prose and JSON with Llama tokenizers
+CHARS_PER_TOKEN = 4
+PROMPT_TOKEN_BUDGET = int(os.getenv('LLM_PROMPT_TOKEN_BUDGET', '1200'))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a prompt without a tokenizer"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+# ==================== Metrics ====================
+
+class TokenMetrics:
+    def __init__(self):
+        """Thread-safe per-prompt counters of token usage"""
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, estimated_tokens: int, usage: Optional[Dict] = None):
+        """
+        Record one LLM call
+
+        Args:
+            name: Prompt name
+            estimated_tokens: Estimated prompt tokens before sending
+            usage: Provider usage metadata (input_tokens, output_tokens), if reported
+        """
+        usage = usage or {}
+        with self._lock:
+            counts = self._counts.setdefault(name, {
+                'calls': 0,
+                'estimated_input_tokens': 0,
+                'input_tokens': 0,
+                'output_tokens': 0
+            })
+            counts['calls'] += 1
+            counts['estimated_input_tokens'] += estimated_tokens
+            counts['input_tokens'] += usage.get('input_tokens', 0) or 0
+            counts['output_tokens'] += usage.get('output_tokens', 0) or 0
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for name, counts in self._counts.items():
+                entry = dict(counts)
+                calls = counts['calls'] or 1
+                entry['avg_input_tokens'] = round(counts['input_tokens'] / calls, 1)
+                entry['avg_output_tokens'] = round(counts['output_tokens'] / calls, 1)
+                result[name] = entry
+            return result
+
+
+token_metrics = TokenMetrics()
+
+
+# ==================== Templates ====================
+
+class PromptTemplate:
+    def __init__(self, name: str, instructions: str):
+        """Prompt with a fixed instruction prefix; request data is always appended last"""
+        self.name = name
+        self.prefix = instructions.strip()
+
+    def render(self, lines: List[str], optional_lines: Optional[List[str]] = None,
+               budget: int = PROMPT_TOKEN_BUDGET) -> str:
+        """
+        Render the prompt, trimming optional data to fit the token budget
+
+        Args:
+            lines: Data lines that are always included
+            optional_lines: Lower-priority data lines, dropped from the end when over budget
+            budget: Maximum estimated prompt tokens
+
+        Returns:
+            Prompt text
+        """
+        optional_lines = list(optional_lines or [])
+        prompt = self._join(lines + optional_lines)
+        while optional_lines and estimate_tokens(prompt) > budget:
+            optional_lines.pop()
+            prompt = self._join(lines + optional_lines)
+        if estimate_tokens(prompt) > budget:
+            print(f"Prompt {self.name} is ~{estimate_tokens(prompt)} tokens, over the {budget} token budget")
+        return prompt
+
+    def _join(self, lines: List[str]) -> str:
+        return self.prefix + "\n\nData:\n" + "\n".join(lines)
+
+
+_FORECAST_KEYS = (
+    'forecast_by_gender {male, female}, '
+    'forecast_by_age_group {children_0_5, youth_5_18, adults_18_60, elderly_60_plus}, '
+    'total_expected_cases'
+)
+
+PROMPTS = {
+    'forecast': PromptTemplate('forecast', f"""
+Forecast next year's malaria cases for an Indian district from its yearly surveillance data.
+Return ONLY a JSON object with keys: outbreak_status ("high_risk"), disease_name ("Malaria"), {_FORECAST_KEYS}, confidence_level (0-1), recommendations (one health awareness message).
+All counts are integers. Base total_expected_cases on the year-over-year trend.
+"""),
+    'forecast_number': PromptTemplate('forecast_number', f"""
+Forecast next year's malaria cases for an Indian district from its yearly surveillance data.
+Return ONLY a JSON object with keys: outbreak_status (always "high_risk"), disease_name ("Malaria"), {_FORECAST_KEYS}.
+All counts are integers. Base total_expected_cases on the year-over-year trend.
+"""),
+    'forecast_batch': PromptTemplate('forecast_batch', f"""
+Forecast next year's malaria cases for each Indian district below from its yearly surveillance data.
+Return ONLY a JSON object {{"forecasts": [...]}} with one entry per district. Each entry has keys: id (the district id given), outbreak_status ("high_risk"), disease_name ("Malaria"), {_FORECAST_KEYS}, confidence_level (0-1), recommendations (one health awareness message).
+All counts are integers. Base each total_expected_cases on that district's year-over-year trend.
+"""),
+    'asha_actions': PromptTemplate('asha_actions', """
+You are an ASHA community health worker. Give concise malaria recommendations, each under 50 words, specific and actionable. If a question is given, answer it within these keys.
+Return ONLY a JSON object with keys:
+general_remedies: individual health practices (sleep, diet, hygiene, prevention)
+social_remedies: community initiatives (awareness camps, net distribution, cleaning drives)
+govt_regulatory_actions: government actions (camps, awareness, water source inspection)
+healthcare_body_actions: facility needs (medicines, test kits, beds, doctors, staff)
+"""),
+    'dcmo_actions': PromptTemplate('dcmo_actions', """
+You are a DCMO (District Medical Officer). Give a concise district-level malaria action plan, each field under 100 words, focused on resource management. If a question is given, answer it within these keys.
+Return ONLY a JSON object with keys:
+cases_identified: current case count
+department_actions: healthcare department initiatives and deployment
+inventory_arrangements: medicine, kit and bed quantities
+resource_deployment: doctors, nurses, paramedics needed
+coordination_plan: coordination with administration and local authorities
+"""),
+    'scmo_actions': PromptTemplate('scmo_actions', """
+You are an SCMO (State Medical Officer). Give a concise state-level malaria response, each key under 100 words, focused on strategic decisions. If a question is given, answer it within these keys.
+Return ONLY a JSON object with keys state_overview, state_level_remedies and emergency_measures, plus the 2 most relevant of: highly_affected_districts (top 3-5 with severity), comparative_analysis, budget_allocation, medical_professional_deployment, inter_district_coordination, emergency_funding, timeline_and_milestones (phased weeks).
+"""),
+    'asha_guidance': PromptTemplate('asha_guidance', """
+Write malaria guidance for an ASHA community health worker, specific to the outbreak status and expected cases.
+Return ONLY a JSON object with keys:
+general_remedies: preventive measures for individuals (sleep, diet, mosquito prevention, sanitation)
+social_remedies: community and mass-scale interventions (awareness camps, net distribution, sanitation drives)
+govt_regulatory_actions: government agency actions (medical camps, education, water source inspection)
+healthcare_body_actions: facility actions (medicine stock, test kits, beds, doctors, nurses)
+"""),
+    'dcmo_guidance': PromptTemplate('dcmo_guidance', """
+Write a DCMO (District Chief Medical Officer) malaria inventory and resource plan. Stay at district level and be specific about quantities and deployment.
+Return ONLY a JSON object with keys:
+cases_identified: number of cases
+department_actions: healthcare department initiatives (teams, testing centers, surveillance)
+inventory_arrangements: quantities of medicines, test kits, PPE, beds
+resource_deployment: doctors, nurses, paramedics, testing and quarantine facilities
+coordination_plan: inter-departmental coordination
+budget_allocation: estimated budget
+"""),
+    'scmo_guidance': PromptTemplate('scmo_guidance', """
+Write an SCMO (State Chief Medical Officer) malaria strategic plan focused on state-level decisions, allocation across districts and emergency measures.
+Return ONLY a JSON object with keys: state_overview, highly_affected_districts (with severity ranking), comparative_analysis (district infection rates and trends), state_level_remedies, medical_professional_deployment (doctors, paramedics, army medical personnel), emergency_measures, inter_district_coordination, emergency_funding, timeline_and_milestones (phased).
+"""),
+}
+
+
+def render_prompt(name: str, lines: List[str], optional_lines: Optional[List[str]] = None) -> str:
+    """Render a named template with its data lines"""
+    return PROMPTS[name].render(lines, optional_lines)
+
+
+def _year_row(year_data: Dict) -> str:
+    return (
+        f"{year_data.get('year')}|{year_data.get('cases_examined', 0)}|{year_data.get('cases_detected', 0)}|"
+        f"{year_data.get('male_case_detected', 0)}|{year_data.get('female_case_detected', 0)}"
+    )
+
+
+def district_history_lines(district_data: Dict, limit: int = 4) -> List[str]:
+    """Render a district's yearly data (latest first) as a compact table"""
+    lines = [
+        f"District: {district_data.get('district', 'Unknown')}, {district_data.get('state', 'Unknown')}",
+        "year|examined|detected|male|female"
+    ]
+    lines.extend(_year_row(year_data) for year_data in district_data.get('years', [])[:limit])
+    return lines
+
+
+def batch_history_lines(district_datas: List[Dict], limit: int = 4) -> List[str]:
+    """Render several districts' yearly data as compact tables, each headed by its location id"""
+    lines = ["year|examined|detected|male|female"]
+    for district_data in district_datas:
+        lines.append(
+            f"id {district_data['location_id']}: {district_data.get('district', 'Unknown')}, "
+            f"{district_data.get('state', 'Unknown')}"
+        )
+        lines.extend(_year_row(year_data) for year_data in district_data.get('years', [])[:limit])
+        lines.extend(seasonality_lines(district_data))
+    return lines
+
+
+def seasonality_lines(district_data: Dict) -> List[str]:
+    """Render a district's monthly share of cases (Jan..Dec), if it has monthly or weekly data"""
+    profile = district_data.get('seasonality')
+    if not profile:
+        return []
+    return ["monthly share of cases Jan..Dec: " + "|".join(f"{share:g}" for share in profile)]
@@ -0,0 +1,173 @@
+"""
+Deterministic resource requirements from expected malaria cases
+
+Quantities are per-case consumption ratios applied to a low / expected /
+high range around each district's expected cases, computed for all
+districts at once with NumPy. Test kits follow the district's own
+tests-per-positive ratio when its surveillance history has one (capped at
+max_rdt_kits_per_case), so high-positivity districts plan fewer kits per case.
+
+Configuration (environment):
+    RESOURCE_RATIOS            Overrides as name=value pairs, e.g.
+                               "rdt_kits_per_case=25,beds_per_case=0.08"
+    RESOURCE_FORECAST_SPREAD   Relative width of the low/high range (0.25)
+"""
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+DEFAULT_RATIOS = {
+    # Consumables, per expected case
+    'rdt_kits_per_case': 20.0,        # used when the district has no tests-per-positive history
+    'max_rdt_kits_per_case': 50.0,    # cap on a district's own ratio (mass screening is planned separately)
+    'act_courses_per_case': 1.0,      # artemisinin combination therapy, one course per case
+    'primaquine_courses_per_case': 1.0,
+    'safety_stock': 0.2,              # extra share on top of consumables
+    # Capacity, per expected case
+    'beds_per_case': 0.05,            # severe cases needing admission
+    'doctors_per_case': 0.02,
+    'nurses_per_case': 0.033,
+    'paramedics_per_case': 0.05,
+}
+
+# (resource, ratio key, consumable) in output order
+RESOURCES = [
+    ('rdt_kits', 'rdt_kits_per_case', True),
+    ('act_courses', 'act_courses_per_case', True),
+    ('primaquine_courses', 'primaquine_courses_per_case', True),
+    ('beds', 'beds_per_case', False),
+    ('doctors', 'doctors_per_case', False),
+    ('nurses', 'nurses_per_case', False),
+    ('paramedics', 'paramedics_per_case', False),
+]
+
+SCENARIOS = ('low', 'expected', 'high')
+
+# Service request item names for each resource
+REQUEST_ITEMS = {
+    'rdt_kits': 'Medical Testing Kits',
+    'act_courses': 'Medicine',
+    'primaquine_courses': 'Medicine',
+    'beds': 'Hospital Beds',
+    'doctors': 'Doctor Deployment',
+    'nurses': 'Nurse Deployment',
+    'paramedics': 'Paramedic Deployment',
+}
+
+
+def ratios_from_env() -> Dict[str, float]:
+    """Default ratios with the RESOURCE_RATIOS overrides applied"""
+    ratios = dict(DEFAULT_RATIOS)
+    for part in os.getenv('RESOURCE_RATIOS', '').split(','):
+        if '=' in part:
+            name, value = part.split('=', 1)
+            if name.strip() in ratios:
+                ratios[name.strip()] = float(value)
+    return ratios
+
+
+class ResourceCalculator:
+    def __init__(self, ratios: Optional[Dict[str, float]] = None, spread: Optional[float] = None):
+        """
+        Per-case resource planning
+
+        Args:
+            ratios: Consumption ratios (see DEFAULT_RATIOS); missing keys use the defaults
+            spread: Relative width of the low/high scenarios around the expected cases
+        """
+        self.ratios = dict(ratios_from_env(), **(ratios or {}))
+        self.spread = spread if spread is not None else float(os.getenv('RESOURCE_FORECAST_SPREAD', '0.25'))
+        self._multipliers = np.array([1 - self.spread, 1.0, 1 + self.spread])
+        self._per_case = np.array([self.ratios[key] for _, key, _ in RESOURCES])
+        self._buffer = np.array([1 + self.ratios['safety_stock'] if consumable else 1.0
+                                 for _, _, consumable in RESOURCES])
+        self._kit_column = [name for name, _, _ in RESOURCES].index('rdt_kits')
+
+    def calculate(self, expected_cases, tests_per_case=None) -> np.ndarray:
+        """
+        Quantities for many districts
+
+        Args:
+            expected_cases: Expected cases per district, shape (n,)
+            tests_per_case: Examined per detected case per district, shape (n,);
+                NaN or None to use rdt_kits_per_case
+
+        Returns:
+            Integer array of shape (n, scenarios, resources), rounded up
+        """
+        cases = np.maximum(np.asarray(expected_cases, dtype=float), 0)
+        per_case = np.broadcast_to(self._per_case, (len(cases), len(self._per_case))).copy()
+        if tests_per_case is not None:
+            kits = np.asarray(tests_per_case, dtype=float)
+            per_case[:, self._kit_column] = np.where(np.isfinite(kits) & (kits > 0),
+                                                     np.minimum(kits, self.ratios['max_rdt_kits_per_case']),
+                                                     per_case[:, self._kit_column])
+        scenario_cases = cases[:, None] * self._multipliers[None, :]
+        quantities = scenario_cases[:, :, None] * (per_case * self._buffer)[:, None, :]
+        return np.ceil(quantities - 1e-9).astype(np.int64)
+
+    def requirements(self, expected_cases: float, tests_per_case: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Quantities for one district
+
+        Returns:
+            {resource: {'low': n, 'expected': n, 'high': n}}
+        """
+        return as_requirements(self.calculate(
+            [expected_cases], None if tests_per_case is None else [tests_per_case]
+        )[0])
+
+
+def as_requirements(quantities: np.ndarray) -> Dict[str, Dict[str, int]]:
+    """One district's (scenarios, resources) quantities as {resource: {scenario: n}}"""
+    return {
+        name: {scenario: int(quantities[i, j]) for i, scenario in enumerate(SCENARIOS)}
+        for j, (name, _, _) in enumerate(RESOURCES)
+    }
+
+
+def tests_per_case(district_data: Dict) -> Optional[float]:
+    """Examined per detected case in the district's latest year (None without detected cases)"""
+    years = district_data.get('years') or [{}]
+    if not years[0].get('cases_detected'):
+        return None
+    return years[0].get('cases_examined', 0) / years[0]['cases_detected']
+
+
+def inventory_text(requirements: Dict[str, Dict[str, int]]) -> str:
+    """Consumables at the expected level, with the high scenario in brackets"""
+    return ", ".join(
+        f"{requirements[name]['expected']} {label} (up to {requirements[name]['high']})"
+        for name, label in (('rdt_kits', 'RDT kits'), ('act_courses', 'ACT courses'),
+                            ('primaquine_courses', 'primaquine courses'), ('beds', 'beds'))
+    )
+
+
+def deployment_text(requirements: Dict[str, Dict[str, int]]) -> str:
+    """Staff at the expected level, with the high scenario in brackets"""
+    return ", ".join(
+        f"{requirements[name]['expected']} {name} (up to {requirements[name]['high']})"
+        for name in ('doctors', 'nurses', 'paramedics')
+    )
+
+
+def request_suggestions(requirements: Dict[str, Dict[str, int]], scenario: str = 'expected') -> List[Dict]:
+    """
+    Service request items covering the requirements
+
+    Returns:
+        Dicts with request_item, request_details and quantity, one per resource with a non-zero quantity
+    """
+    suggestions = []
+    for name, _, _ in RESOURCES:
+        quantity = requirements[name][scenario]
+        if quantity > 0:
+            suggestions.append({
+                'request_item': REQUEST_ITEMS[name],
+                'request_details': f"{quantity} {name.replace('_', ' ')} ({scenario} scenario)",
+                'quantity': quantity,
+                'resource': name
+            })
+    return suggestions
@@ -0,0 +1,217 @@
+"""
+Semantic answer cache for free-text /action questions
+
+Answers are reused within a bucket (role, risk band, location). By default
+only the same question after normalization (case, punctuation, spacing)
+matches, in any language. Set SEMANTIC_CACHE_MODEL to a sentence-transformers
+model name (e.g. paraphrase-multilingual-MiniLM-L12-v2) to also match
+rephrasings and translations by cosine similarity of CPU embeddings.
+
+Clinical questions that differ only by a negation ("safe" / "unsafe",
+"should" / "should not") embed almost identically, so a candidate whose
+wording differs from the new question by a negation is never a hit.
+"""
+import copy
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+
+
+_NON_WORD = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+# "n't" normalizes to a separate "t" token ("don't" -> "don t")
+_NEGATIONS = frozenset("""
+not no nor never none neither nothing without cannot cant t avoid stop
+""".split())
+_NEGATING_PREFIXES = ('un', 'non', 'in', 'im', 'ir', 'il', 'dis', 'anti', 'contra')
+
+
+def normalize_question(question: Optional[str]) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    if not question:
+        return ''
+    question = unicodedata.normalize('NFKC', question).lower()
+    question = _NON_WORD.sub(' ', question)
+    return _SPACES.sub(' ', question).strip()
+
+
+def polarity_differs(first: str, second: str) -> bool:
+    """
+    Whether two normalized questions differ by a negation
+
+    True when a word present in only one of them is a negation, or is the
+    other's word with a negating prefix ("unsafe" / "safe").
+    """
+    first_words, second_words = set(first.split()), set(second.split())
+    for word in first_words ^ second_words:
+        if word in _NEGATIONS:
+            return True
+        other = second_words if word in first_words else first_words
+        if any(_negates(word, candidate) or _negates(candidate, word) for candidate in other):
+            return True
+    return False
+
+
+def _negates(word: str, base: str) -> bool:
+    return any(word == prefix + base for prefix in _NEGATING_PREFIXES)
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str):
+        """Neural sentence embeddings on CPU (optional dependency)"""
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device='cpu')
+
+    def embed(self, text: str) -> np.ndarray:
+        if not text:
+            return np.zeros(self.model.get_sentence_embedding_dimension(), dtype=np.float32)
+        return self.model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+def get_embedder():
+    """Sentence-transformers model if configured and installed, otherwise None (exact matching)"""
+    model_name = os.getenv('SEMANTIC_CACHE_MODEL')
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except ImportError:
+            print("sentence-transformers is not installed; action cache matches exact questions only")
+        except Exception as e:
+            print(f"Could not load embedding model {model_name}: {str(e)}; "
+                  f"action cache matches exact questions only")
+    return None
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = 0.9, ttl_seconds: int = 3600,
+                 max_entries_per_bucket: int = 256, embedder=None):
+        """
+        In-process vector index of answers, one matrix per bucket
+
+        Args:
+            threshold: Minimum cosine similarity for a hit (with an embedder)
+            ttl_seconds: Lifetime of a cached answer
+            max_entries_per_bucket: Oldest answers are evicted beyond this
+            embedder: Object with embed(text) -> normalized vector; defaults to
+                get_embedder(), and None matches exact normalized questions only
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_bucket = max_entries_per_bucket
+        self.embedder = embedder if embedder is not None else get_embedder()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, bucket: Hashable, question: Optional[str]) -> Optional[Dict]:
+        """
+        Look up an answer for a question similar to one already answered
+
+        Args:
+            bucket: Cache partition, e.g. (role, risk band, location)
+            question: Free-text question (may be empty)
+
+        Returns:
+            Copy of the cached answer, or None on a miss
+        """
+        normalized = normalize_question(question)
+        vector = self._embed(normalized)
+        now = time.monotonic()
+
+        with self._lock:
+            entries = self._buckets.get(bucket)
+            if entries:
+                # Drop expired answers (entries are kept oldest first)
+                while entries['stored_at'] and now - entries['stored_at'][0] > self.ttl_seconds:
+                    self._pop_oldest(entries)
+
+            best = None
+            if entries and entries['stored_at']:
+                if vector is None:
+                    # No embedder (or nothing to embed): only the identical question matches
+                    for index, text in enumerate(entries['questions']):
+                        if text == normalized:
+                            best = index
+                else:
+                    scores = entries['vectors'] @ vector
+                    for index in np.argsort(-scores):
+                        if scores[index] < self.threshold:
+                            break
+                        if not polarity_differs(entries['questions'][index], normalized):
+                            best = int(index)
+                            break
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(entries['answers'][best])
+
+    def put(self, bucket: Hashable, question: Optional[str], answer: Dict):
+        """Store an answer for a question"""
+        normalized = normalize_question(question)
+        vector = self._embed(normalized)
+
+        with self._lock:
+            entries = self._buckets.get(bucket)
+            if entries is None:
+                if vector is not None:
+                    dim = len(vector)
+                else:
+                    dim = len(self.embedder.embed('malaria')) if self.embedder is not None else 0
+                entries = {
+                    'vectors': np.zeros((0, dim), dtype=np.float32),
+                    'questions': [],
+                    'answers': [],
+                    'stored_at': []
+                }
+                self._buckets[bucket] = entries
+            if vector is None:
+                vector = np.zeros(entries['vectors'].shape[1], dtype=np.float32)
+
+            entries['vectors'] = np.vstack([entries['vectors'], vector])
+            entries['questions'].append(normalized)
+            entries['answers'].append(copy.deepcopy(answer))
+            entries['stored_at'].append(time.monotonic())
+            while len(entries['stored_at']) > self.max_entries_per_bucket:
+                self._pop_oldest(entries)
+
+    def invalidate(self, predicate):
+        """Drop every bucket whose key satisfies predicate(bucket)"""
+        with self._lock:
+            for bucket in [key for key in self._buckets if predicate(key)]:
+                del self._buckets[bucket]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'buckets': len(self._buckets),
+                'entries': sum(len(entries['stored_at']) for entries in self._buckets.values()),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _embed(self, normalized: str) -> Optional[np.ndarray]:
+        """Embedding of a normalized question, or None without an embedder or content to compare"""
+        if not normalized or self.embedder is None:
+            return None
+        vector = self.embedder.embed(normalized)
+        return vector if vector.any() else None
+
+    @staticmethod
+    def _pop_oldest(entries: Dict):
+        entries['vectors'] = entries['vectors'][1:]
+        entries['questions'].pop(0)
+        entries['answers'].pop(0)
+        entries['stored_at'].pop(0)
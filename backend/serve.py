@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Production launcher: initialize the database once, then start several API workers
+
+The schema, data load, rollups and default users are set up in this process
+before any worker starts, so workers never race on table creation or seeding.
+Each worker imports main.py on its own and gets its own database connection
+and LLM client.
+
+Usage:
+    python serve.py [--workers N] [--host HOST] [--port PORT]
+                    [--limit-concurrency N] [--threads N]
+
+Environment equivalents: API_WORKERS, API_HOST, API_PORT, API_LIMIT_CONCURRENCY,
+API_WORKER_THREADS.
+"""
+import argparse
+import os
+import sys
+
+# Run from the backend directory so the relative MALERIA.db path and bare imports resolve
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+from database import DatabaseManager
+from write_behind import replay_journals
+
+def initialize_database():
+    """Migrate and seed the database in the parent process"""
+    print("🗄️  Initializing database...")
+    data_path = os.path.join(os.path.dirname(BACKEND_DIR), "data", "maleria_data.json")
+    db_manager = DatabaseManager()
+    db_manager.initialize(data_path)
+    # No worker is running yet, so every journal on disk is from a stopped process
+    replay_journals(db_manager)
+    db_manager.close()
+    print("✓ Database ready")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the malaria forecast API with multiple workers")
+    parser.add_argument('--workers', type=int, default=int(os.getenv('API_WORKERS', os.cpu_count() or 1)),
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument('--host', default=os.getenv('API_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('API_PORT', '8000')))
+    parser.add_argument('--limit-concurrency', type=int, default=int(os.getenv('API_LIMIT_CONCURRENCY', '0')) or None,
+                        help="Max concurrent connections per worker before returning 503 (default: unlimited)")
+    parser.add_argument('--threads', type=int, default=int(os.getenv('API_WORKER_THREADS', '32')),
+                        help="Threads per worker for blocking LLM calls (default: 32)")
+    args = parser.parse_args()
+
+    initialize_database()
+
+    # Workers inherit the environment: skip startup seeding, size their thread pools
+    os.environ['DB_INIT_DONE'] = '1'
+    os.environ['API_WORKER_THREADS'] = str(args.threads)
+
+    import uvicorn
+    print(f"🚀 Starting {args.workers} workers on http://{args.host}:{args.port}")
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        limit_concurrency=args.limit_concurrency
+    )
+
+if __name__ == "__main__":
+    main()
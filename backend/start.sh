@@ -33,12 +33,7 @@ import sys
 sys.path.insert(0, '..')
 from backend.database import DatabaseManager
 db = DatabaseManager()
-db.create_tables()
-db.cursor.execute('SELECT COUNT(*) FROM malaria_state_data')
-count = db.cursor.fetchone()[0]
-if count == 0:
-    db.load_json_data('../data/maleria_data.json')
-db.add_default_users()
+db.initialize('../data/maleria_data.json')
 db.close()
 print('✓ Database ready')
 "
@@ -0,0 +1,270 @@
+"""
+Structured output parsing for LLM responses
+
+One code path for every prompt: extract the first JSON value from the response
+in a single linear scan, repair common LLM defects, validate it against the
+prompt's typed model and count the outcome.
+"""
+import json
+import re
+import threading
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, ValidationError
+
+
+_decoder = json.JSONDecoder()
+_CODE_FENCE = re.compile(r'```(?:json|JSON)?\s*(.*?)```', re.DOTALL)
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+# A value ending a line followed by a key on the next line with no comma between them
+_MISSING_COMMA = re.compile(r'("|\d|true|false|null|[}\]])(\s*\n\s*)(")')
+
+
+# ==================== Extraction ====================
+
+def _find_value_end(text: str, start: int) -> int:
+    """Return the index just past the bracket closing the value at start (string-aware), or len(text)"""
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return len(text)
+
+
+def _repair(candidate: str) -> str:
+    """Fix trailing commas and missing commas between lines"""
+    candidate = _TRAILING_COMMA.sub(r'\1', candidate)
+    candidate = _MISSING_COMMA.sub(r'\1,\2\3', candidate)
+    return candidate
+
+
+def extract_json(text: str, expect: str = '{') -> Tuple[Optional[Any], str]:
+    """
+    Extract the first JSON object (or array) from an LLM response
+
+    Args:
+        text: Raw response text; may contain code fences and surrounding prose
+        expect: '{' for an object, '[' for an array
+
+    Returns:
+        (parsed value or None, outcome) where outcome is 'ok', 'repaired' or 'failed'
+    """
+    if not text:
+        return None, 'failed'
+
+    fenced = _CODE_FENCE.search(text)
+    if fenced and expect in fenced.group(1):
+        text = fenced.group(1)
+
+    start = text.find(expect)
+    if start == -1:
+        return None, 'failed'
+
+    # Fast path: decode exactly one value and ignore whatever follows it
+    try:
+        value, _ = _decoder.raw_decode(text, start)
+        return value, 'ok'
+    except json.JSONDecodeError:
+        pass
+
+    candidate = _repair(text[start:_find_value_end(text, start)])
+    try:
+        value, _ = _decoder.raw_decode(candidate)
+        return value, 'repaired'
+    except json.JSONDecodeError:
+        return None, 'failed'
+
+
+# ==================== Metrics ====================
+
+class ParseMetrics:
+    def __init__(self):
+        """Thread-safe per-prompt counters of parse outcomes"""
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, outcome: str):
+        with self._lock:
+            counts = self._counts.setdefault(
+                name, {'native': 0, 'ok': 0, 'repaired': 0, 'failed': 0, 'invalid': 0}
+            )
+            counts[outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+
+parse_metrics = ParseMetrics()
+
+
+# ==================== Typed models ====================
+
+def _to_count(value: Any) -> Any:
+    """Accept LLM-style numbers such as 1234.0 or "1,234" for integer counts"""
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+        try:
+            value = float(value)
+        except ValueError:
+            return value
+    if isinstance(value, float):
+        return int(round(value))
+    return value
+
+
+def _join_text(value: Any) -> Any:
+    """Accept a list of strings where a single string is expected, joined into one"""
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return " ".join(item.strip() for item in value if item.strip())
+    return value
+
+
+Count = Annotated[int, BeforeValidator(_to_count)]
+# One message; models sometimes send a list of recommendations instead
+JoinedText = Annotated[str, BeforeValidator(_join_text)]
+# Free-text fields; models sometimes answer with a list or nested object instead of a string
+Text = Union[str, int, float, List[Any], Dict[str, Any]]
+
+
+class StructuredModel(BaseModel):
+    # Keep any additional keys the model returns
+    model_config = ConfigDict(extra='allow')
+
+
+class ForecastByGender(StructuredModel):
+    male: Count = 0
+    female: Count = 0
+
+
+class ForecastByAgeGroup(StructuredModel):
+    children_0_5: Count = 0
+    youth_5_18: Count = 0
+    adults_18_60: Count = 0
+    elderly_60_plus: Count = 0
+
+
+class ForecastOutput(StructuredModel):
+    """Malaria outbreak forecast for one district"""
+    outbreak_status: str = "high_risk"
+    disease_name: str = "Malaria"
+    forecast_by_gender: Optional[ForecastByGender] = None
+    forecast_by_age_group: Optional[ForecastByAgeGroup] = None
+    total_expected_cases: Count
+    confidence_level: Optional[float] = None
+    recommendations: Optional[JoinedText] = None
+
+
+class ForecastBatchOutput(StructuredModel):
+    """Malaria outbreak forecasts for several districts, one entry per district id"""
+    # Entries are validated one by one against ForecastOutput so a single bad
+    # entry does not discard the rest of the batch
+    forecasts: List[Dict[str, Any]]
+
+
+class AshaActions(StructuredModel):
+    """Community-level recommendations for an ASHA health worker"""
+    general_remedies: Text
+    social_remedies: Text
+    govt_regulatory_actions: Text
+    healthcare_body_actions: Text
+
+
+class DcmoActions(StructuredModel):
+    """District-level action and resource plan for a DCMO"""
+    cases_identified: Text
+    department_actions: Text
+    inventory_arrangements: Text
+    resource_deployment: Text
+    coordination_plan: Text
+    budget_allocation: Optional[Text] = None
+
+
+class ScmoActions(StructuredModel):
+    """State-level strategic response for an SCMO (core categories plus the most relevant others)"""
+    state_overview: Text
+    highly_affected_districts: Optional[Text] = None
+    comparative_analysis: Optional[Text] = None
+    budget_allocation: Optional[Text] = None
+    state_level_remedies: Text
+    medical_professional_deployment: Optional[Text] = None
+    emergency_measures: Text
+    inter_district_coordination: Optional[Text] = None
+    emergency_funding: Optional[Text] = None
+    timeline_and_milestones: Optional[Text] = None
+
+
+class ScmoGuidance(StructuredModel):
+    """Full state-level strategic plan for an SCMO"""
+    state_overview: Text
+    highly_affected_districts: Text
+    comparative_analysis: Text
+    state_level_remedies: Text
+    medical_professional_deployment: Text
+    emergency_measures: Text
+    inter_district_coordination: Text
+    emergency_funding: Text
+    timeline_and_milestones: Text
+
+
+def validate_structured(value: Any, model: Type[BaseModel], name: str, outcome: str,
+                        record: bool = True) -> Optional[Dict]:
+    """
+    Validate an already-decoded value against a typed model and record the outcome
+
+    Args:
+        record: Record the outcome in parse_metrics (False for intermediate
+            attempts, when the caller records one outcome per LLM call)
+
+    Returns:
+        Validated dict (unset optional fields omitted), or None if invalid
+    """
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    try:
+        parsed = model.model_validate(value)
+    except ValidationError as e:
+        if record:
+            print(f"Invalid {name} response: {e.error_count()} validation errors")
+            parse_metrics.record(name, 'invalid')
+        return None
+
+    if record:
+        parse_metrics.record(name, outcome)
+    return parsed.model_dump(exclude_none=True)
+
+
+def parse_structured(text: str, model: Type[BaseModel], name: str) -> Optional[Dict]:
+    """
+    Extract, repair and validate an LLM response against a typed model
+
+    Args:
+        text: Raw response text
+        model: Pydantic model for the prompt's JSON shape
+        name: Prompt name used for the parse metrics
+
+    Returns:
+        Validated dict (unset optional fields omitted), or None when the
+        response has no usable JSON or fails validation
+    """
+    value, outcome = extract_json(text)
+    if value is None:
+        parse_metrics.record(name, 'failed')
+        return None
+    return validate_structured(value, model, name, outcome)
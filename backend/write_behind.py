@@ -0,0 +1,242 @@
+"""
+Write-behind group commit for service request submissions
+
+Submissions are appended to a local journal file and acknowledged once the
+journal is fsynced; one fsync covers every submission that arrived while the
+previous batch was being written. A background thread then stores the
+journaled requests in service_requests with one transaction per batch and
+truncates the journal once they are in the database.
+
+Each worker process writes its own journal file and holds an exclusive lock
+on it while running. Journals left behind by a crash are replayed on the next
+start (replay_journals); locked journals belong to live sibling workers and are
+skipped. Entries carry a queue_id stored with the request, so a replay never
+duplicates rows that were already written. Without fcntl (Windows) journals
+cannot be locked, so write-behind must run with a single worker there.
+
+Configuration (environment):
+    SERVICE_REQUEST_WRITE_BEHIND   1 to acknowledge /service-request from the journal (0)
+    SERVICE_REQUEST_JOURNAL_DIR    Directory for journal files (backend/journal)
+    WRITE_BEHIND_BATCH_SIZE        Max requests per journal fsync / database transaction (500)
+    WRITE_BEHIND_FLUSH_MS          Max milliseconds a batch waits to fill up (5)
+"""
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from database import DatabaseManager
+
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = os.getenv(
+    'SERVICE_REQUEST_JOURNAL_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'journal')
+)
+REPLAY_BATCH_SIZE = 500
+
+
+def _try_lock(journal) -> bool:
+    """Take an exclusive lock on an open journal without blocking; False if another process holds it"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def replay_journals(db_manager, journal_dir: str = JOURNAL_DIR) -> int:
+    """
+    Store requests from journals of writers that are no longer running
+
+    Journals locked by a running writer are skipped, so this is safe to call
+    from every worker on startup, before its own writer starts.
+
+    Returns:
+        Number of requests written to the database
+    """
+    stored = 0
+    for path in sorted(glob.glob(os.path.join(journal_dir, '*.jsonl'))):
+        try:
+            journal = open(path, encoding='utf-8')
+        except FileNotFoundError:
+            # Replayed and removed by a sibling worker
+            continue
+        with journal:
+            if not _try_lock(journal) or not os.path.exists(path):
+                continue
+            rows = []
+            for line in journal:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    # Torn final line from a crash mid-write; it was never acknowledged
+                    break
+            for start in range(0, len(rows), REPLAY_BATCH_SIZE):
+                stored += db_manager.insert_service_requests(rows[start:start + REPLAY_BATCH_SIZE])[1]
+            os.remove(path)
+    if stored:
+        print(f"✓ Replayed {stored} journaled service requests")
+    return stored
+
+
+class ServiceRequestWriter:
+    def __init__(self, db_path: str, journal_dir: str = JOURNAL_DIR,
+                 batch_size: Optional[int] = None, flush_ms: Optional[float] = None):
+        """
+        Journaled, batched writer for new service requests
+
+        Args:
+            db_path: SQLite database the requests are stored in
+            journal_dir: Directory for this process's journal file
+            batch_size: Max requests per fsync and per transaction
+            flush_ms: Max milliseconds to wait for a batch to fill up
+        """
+        self.db_path = db_path
+        self.journal_path = os.path.join(journal_dir, f"service_requests-{os.getpid()}.jsonl")
+        self.batch_size = batch_size or int(os.getenv('WRITE_BEHIND_BATCH_SIZE', '500'))
+        self.flush_seconds = (flush_ms if flush_ms is not None
+                              else float(os.getenv('WRITE_BEHIND_FLUSH_MS', '5'))) / 1000
+        self._queue = queue.Queue()
+        self._unstored = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._journal = None
+        self.journaled = 0
+        self.stored = 0
+        self.batches = 0
+        self.failed_flushes = 0
+
+    def start(self):
+        """Open and lock the journal and start the flush thread"""
+        os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+        while True:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            if fcntl is not None:
+                fcntl.flock(self._journal.fileno(), fcntl.LOCK_EX)
+            # A replay may have removed the file (left by an earlier process with this pid) before we locked it
+            if (os.path.exists(self.journal_path)
+                    and os.path.samestat(os.stat(self.journal_path), os.fstat(self._journal.fileno()))):
+                break
+            self._journal.close()
+        self._thread = threading.Thread(target=self._run, name="service-request-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: Dict) -> Future:
+        """
+        Queue a service request
+
+        Args:
+            row: Dict with user_id, username, role, district, state,
+                request_item and request_details
+
+        Returns:
+            Future resolved with the queue_id once the request is in the journal
+        """
+        if self._thread is None:
+            raise RuntimeError("Service request writer is not running")
+        future = Future()
+        self._queue.put((dict(row, queue_id=uuid.uuid4().hex), future))
+        return future
+
+    def stop(self, timeout: float = 10):
+        """Flush everything queued, store it and close the journal"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        # Remove an empty journal while still holding its lock so a replay never sees it half-closed
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) == 0:
+            os.remove(self.journal_path)
+        self._journal.close()
+
+    def stats(self) -> Dict:
+        return {
+            'queued': self._queue.qsize(),
+            'journaled': self.journaled,
+            'stored': self.stored,
+            'unstored': len(self._unstored),
+            'batches': self.batches,
+            'failed_flushes': self.failed_flushes
+        }
+
+    def _next_batch(self) -> List:
+        """Block for the first submission, then collect more until the batch is full or the window ends"""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        # The writer thread has its own connection; the API's cursor stays on the event loop
+        db_manager = DatabaseManager(self.db_path)
+        try:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = self._next_batch()
+                if batch:
+                    self._journal_batch(batch)
+                if self._unstored:
+                    self._store(db_manager)
+            while self._unstored and self._store(db_manager):
+                pass
+        finally:
+            db_manager.close()
+
+    def _journal_batch(self, batch: List):
+        """Append a batch to the journal with one fsync, then acknowledge it"""
+        try:
+            self._journal.write(''.join(json.dumps(row) + '\n' for row, _ in batch))
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self._unstored.extend(row for row, _ in batch)
+        self.journaled += len(batch)
+        for row, future in batch:
+            future.set_result(row['queue_id'])
+
+    def _store(self, db_manager) -> bool:
+        """Write journaled requests to the database, one transaction per batch; keep the rest for a retry on failure"""
+        while self._unstored:
+            chunk = self._unstored[:self.batch_size]
+            try:
+                db_manager.insert_service_requests(chunk)
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error(f"Storing {len(self._unstored)} journaled service requests failed: {str(e)}")
+                time.sleep(min(1.0, self.flush_seconds * 10))
+                return not self._stop.is_set()
+            self.stored += len(chunk)
+            self.batches += 1
+            del self._unstored[:len(chunk)]
+        # Everything journaled is now in the database; no fsync needed since a replay is idempotent
+        self._journal.seek(0)
+        self._journal.truncate()
+        return True
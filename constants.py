@@ -64,6 +64,8 @@ TRANSLATIONS = {
         'please_fill_all': 'Please fill all fields',
         'loading_stats': 'Loading outbreak statistics...',
         'no_data': 'No outbreak data available at the moment.',
+        'loading_forecast': 'Loading outbreak forecast...',
+        'loading_requests': 'Loading requests...',
         'outbreak_status': 'Outbreak Status',
         'disease': 'Disease',
         'expected_cases': 'Expected Cases',
@@ -129,6 +131,8 @@ TRANSLATIONS = {
         'please_fill_all': 'कृपया सभी फ़ील्ड भरें',
         'loading_stats': 'प्रकोप सांख्यिकी लोड हो रही है...',
         'no_data': 'इस समय कोई प्रकोप डेटा उपलब्ध नहीं है।',
+        'loading_forecast': 'प्रकोप पूर्वानुमान लोड हो रहा है...',
+        'loading_requests': 'अनुरोध लोड हो रहे हैं...',
         'outbreak_status': 'प्रकोप स्थिति',
         'disease': 'रोग',
         'expected_cases': 'अपेक्षित मामले',
@@ -194,6 +198,8 @@ TRANSLATIONS = {
         'please_fill_all': 'দয়া করে সমস্ত ক্ষেত্র পূরণ করুন',
         'loading_stats': 'প্রাদুর্ভাব পরিসংখ্যান লোড করছি...',
         'no_data': 'এই মুহূর্তে কোন প্রাদুর্ভাব ডেটা উপলব্ধ নেই।',
+        'loading_forecast': 'প্রাদুর্ভাবের পূর্বাভাস লোড হচ্ছে...',
+        'loading_requests': 'অনুরোধ লোড হচ্ছে...',
         'outbreak_status': 'প্রাদুর্ভাব অবস্থা',
         'disease': 'রোগ',
         'expected_cases': 'প্রত্যাশিত ক্ষেত্রে',
@@ -259,6 +265,8 @@ TRANSLATIONS = {
         'please_fill_all': 'நன்றி, அனைத்து புலங்களையும் நிரப்பவும்',
         'loading_stats': 'நோய் பெருக்கம் புள்ளிவிவரங்களை ஏற்றுகிறது...',
         'no_data': 'இப்போது நோய் பெருக்கம் தரவு கிடைக்கவில்லை.',
+        'loading_forecast': 'நோய் பெருக்க முன்னறிவிப்பு ஏற்றப்படுகிறது...',
+        'loading_requests': 'கோரிக்கைகள் ஏற்றப்படுகின்றன...',
         'outbreak_status': 'நோய் பெருக்கம் நிலை',
         'disease': 'நோய்',
         'expected_cases': 'எதிர்பார்த்த வழக்குகள்',
@@ -8,6 +8,7 @@ let currentUser = null;
 let currentLocation = { district: null, state: null };
 let conversations = [];
 let currentConversationId = null;
+let serviceRequestEvents = null;
 
 /**
  * Initialize chat page
@@ -42,6 +43,9 @@ function initializeChat() {
         // Update user info in sidebar
         updateUserInfo();
         
+        // Live service request updates (optional; needs EventSource support)
+        subscribeServiceRequestEvents();
+        
         // Auto-load initial guidance if location is available
         if (currentLocation.district && currentLocation.state) {
             setTimeout(() => {
@@ -89,6 +93,48 @@ function updateUserInfo() {
     console.log('✓ User info updated');
 }
 
+/**
+ * Subscribe to service request changes pushed by the backend (Server-Sent Events)
+ * The browser reconnects on its own and resumes from the last event it received
+ */
+function subscribeServiceRequestEvents() {
+    const password = localStorage.getItem('userPassword');
+    if (!window.EventSource || !password || serviceRequestEvents) {
+        return;
+    }
+    
+    const params = new URLSearchParams({ username: currentUser.username, password });
+    serviceRequestEvents = new EventSource(`${API_BASE_URL}/service-requests/events?${params}`);
+    serviceRequestEvents.addEventListener('service_request', (message) => {
+        const event = JSON.parse(message.data);
+        addSystemMessage(formatServiceRequestEvent(event));
+    });
+    serviceRequestEvents.onerror = () => {
+        console.warn('⚠️ Service request updates disconnected, retrying...');
+    };
+    console.log('✓ Subscribed to service request updates');
+}
+
+/**
+ * Describe one service request change for the chat
+ */
+function formatServiceRequestEvent(event) {
+    const label = `📦 Request #${event.request_id} (${escapeHtml(event.request_item)})`;
+    const by = event.actor === currentUser.username ? '' : ` by ${escapeHtml(event.actor)}`;
+    switch (event.action) {
+        case 'create':
+            return `${label} submitted${by} in ${escapeHtml(event.district)}`;
+        case 'status':
+            return `${label} is now <strong>${escapeHtml(event.new_value)}</strong>${by}`;
+        case 'assigned_to':
+            return `${label} assigned to ${escapeHtml(event.new_value || 'nobody')}${by}`;
+        case 'escalate':
+            return `${label} escalated to level ${escapeHtml(event.new_value)}${by}`;
+        default:
+            return `${label} updated${by}`;
+    }
+}
+
 /**
  * Load initial guidance on page load
  */
@@ -555,6 +601,9 @@ function escapeHtml(text) {
  */
 function handleLogout() {
     if (confirm('Are you sure you want to logout?')) {
+        if (serviceRequestEvents) {
+            serviceRequestEvents.close();
+        }
         localStorage.removeItem('user');
         localStorage.removeItem('userPassword');
         localStorage.removeItem('userLocation');
@@ -24,6 +24,7 @@ import re
 import json
 import ast
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Import constants
 from constants import TRANSLATIONS, COLORS, BACKEND_URL, get_text, translate_to_english, translate_api_response
@@ -321,8 +322,13 @@ class APIClient:
             st.error(f"Failed to fetch locations: {str(e)}")
             return []
 
-    def get_forecast(self, username: str, password: str, district: str, state: str) -> Dict:
-        """Get outbreak forecast for district"""
+    def get_forecast(self, username: str, password: str, district: str, state: str,
+                     show_errors: bool = True) -> Dict:
+        """Get outbreak forecast for district
+
+        show_errors=False skips st.error so the call can run from a worker thread,
+        which has no Streamlit script context to render into.
+        """
         try:
             response = requests.post(
                 f"{self.base_url}/forecast",
@@ -332,7 +338,8 @@ class APIClient:
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            st.error(f"Failed to get forecast: {str(e)}")
+            if show_errors:
+                st.error(f"Failed to get forecast: {str(e)}")
             return None
 
     def get_actions(self, username: str, password: str, question: Optional[str] = None) -> Dict:
@@ -354,9 +361,54 @@ class APIClient:
             return None
 
 
+    def get_state_comparison(self, state: str) -> Optional[Dict]:
+        """Get the computed district comparison for a state (None when unavailable)"""
+        try:
+            response = requests.get(f"{self.base_url}/state/{state}/comparison", timeout=10)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException:
+            return None
+
+    def get_nearest_facilities(self, state: str, district: str, facility_type: str = "hospital",
+                               k: int = 10) -> List[Dict]:
+        """Get the facilities nearest to a district (empty when none are on record)"""
+        try:
+            response = requests.get(
+                f"{self.base_url}/facilities/nearest",
+                params={"state": state, "district": district, "facility_type": facility_type, "k": k},
+                timeout=10
+            )
+            response.raise_for_status()
+            return response.json().get("facilities", [])
+        except requests.exceptions.RequestException:
+            return []
+
+
 # Initialize API client
 api_client = APIClient(BACKEND_URL)
 
+# Used when no facility coordinates are loaded for the user's district
+DEFAULT_HOSPITALS = [
+    "Maharaja Agrasen Hospital, Gorakhpur",
+    "Baba Raghav Das Medical College Hospital, Gorakhpur",
+    "Central Hospital Gorakhpur",
+    "KIMS Hospital Gorakhpur",
+    "Apollo Health City, Gorakhpur"
+]
+
+
+def get_hospital_options(user: Dict) -> List[str]:
+    """Hospitals nearest to the user's district, fetched once per session"""
+    if st.session_state.get('hospital_options_for') != (user['state'], user['district']):
+        facilities = api_client.get_nearest_facilities(user['state'], user['district'])
+        st.session_state.hospital_options = [
+            f"{facility['name']}, {facility['district']} ({facility['distance_km']:.0f} km)"
+            for facility in facilities
+        ] or DEFAULT_HOSPITALS
+        st.session_state.hospital_options_for = (user['state'], user['district'])
+    return st.session_state.hospital_options
+
 
 # Local database for service requests (still use SQLite for local storage)
 class DatabaseManager:
@@ -640,14 +692,19 @@ class DatabaseManager:
         self.conn.commit()
         return int(self.cursor.lastrowid)
 
-    def get_user_service_requests(self, user_id: int) -> List[Dict]:
-        self.cursor.execute('''
+    def get_user_service_requests(self, user_id: int, conn: Optional[sqlite3.Connection] = None,
+                                  limit: int = 50) -> List[Dict]:
+        # A separate connection lets bootstrap worker threads read without sharing self.cursor
+        cursor = conn.cursor() if conn is not None else self.cursor
+        # Newest requests only (request_id follows creation order)
+        cursor.execute('''
             SELECT request_id, request_item, request_details, status, escalation_level, created_at
             FROM service_requests
             WHERE user_id = ?
-            ORDER BY created_at DESC
-        ''', (user_id,))
-        rows = self.cursor.fetchall()
+            ORDER BY request_id DESC
+            LIMIT ?
+        ''', (user_id, limit))
+        rows = cursor.fetchall()
         return [{
             'request_id': r['request_id'],
             'request_item': r['request_item'],
@@ -688,6 +745,12 @@ db = DatabaseManager()
 db.add_default_users_and_data()
 
 
+@st.cache_resource
+def get_bootstrap_executor() -> ThreadPoolExecutor:
+    """Worker pool for the login bootstrap, shared across reruns and sessions"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="aayura-bootstrap")
+
+
 # -----------------------------------------------------------------------------
 # Utility & Domain Logic (API-driven)
 # -----------------------------------------------------------------------------
@@ -921,6 +984,8 @@ if 'prefetched_requests' not in st.session_state:
     st.session_state.prefetched_requests = []
 if 'initial_forecast' not in st.session_state:
     st.session_state.initial_forecast = None
+if 'bootstrap_futures' not in st.session_state:
+    st.session_state.bootstrap_futures = {}
 
 
 # -----------------------------------------------------------------------------
@@ -930,50 +995,93 @@ def get_user_initials(first_name: str, last_name: str) -> str:
     return f"{first_name} {last_name}"
 
 
+def _fetch_forecast_message(username: str, password: str, district: str, state: str, lang: str) -> Dict:
+    """
+    Worker thread: fetch the forecast and translate it into the chat message.
+    Translation needs the forecast text, so both run in the same worker while the
+    service-request prefetch runs alongside. Must not touch st.session_state.
+    """
+    forecast_response = api_client.get_forecast(username, password, district, state, show_errors=False)
+    if forecast_response and forecast_response.get('forecast'):
+        forecast_text = format_forecast_for_display(forecast_response['forecast'])
+        content = translate_api_response(forecast_text, lang)
+    else:
+        content = get_text('no_data', lang)
+    return {'type': 'ai', 'content': content, 'is_forecast': True}
+
+
+def _prefetch_service_requests(user_id: int) -> List[Dict]:
+    """Worker thread: read the user's service requests on a dedicated connection"""
+    conn = sqlite3.connect(db.db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return db.get_user_service_requests(user_id, conn=conn)
+    finally:
+        conn.close()
+
+
 def bootstrap_user_session(user_obj: dict, password: str):
     """
-    Prepare data BEFORE flipping logged_in to True:
-    - Get outbreak forecast from API
+    Start loading session data in worker threads so login can flip to the chat
+    shell immediately:
+    - Get outbreak forecast from API (and translate it)
     - Prefetch service requests
-    - Initialize chat with forecast data
+    Results are picked up by collect_bootstrap_results() on each rerun.
     """
-    st.session_state.bootstrapping = True
-    try:
-        # Get forecast from API (no visible spinner to avoid fading)
-        forecast_response = api_client.get_forecast(
+    lang = st.session_state.language if 'language' in st.session_state else 'hi'
+    st.session_state.chat_history = []
+    st.session_state.prefetched_requests = []
+    st.session_state.outbreak_loaded = False
+    executor = get_bootstrap_executor()
+    st.session_state.bootstrap_futures = {
+        'forecast': executor.submit(
+            _fetch_forecast_message,
             user_obj['username'],
             password,
             user_obj.get('district', ''),
-            user_obj.get('state', '')
-        )
+            user_obj.get('state', ''),
+            lang
+        ),
+        'requests': executor.submit(_prefetch_service_requests, user_obj['user_id']),
+    }
+    st.session_state.bootstrapping = True
 
-        st.session_state.chat_history = []
 
-        if forecast_response and forecast_response.get('forecast'):
-            forecast = forecast_response['forecast']
-            # Translate forecast to selected language
-            lang = st.session_state.language if 'language' in st.session_state else 'hi'
-            forecast_text = format_forecast_for_display(forecast)
-            translated_forecast = translate_api_response(forecast_text, lang)
-            st.session_state.chat_history.append({
-                'type': 'ai',
-                'content': translated_forecast,
-                'is_forecast': True
-            })
-        else:
-            lang = st.session_state.language if 'language' in st.session_state else 'hi'
-            no_data_msg = get_text('no_data', lang)
-            st.session_state.chat_history.append({
-                'type': 'ai',
-                'content': no_data_msg,
-                'is_forecast': True
-            })
+def collect_bootstrap_results():
+    """Move finished bootstrap results into session state (main script thread only)"""
+    futures = st.session_state.bootstrap_futures
+    lang = st.session_state.language if 'language' in st.session_state else 'hi'
+    for key, future in list(futures.items()):
+        if not future.done():
+            continue
+        del futures[key]
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Bootstrap task '{key}' failed: {e}")
+            result = None
 
-        # Prefetch service requests
-        st.session_state.prefetched_requests = db.get_user_service_requests(user_obj['user_id'])
-        st.session_state.outbreak_loaded = True
-    finally:
-        st.session_state.bootstrapping = False
+        if key == 'forecast':
+            message = result or {'type': 'ai', 'content': get_text('no_data', lang), 'is_forecast': True}
+            # Keep the forecast first even if the user already sent a message
+            st.session_state.chat_history.insert(0, message)
+            st.session_state.outbreak_loaded = True
+        elif key == 'requests':
+            st.session_state.prefetched_requests = result or []
+
+    st.session_state.bootstrapping = bool(futures)
+
+
+def wait_for_bootstrap(timeout: float = 1.0):
+    """
+    Block until the next bootstrap task finishes (or timeout), then rerun to paint it.
+    The short timeout keeps widgets responsive while calls are still in flight.
+    """
+    pending = list(st.session_state.bootstrap_futures.values())
+    if not pending:
+        return
+    wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+    st.rerun()
 
 
 # -----------------------------------------------------------------------------
@@ -1051,7 +1159,7 @@ def show_login():
                         st.session_state.password = password
                         st.session_state.show_signup = False
 
-                        # Bootstrap all data BEFORE flipping logged_in
+                        # Start background bootstrap; the chat shell renders with placeholders
                         bootstrap_user_session(user, password)
 
                         # Flip login flag; DO NOT write to login_user/login_pass here
@@ -1159,6 +1267,7 @@ def process_chat_message():
 def show_chat():
     user = st.session_state.user
     lang = st.session_state.language
+    collect_bootstrap_results()
 
     # Sidebar with inline profile + logout
     with st.sidebar:
@@ -1177,6 +1286,8 @@ def show_chat():
             st.session_state.outbreak_loaded = False
             st.session_state.current_input = ""
             st.session_state.msg_processing = False
+            st.session_state.bootstrap_futures = {}
+            st.session_state.bootstrapping = False
             st.session_state.language = 'hi'  # Reset to Hindi
             st.rerun()
 
@@ -1212,14 +1323,7 @@ def show_chat():
         if request_category == "Doctor Appointment":
             request_sub_item = st.selectbox(
                 "Aayushman Bharat Approved Hospital Network",
-                options=[
-                    "Select Hospital",
-                    "Maharaja Agrasen Hospital, Gorakhpur",
-                    "Baba Raghav Das Medical College Hospital, Gorakhpur",
-                    "Central Hospital Gorakhpur",
-                    "KIMS Hospital Gorakhpur",
-                    "Apollo Health City, Gorakhpur"
-                ],
+                options=["Select Hospital"] + get_hospital_options(user),
                 key="hospital_select",
                 label_visibility="collapsed"
             )
@@ -1383,7 +1487,9 @@ def show_chat():
         # Pending Requests
         st.markdown(f"### {get_text('pending_requests', lang)}")
         requests = st.session_state.prefetched_requests
-        if requests:
+        if 'requests' in st.session_state.bootstrap_futures:
+            st.info(get_text('loading_requests', lang))
+        elif requests:
             any_pending = False
             for req in requests:
                 if req.get('status') == 'pending':
@@ -1410,8 +1516,12 @@ def show_chat():
 
     # Chat container
     with st.container():
-        # Display chat history (single AI outbreak message was added during bootstrap)
+        # Display chat history (the AI outbreak message is filled in by the bootstrap workers)
         st.markdown("")
+        if 'forecast' in st.session_state.bootstrap_futures:
+            st.markdown(
+                f"<div style='background: #e5e7eb; padding: 12px; border-radius: 8px; margin: 10px 0;'><b>Aayura AI:</b><br/>{get_text('loading_forecast', lang)}</div>",
+                unsafe_allow_html=True)
         for message in st.session_state.chat_history:
             if message['type'] == 'user':
                 st.markdown(
@@ -1515,7 +1625,13 @@ def show_chat():
                 elif role == "SCMO":
                     try:
                         csv_path = Path(__file__).parent / "SCMO.csv"
-                        if csv_path.exists():
+                        comparison = api_client.get_state_comparison(user['state'])
+                        if comparison and comparison.get('districts'):
+                            df = pd.DataFrame(comparison['districts']).drop(columns=['location_id'])
+                            st.markdown(f"**SCMO - District Comparison {comparison['year']}**")
+                            st.dataframe(df)
+                            action_list = df.to_dict(orient='list')
+                        elif csv_path.exists():
                             df = pd.read_csv(csv_path)
                             st.markdown("**SCMO - Local Data Table**")
                             st.dataframe(df)
@@ -1550,6 +1666,10 @@ def show_chat():
             st.session_state.msg_processing = False
             st.rerun()
 
+    # Page is painted; wait for the next bootstrap result and rerun to fill its placeholder
+    if st.session_state.bootstrap_futures:
+        wait_for_bootstrap()
+
 
 # -----------------------------------------------------------------------------
 # App Router
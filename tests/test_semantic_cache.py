@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from semantic_cache import SemanticCache, polarity_differs
+
+SAFE = "Is it safe to give primaquine to pregnant women?"
+UNSAFE = "Is it unsafe to give primaquine to pregnant women?"
+BUCKET = ('ASHA', 'high', 1)
+
+
+class ConstantEmbedder:
+    """Embeds every question identically, like a model that ignores the negation"""
+
+    def embed(self, text):
+        return np.ones(4, dtype=np.float32) / 2
+
+
+def test_exact_matching_by_default(monkeypatch):
+    monkeypatch.delenv('SEMANTIC_CACHE_MODEL', raising=False)
+    cache = SemanticCache()
+    cache.put(BUCKET, SAFE, {'answer': 'safe'})
+    assert cache.get(BUCKET, "is it SAFE to give primaquine to pregnant women") == {'answer': 'safe'}
+    assert cache.get(BUCKET, UNSAFE) is None
+    assert cache.get(BUCKET, "Can pregnant women take primaquine?") is None
+
+
+def test_negated_question_is_never_a_hit_with_an_embedder():
+    cache = SemanticCache(threshold=0.9, embedder=ConstantEmbedder())
+    cache.put(BUCKET, SAFE, {'answer': 'safe'})
+    assert cache.get(BUCKET, UNSAFE) is None
+    assert cache.get(BUCKET, "Is it not safe to give primaquine to pregnant women?") is None
+    assert cache.get(BUCKET, "Is it safe to give primaquine to a pregnant woman?") == {'answer': 'safe'}
+
+
+def test_polarity_differs():
+    assert polarity_differs("is it safe", "is it unsafe")
+    assert polarity_differs("should i give act", "should i not give act")
+    assert polarity_differs("do we treat", "don t we treat")
+    assert not polarity_differs("how many rdt kits", "how many test kits")
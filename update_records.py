@@ -7,10 +7,10 @@ import sys
 import sqlite3
 from pathlib import Path
 
-# Add backend to path
+# Add backend to path; its modules import each other by bare name
 sys.path.insert(0, str(Path(__file__).parent / "backend"))
 
-from backend.database import DatabaseManager
+from database import DatabaseManager
 
 def main():
     db = DatabaseManager()